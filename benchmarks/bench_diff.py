@@ -0,0 +1,83 @@
+"""Compare the Rust line diff with difflib on large class bodies.
+
+Builds a class of the requested size, edits about one line in a hundred and diffs the
+old and new class with pysealer.diff_lines and with difflib.unified_diff (what
+generate_function_diff used before). Reports the best time of each.
+
+Usage:
+    python benchmarks/bench_diff.py [--lines N [N ...]] [--repeat N]
+"""
+
+import argparse
+import difflib
+import random
+import time
+
+from pysealer import diff_lines
+
+
+def _best_of(repeat, func):
+    """Return the fastest of several timed runs of func, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _class_body(lines):
+    """A generated class of about the given number of lines, with repetitive methods."""
+    body = ["class Generated:"]
+    method = 0
+    while len(body) < lines:
+        body += [
+            f"    def method_{method}(self, value):",
+            "        if value is None:",
+            "            return None",
+            f"        result = self.field_{method % 7} + value",
+            "        return result",
+            "",
+        ]
+        method += 1
+    return body[:lines]
+
+
+def _edit(lines, rng):
+    """Change, insert or delete about one line in a hundred."""
+    edited = list(lines)
+    for _ in range(max(1, len(lines) // 100)):
+        position = rng.randrange(1, len(edited))
+        action = rng.random()
+        if action < 0.5:
+            edited[position] = edited[position] + "  # changed"
+        elif action < 0.75:
+            edited.insert(position, "        value = value or 0")
+        else:
+            del edited[position]
+    return edited
+
+
+def _difflib_diff(old, new):
+    return list(difflib.unified_diff(old, new, lineterm='', n=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10000, 50000], help="Class sizes in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"best of {args.repeat} runs")
+    print(f"{'lines':>8}{'difflib ms':>14}{'rust ms':>12}{'speedup':>10}")
+    for lines in args.lines:
+        old = _class_body(lines)
+        new = _edit(old, rng)
+        rust = _best_of(args.repeat, lambda: diff_lines(old, new, 1, 1, 2))
+        python = _best_of(args.repeat, lambda: _difflib_diff(old, new))
+        print(f"{lines:>8}{python * 1e3:>14.1f}{rust * 1e3:>12.1f}{python / rust:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
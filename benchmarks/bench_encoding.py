@@ -0,0 +1,51 @@
+"""Compare the cost of Base58 and hex seals when locking and checking.
+
+Signs and verifies the same set of sources with each seal encoding and reports the
+best time per seal. Ed25519 itself costs the same for both encodings, so the
+difference between the rows is the cost of encoding (lock) and decoding (check).
+
+Usage:
+    python benchmarks/bench_encoding.py [--sources N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from pysealer import SigningKey, VerifyingKey, generate_keypair
+
+
+def _best_of(repeat, func):
+    """Return the fastest of several timed runs of func, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=20000, help="Number of sources to seal")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    private_key, public_key = generate_keypair()
+    signing_key = SigningKey.from_base58(private_key)
+    verifying_key = VerifyingKey.from_base58(public_key)
+    sources = [f"def function_{i}():\n    return {i}\n" for i in range(args.sources)]
+
+    print(f"{args.sources} sources, best of {args.repeat} runs")
+    print(f"{'encoding':<10}{'seal length':>12}{'lock us/seal':>16}{'check us/seal':>16}")
+    for encoding in ("base58", "hex"):
+        seals = signing_key.sign_many(sources, encoding=encoding)
+        assert all(verifying_key.verify_many(sources, seals))
+
+        lock = _best_of(args.repeat, lambda: signing_key.sign_many(sources, encoding=encoding))
+        check = _best_of(args.repeat, lambda: verifying_key.verify_many(sources, seals))
+        per_seal = 1e6 / len(sources)
+        print(f"{encoding:<10}{len(seals[0]):>12}{lock * per_seal:>16.2f}{check * per_seal:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
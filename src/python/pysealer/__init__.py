@@ -9,10 +9,36 @@ so that decorated functions remain importable.
 """
 
 # Define the rust to python module version and functions
-from ._pysealer import generate_keypair, generate_signature, verify_signature
+from ._pysealer import (
+    SigningKey,
+    VerifyingKey,
+    check_files,
+    diff_lines,
+    diff_opcodes,
+    generate_keypair,
+    generate_signature,
+    scan_source,
+    sign_many,
+    source_digest,
+    verify_many,
+    verify_signature,
+)
 
 __version__ = "1.0.1"
-__all__ = ["generate_keypair", "generate_signature", "verify_signature"]
+__all__ = [
+    "SigningKey",
+    "VerifyingKey",
+    "check_files",
+    "diff_lines",
+    "diff_opcodes",
+    "generate_keypair",
+    "generate_signature",
+    "scan_source",
+    "sign_many",
+    "source_digest",
+    "verify_many",
+    "verify_signature",
+]
 
 # Ensure dummy decorators are registered on import
 from . import dummy_decorators
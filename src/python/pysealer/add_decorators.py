@@ -1,197 +1,449 @@
 """Automatically add cryptographic decorators to all functions and classes in a python file."""
 
 import ast
+import itertools
 from pathlib import Path
-from pysealer import generate_signature
-from .setup import get_private_key
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from pysealer import SigningKey
+from .parallel import plan_workers, resolve_jobs, run_in_processes, run_in_threads
+from .scanner import Definition, definitions_from_tree, is_pysealer_decorator, seal_signature, walk_statements
+from .setup import env_file_stamp, get_private_key
+from .walk import walk_python_files
 
-def add_decorators(file_path: str) -> tuple[str, bool]:
+# Last signing key decoded in this process, with the env_file_stamp() of the .env file
+# it was read from; reused until another or a rewritten .env file is in effect
+_cached_signing_key: Optional[Tuple[Optional[Tuple[str, int, int]], SigningKey]] = None
+
+
+# Signing context of a lock worker process, set up once by _init_lock_worker
+_worker_context: Optional["SigningContext"] = None
+_worker_options: Tuple[bool, str] = (False, "base58")
+
+
+def _read_private_key() -> str:
+    """Read the Base58 private key from the .env file."""
+    try:
+        return get_private_key()
+    except (FileNotFoundError, ValueError) as e:
+        raise RuntimeError(f"Cannot add decorators: {e}. Please run 'pysealer init' first.")
+
+
+def _decode_signing_key(private_key: str) -> SigningKey:
+    """Decode a Base58 private key into a reusable signing key."""
+    try:
+        return SigningKey.from_base58(private_key)
+    except ValueError as e:
+        raise RuntimeError(f"Cannot add decorators: invalid private key ({e}).")
+
+
+def _load_signing_key() -> SigningKey:
+    """
+    Load the private key from the .env file and decode it into a reusable signing key.
+
+    Returns:
+        SigningKey handle that can sign any number of functions and classes
+    """
+    return _decode_signing_key(_read_private_key())
+
+
+class SigningContext:
+    """
+    Decoded private key and seal options shared by every file of a lock run.
+
+    Create it once with SigningContext.load() and pass it to add_decorators or
+    add_decorators_to_folder so that the .env file is found, parsed and decoded
+    only once.
+    """
+
+    def __init__(self, signing_key: SigningKey, prehash: bool = False, encoding: str = "base58"):
+        """
+        Args:
+            signing_key: Decoded private key
+            prehash: Seal the SHA-512 digest of each source with Ed25519ph instead of the
+                full text (recorded in the decorator as a "ph_" seal)
+            encoding: Signature encoding, "base58" or "hex" (recorded as an "hx_" seal,
+                faster to encode and verify but longer)
+        """
+        self.signing_key = signing_key
+        self.prehash = prehash
+        self.encoding = encoding
+        self._verifying_key = None
+
+    @classmethod
+    def load(cls, prehash: bool = False, encoding: str = "base58") -> "SigningContext":
+        """
+        Create a context from the private key in the .env file.
+
+        The decoded key is reused by later calls in the same process as long as they
+        read the same, unmodified .env file; pass the context down a run rather than
+        calling load() for every file.
+        """
+        global _cached_signing_key
+        stamp = env_file_stamp()
+        if _cached_signing_key is None or _cached_signing_key[0] != stamp:
+            _cached_signing_key = (stamp, _load_signing_key())
+        return cls(_cached_signing_key[1], prehash=prehash, encoding=encoding)
+
+    def seal_many(self, sources: List[str]) -> List[str]:
+        """Sign every source in a single parallel call and return the seals in order."""
+        return self.signing_key.sign_many(sources, prehash=self.prehash, encoding=self.encoding)
+
+    def verify_many(self, sources: List[str], seals: List[str]) -> List[bool]:
+        """Check existing seals against the key of this context, one verdict per source."""
+        if self._verifying_key is None:
+            self._verifying_key = self.signing_key.verifying_key()
+        return self._verifying_key.verify_many(sources, seals)
+
+    def matches(self, seal: str) -> bool:
+        """Whether a seal was made with the prehash and encoding options of this context."""
+        prehash, encoding = False, "base58"
+        tag, separator, rest = seal.partition('_')
+        while separator and tag in ("ph", "hx"):
+            if tag == "ph":
+                prehash = True
+            else:
+                encoding = "hex"
+            tag, separator, rest = rest.partition('_')
+        return (prehash, encoding) == (self.prehash, self.encoding)
+
+
+class LockResult(NamedTuple):
+    """Outcome of locking one file."""
+
+    changed: bool       # Whether the source changed (the file is only written if it did)
+    new: int            # Definitions sealed for the first time
+    resealed: int       # Definitions whose previous seal no longer verified
+    kept: int           # Definitions whose seal still verifies, left untouched
+
+
+def add_decorators(file_path: str, prehash: bool = False, encoding: str = "base58", context: Optional[SigningContext] = None) -> tuple[str, bool]:
     """
     Parse a Python file, add decorators to all functions and classes, and return the modified code.
-    
+
+    Seals that still verify against the current source are kept as they are; only new
+    and outdated definitions are signed.
+
     Args:
         file_path: Path to the Python file to process
-        
+        prehash: Seal the SHA-512 digest of each source with Ed25519ph instead of the
+            full text (recorded in the decorator as a "ph_" seal)
+        encoding: Signature encoding, "base58" or "hex" (recorded as an "hx_" seal,
+            faster to encode and verify but longer)
+        context: Signing context to use; when omitted one is loaded with prehash and
+            encoding (only if the file has something to seal)
+
     Returns:
-        Tuple of (modified Python source code as a string, whether any decorators were added)
+        Tuple of (modified Python source code as a string, whether the code changed)
     """
     # Read the entire file content into a string
     with open(file_path, 'r') as f:
         content = f.read()
 
+    modified_code, result = _seal_source(content, prehash, encoding, context)
+    return modified_code, result.changed
+
+
+def lock_file(file_path: str, prehash: bool = False, encoding: str = "base58", context: Optional[SigningContext] = None) -> LockResult:
+    """
+    Seal a Python file in place, writing it only when its content changes.
+
+    Args:
+        file_path: Path to the Python file to process
+        prehash: Seal digests with Ed25519ph instead of the full source text
+        encoding: Signature encoding, "base58" or "hex"
+        context: Signing context to use; when omitted one is loaded with prehash and encoding
+
+    Returns:
+        LockResult with the new, re-sealed and kept counts of the file
+    """
+    with open(file_path, 'r') as f:
+        content = f.read()
+
+    modified_code, result = _seal_source(content, prehash, encoding, context)
+    if result.changed:
+        with open(file_path, 'w') as f:
+            f.write(modified_code)
+    return result
+
+
+def _seal_source(content: str, prehash: bool, encoding: str, context: Optional[SigningContext]) -> Tuple[str, LockResult]:
+    """
+    Seal every top-level function and class of a source, keeping the seals that still verify.
+
+    Returns:
+        Tuple of (sealed source, LockResult)
+    """
     # Split content into lines for manipulation
     lines = content.split('\n')
 
-    # Parse the Python source code into an Abstract Syntax Tree (AST)
+    # Parse once; every edit below is expressed against the original lines
     tree = ast.parse(content)
-
-    # First pass: Remove existing pysealer decorators
-    lines_to_remove = set()
-    for node in ast.walk(tree):
-        if type(node).__name__ in ("FunctionDef", "AsyncFunctionDef", "ClassDef"):
-            if hasattr(node, 'decorator_list'):
-                for decorator in node.decorator_list:
-                    is_pysealer_decorator = False
-
-                    if isinstance(decorator, ast.Name):
-                        if decorator.id.startswith("pysealer"):
-                            is_pysealer_decorator = True
-                    elif isinstance(decorator, ast.Attribute):
-                        if isinstance(decorator.value, ast.Name) and decorator.value.id == "pysealer":
-                            is_pysealer_decorator = True
-                    elif isinstance(decorator, ast.Call):
-                        func = decorator.func
-                        if isinstance(func, ast.Attribute):
-                            if isinstance(func.value, ast.Name) and func.value.id == "pysealer":
-                                is_pysealer_decorator = True
-                        elif isinstance(func, ast.Name) and func.id.startswith("pysealer"):
-                            is_pysealer_decorator = True
-
-                    if is_pysealer_decorator:
-                        # Mark this line for removal (convert to 0-indexed)
-                        lines_to_remove.add(decorator.lineno - 1)
-
-    # Remove the marked lines (in reverse order to preserve indices)
-    for line_idx in sorted(lines_to_remove, reverse=True):
-        del lines[line_idx]
-
-    # Re-parse the content after removing decorators to get updated line numbers
-    modified_content = '\n'.join(lines)
-    tree = ast.parse(modified_content)
-
-    # Build parent map for all nodes
-    parent_map = {}
-    for parent in ast.walk(tree):
-        for child in ast.iter_child_nodes(parent):
-            parent_map[child] = parent
-
-    decorators_to_add = []
-
-    for node in ast.walk(tree):
-        node_type = type(node).__name__
-
+    definitions = definitions_from_tree(tree)
+
+    # Existing pysealer decorators are removed (0-indexed lines), unless their seal is kept
+    lines_to_remove = {
+        decorator.line - 1
+        for definition in definitions
+        for decorator in definition.decorators
+        if is_pysealer_decorator(decorator)
+    }
+
+    # (insert_before_line, col_offset, function_source) for every node to seal
+    nodes_to_seal = []
+    # (seal line, seal) of the current seal of each node, None when it has none
+    current_seals = []
+    # Whether each node carried any pysealer decorator before this run
+    previously_sealed = []
+
+    for definition in definitions:
         # Only decorate:
         # - Top-level functions (not inside a class)
         # - Top-level classes
-        if node_type in ("FunctionDef", "AsyncFunctionDef"):
-            parent = parent_map.get(node)
-            if isinstance(parent, ast.ClassDef):
-                continue  # skip methods inside classes
-        elif node_type == "ClassDef":
-            pass  # always decorate classes
-        else:
-            continue
+        if definition.kind != "ClassDef" and definition.in_class:
+            continue  # skip methods inside classes
+
+        # Source of the definition as it reads once the old decorators are gone,
+        # without any pysealer decorator line
+        start_line = definition.line_start - 1
+        function_source = '\n'.join(
+            line
+            for index, line in enumerate(lines[start_line:definition.line_end], start_line)
+            if index not in lines_to_remove and not line.strip().startswith('@pysealer')
+        )
+
+        # The new decorator goes above the first decorator that is kept
+        insert_before = start_line
+        for decorator in definition.decorators:
+            if decorator.line - 1 not in lines_to_remove:
+                insert_before = decorator.line - 1
+                break
+
+        nodes_to_seal.append((insert_before, definition.col_offset, function_source))
+        current_seals.append(_current_seal(definition, lines))
+        previously_sealed.append(any(is_pysealer_decorator(decorator) for decorator in definition.decorators))
 
-        # Extract the complete source code of this function/class for hashing
-        # Use original source to preserve formatting (quotes, spacing, etc.)
-        start_line = node.lineno - 1
-        end_line = node.end_lineno if hasattr(node, 'end_lineno') and node.end_lineno else node.lineno
+    # If no decorators to add, return original content
+    if not nodes_to_seal:
+        return content, LockResult(False, 0, 0, 0)
+
+    if context is None:
+        context = SigningContext.load(prehash=prehash, encoding=encoding)
+
+    # Verify every current seal made with the same options in a single call
+    candidates = [
+        index for index, current in enumerate(current_seals)
+        if current is not None and context.matches(current[1])
+    ]
+    try:
+        verdicts = context.verify_many(
+            [nodes_to_seal[index][2] for index in candidates],
+            [current_seals[index][1] for index in candidates],
+        ) if candidates else []
+    except Exception as e:
+        raise RuntimeError(f"Failed to verify signature: {e}")
+
+    kept = set()
+    for index, valid in zip(candidates, verdicts):
+        if valid:
+            kept.add(index)
+            lines_to_remove.discard(current_seals[index][0])
+
+    # Sign every definition whose seal is missing or outdated in a single parallel call
+    to_sign = [index for index in range(len(nodes_to_seal)) if index not in kept]
+    try:
+        signatures = context.seal_many([nodes_to_seal[index][2] for index in to_sign]) if to_sign else []
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate signature: {e}")
+
+    # Lines to insert before each original line (len(lines) appends at the end)
+    insertions = {}
+    for index, signature in zip(to_sign, signatures):
+        line_idx, col_offset, _ = nodes_to_seal[index]
+        insertions[line_idx] = [f"{' ' * col_offset}@pysealer._{signature}()"]
+
+    # Add 'import pysealer' at the top if not present; it goes before any decorator
+    # inserted at the same line
+    import_edit = _import_insertion(tree, lines, lines_to_remove)
+    if import_edit is not None:
+        insert_at, blank_line = import_edit
+        # Add blank line after import if the next line isn't blank
+        if blank_line and (insert_at in insertions or (insert_at < len(lines) and lines[insert_at].strip() != '')):
+            import_lines = ['import pysealer', '']
+        else:
+            import_lines = ['import pysealer']
+        insertions[insert_at] = import_lines + insertions.get(insert_at, [])
 
-        # Get the source lines for this node
-        source_lines = lines[start_line:end_line]
+    resealed = sum(1 for index in to_sign if previously_sealed[index])
+    if insertions or lines_to_remove:
+        modified_code = _apply_edits(lines, lines_to_remove, insertions)
+    else:
+        modified_code = content
+    changed = modified_code != content
+    return modified_code, LockResult(changed, len(to_sign) - resealed, resealed, len(kept))
 
-        # Filter out pysealer decorator lines
-        filtered_lines = []
-        for line in source_lines:
-            stripped = line.strip()
-            # Skip lines that are pysealer decorators
-            if stripped.startswith('@pysealer.') or stripped.startswith('@pysealer'):
-                continue
-            filtered_lines.append(line)
 
-        function_source = '\n'.join(filtered_lines)
+def _current_seal(definition: Definition, lines: List[str]) -> Optional[Tuple[int, str]]:
+    """
+    Find the seal a definition is currently locked with.
 
-        try:
-            private_key = get_private_key()
-        except (FileNotFoundError, ValueError) as e:
-            raise RuntimeError(f"Cannot add decorators: {e}. Please run 'pysealer init' first.")
+    Returns:
+        Tuple of (0-indexed decorator line, seal) when the definition carries exactly one
+        pysealer decorator and it is a @pysealer._<seal>() line, None otherwise
+    """
+    decorators = [decorator for decorator in definition.decorators if is_pysealer_decorator(decorator)]
+    if len(decorators) != 1:
+        return None
+    seal = seal_signature(decorators[0])
+    line = decorators[0].line - 1
+    if seal is None or not lines[line].strip().startswith(f"@pysealer._{seal}("):
+        return None
+    return line, seal
 
-        try:
-            signature = generate_signature(function_source, private_key)
-        except Exception as e:
-            raise RuntimeError(f"Failed to generate signature: {e}")
 
-        decorator_line = node.lineno - 1
-        if hasattr(node, 'decorator_list') and node.decorator_list:
-            decorator_line = node.decorator_list[0].lineno - 1
+def _import_insertion(tree: ast.Module, lines: List[str], lines_to_remove: Set[int]) -> Optional[Tuple[int, bool]]:
+    """
+    Find where 'import pysealer' has to be inserted.
 
-        decorators_to_add.append((decorator_line, node.col_offset, signature))
+    Args:
+        tree: Parsed module
+        lines: Original source lines
+        lines_to_remove: Lines (0-indexed) that are dropped from the output
 
-    # If no decorators to add, return original content
-    if not decorators_to_add:
-        return content, False
-
-    # Sort in reverse order to add from bottom to top (preserves line numbers)
-    decorators_to_add.sort(reverse=True)
-
-    # Add decorators to the lines first
-    for line_idx, col_offset, signature in decorators_to_add:
-        indent = ' ' * col_offset
-        decorator_line = f"{indent}@pysealer._{signature}()"
-        lines.insert(line_idx, decorator_line)
-
-    # Now add 'import pysealer' at the top if not present
-    has_import_pysealer = any(
-        line.strip() == 'import pysealer' or line.strip().startswith('import pysealer') or line.strip().startswith('from pysealer')
-        for line in lines
-    )
-    if not has_import_pysealer:
-        # Find the import block
-        import_indices = [i for i, line in enumerate(lines) if line.strip().startswith('import ') or line.strip().startswith('from ')]
-        if import_indices:
-            # Insert after the last import in the block
-            last_import = import_indices[-1]
-            lines.insert(last_import + 1, 'import pysealer')
-        else:
-            # No import block found, insert after shebang/docstring/comments
-            insert_at = 0
-            if lines and lines[0].startswith('#!'):
-                insert_at = 1
-            # Skip module-level docstrings and blank lines
-            while insert_at < len(lines):
-                line = lines[insert_at].strip()
-                if line == '':
+    Returns:
+        None if pysealer is already imported, otherwise a tuple of (original line to
+        insert before, whether a blank line should follow the import)
+    """
+    for node, _ in walk_statements(tree):
+        if isinstance(node, ast.Import) and any(alias.name.startswith('pysealer') for alias in node.names):
+            return None
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module and node.module.startswith('pysealer'):
+            return None
+
+    # Insert after the last import of the module-level import block
+    top_level_imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    if top_level_imports:
+        last_import = top_level_imports[-1]
+        return (last_import.end_lineno or last_import.lineno), False
+
+    # No import block found, insert after shebang/docstring/comments
+    insert_at = 0
+    if lines and lines[0].startswith('#!'):
+        insert_at = 1
+    # Skip module-level docstrings and blank lines
+    while insert_at < len(lines):
+        line = lines[insert_at].strip()
+        if insert_at in lines_to_remove or line == '':
+            insert_at += 1
+        elif line.startswith('"""') or line.startswith("'''"):
+            # Handle multi-line docstrings
+            quote = '"""' if line.startswith('"""') else "'''"
+            # Check if docstring ends on same line
+            if line.count(quote) >= 2:
+                insert_at += 1
+            else:
+                # Multi-line docstring
+                insert_at += 1
+                while insert_at < len(lines) and quote not in lines[insert_at]:
                     insert_at += 1
-                elif line.startswith('"""') or line.startswith("'''"):
-                    # Handle multi-line docstrings
-                    quote = '"""' if line.startswith('"""') else "'''"
-                    # Check if docstring ends on same line
-                    if line.count(quote) >= 2:
-                        insert_at += 1
-                    else:
-                        # Multi-line docstring
-                        insert_at += 1
-                        while insert_at < len(lines) and quote not in lines[insert_at]:
-                            insert_at += 1
-                        if insert_at < len(lines):
-                            insert_at += 1
-                elif line.startswith('#'):
-                    # Skip comments
+                if insert_at < len(lines):
                     insert_at += 1
-                else:
-                    # Found first non-blank, non-comment, non-docstring line
-                    break
+        elif line.startswith('#'):
+            # Skip comments
+            insert_at += 1
+        else:
+            # Found first non-blank, non-comment, non-docstring line
+            break
 
-            lines.insert(insert_at, 'import pysealer')
-            # Add blank line after import if the next line isn't blank
-            if insert_at + 1 < len(lines) and lines[insert_at + 1].strip() != '':
-                lines.insert(insert_at + 1, '')
+    return insert_at, True
 
-    # Join lines back together
-    modified_code = '\n'.join(lines)
 
-    return modified_code, True
+def _apply_edits(lines: List[str], lines_to_remove: Set[int], insertions: Dict[int, List[str]]) -> str:
+    """
+    Apply line removals and insertions in a single pass over the original lines.
 
+    Args:
+        lines: Original source lines
+        lines_to_remove: Lines (0-indexed) to drop
+        insertions: Lines to insert before each original line, keyed by its index
+            (len(lines) appends at the end)
 
-def add_decorators_to_folder(folder_path: str) -> list[str]:
+    Returns:
+        The rewritten source
+    """
+    output = []
+    for index, line in enumerate(lines):
+        if index in insertions:
+            output.extend(insertions[index])
+        if index not in lines_to_remove:
+            output.append(line)
+    output.extend(insertions.get(len(lines), []))
+    return '\n'.join(output)
+
+
+def _lock_one(file_path: str, prehash: bool, encoding: str, context: Optional[SigningContext]) -> Tuple[Optional[LockResult], Optional[str]]:
+    """Lock one file of a folder, returning (result, None) or (None, error message)."""
+    try:
+        return lock_file(file_path, prehash=prehash, encoding=encoding, context=context), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _init_lock_worker(private_key: Optional[str], prehash: bool, encoding: str) -> None:
+    """
+    Decode the private key once in a lock worker process.
+
+    Without a usable key the worker's files load it themselves and report the error.
+    """
+    global _worker_context, _worker_options
+    _worker_options = (prehash, encoding)
+    try:
+        _worker_context = SigningContext(_decode_signing_key(private_key), prehash, encoding) if private_key else None
+    except RuntimeError:
+        _worker_context = None
+
+
+def _lock_worker(file_path: str) -> Tuple[Optional[LockResult], Optional[str]]:
+    """Lock one file in a worker process with the context set up by _init_lock_worker."""
+    prehash, encoding = _worker_options
+    return _lock_one(file_path, prehash, encoding, _worker_context)
+
+
+def add_decorators_to_folder(
+    folder_path: str,
+    jobs: int = 1,
+    prehash: bool = False,
+    encoding: str = "base58",
+    context: Optional[SigningContext] = None,
+    exclude: Optional[Sequence[str]] = None,
+    include: Optional[Sequence[str]] = None,
+    threads: bool = False,
+) -> Dict[str, LockResult]:
     """
     Add decorators to all Python files in a folder.
-    
+
+    Files are found with walk_python_files, which skips git-ignored files and excluded
+    directories such as virtualenvs. In the calling process files are locked as they
+    are found; with more than one job they are locked on a pool of worker processes
+    (see pysealer.parallel), and each worker decodes the private key once.
+
     Args:
         folder_path: Path to the folder containing Python files
-        
+        jobs: Number of worker processes (0 for one per CPU core when there are enough
+            files to pay for starting them, see plan_workers; 1 locks the files in the
+            calling process)
+        prehash: Seal digests with Ed25519ph instead of the full source text
+        encoding: Signature encoding, "base58" or "hex"
+        context: Signing context to use for every file; when omitted one is loaded once
+            with prehash and encoding. A given context is used in the calling process only.
+        exclude: Patterns of the files and directories to skip (defaults to
+            walk.DEFAULT_EXCLUDES)
+        include: Patterns of the files to lock (defaults to "*.py")
+        threads: Lock the files on a pool of jobs threads sharing one signing context
+            instead of worker processes (see add_decorators_to_files)
+
     Returns:
-        List of file paths where decorators were successfully added
+        Dictionary mapping the path of every file with functions or classes to its
+        LockResult, in folder order; only files whose content changed are written
     """
     folder = Path(folder_path)
 
@@ -201,27 +453,87 @@ def add_decorators_to_folder(folder_path: str) -> list[str]:
     if not folder.is_dir():
         raise NotADirectoryError(f"'{folder_path}' is not a directory.")
 
-    # Find all Python files in the folder (recursive)
-    python_files = list(folder.rglob('*.py'))
+    python_files = walk_python_files(str(folder), include=include, exclude=exclude)
+    first_file = next(python_files, None)
 
-    if not python_files:
+    if first_file is None:
         raise ValueError(f"No Python files found in '{folder_path}'.")
 
-    decorated_files = []
-    errors = []
+    return add_decorators_to_files(
+        itertools.chain([first_file], python_files), jobs=jobs, prehash=prehash, encoding=encoding, context=context, threads=threads
+    )
 
-    for py_file in python_files:
+
+def add_decorators_to_files(
+    file_paths: Iterable[str],
+    jobs: int = 1,
+    prehash: bool = False,
+    encoding: str = "base58",
+    context: Optional[SigningContext] = None,
+    threads: bool = False,
+) -> Dict[str, LockResult]:
+    """
+    Add decorators to the given Python files, sharing the key and the workers across all of them.
+
+    Args:
+        file_paths: Paths of the Python files to lock; an iterator is consumed as the
+            files are locked when they are locked in the calling process
+        jobs: Number of worker processes (0 for one per CPU core when there are enough
+            files to pay for starting them, see plan_workers; 1 locks the files in the
+            calling process)
+        prehash: Seal digests with Ed25519ph instead of the full source text
+        encoding: Signature encoding, "base58" or "hex"
+        context: Signing context to use for every file; when omitted one is loaded once
+            with prehash and encoding. A given context is used in the calling process only.
+        threads: Lock the files on a pool of jobs threads (0 for one per CPU core) that
+            share one signing context, instead of worker processes. Signing releases the
+            GIL, so this suits embedders that cannot spawn processes or already hold a
+            context.
+
+    Returns:
+        Dictionary mapping the path of every file with functions or classes to its
+        LockResult, in the order of file_paths; only files whose content changed are written
+    """
+    python_files = map(str, file_paths)
+
+    workers = 1
+    if threads:
+        python_files = list(python_files)
+        workers = resolve_jobs(jobs)
+    elif context is None:
+        # The pool needs every file up front to hand out the largest ones first
+        workers, python_files = plan_workers(jobs, python_files)
+
+    if workers > 1 and not threads:
+        # Hand the key to every worker once. Without a usable key every file that
+        # needs sealing reports the error below.
         try:
-            modified_code, has_changes = add_decorators(str(py_file))
-            if has_changes:
-                with open(py_file, 'w') as f:
-                    f.write(modified_code)
-                decorated_files.append(str(py_file))
-        except Exception as e:
-            errors.append((str(py_file), str(e)))
+            private_key = _read_private_key()
+        except RuntimeError:
+            private_key = None
+        outcomes = zip(python_files, run_in_processes(_lock_worker, python_files, workers, _init_lock_worker, (private_key, prehash, encoding)))
+    else:
+        # Load the key once for all files (and threads)
+        if context is None:
+            try:
+                context = SigningContext.load(prehash=prehash, encoding=encoding)
+            except RuntimeError:
+                context = None
+        if workers > 1:
+            outcomes = zip(python_files, run_in_threads(lambda py_file: _lock_one(py_file, prehash, encoding, context), python_files, workers))
+        else:
+            outcomes = ((py_file, _lock_one(py_file, prehash, encoding, context)) for py_file in python_files)
+
+    results = {}
+    errors = []
+    for py_file, (result, error) in outcomes:
+        if error is not None:
+            errors.append((py_file, error))
+        elif result.new or result.resealed or result.kept:
+            results[py_file] = result
 
     if errors:
         error_msg = "\n".join([f"  - {file}: {error}" for file, error in errors])
         raise RuntimeError(f"Failed to decorate some files:\n{error_msg}")
 
-    return decorated_files
+    return results
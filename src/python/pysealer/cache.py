@@ -0,0 +1,483 @@
+"""On-disk cache of the verdicts of `pysealer check`.
+
+Checking a folder records, for every file, the verdict of each of its definitions.
+A later check reuses them for files that are unchanged and were checked with the same
+public key, so only new and modified files are read, scanned and verified again.
+
+A file counts as unchanged only when its size and content hash match the cached
+entry. The modification time is recorded too, but a matching one is never trusted on
+its own: a same-size edit followed by restoring the old timestamp would otherwise get
+the cached verdict, and hashing a file costs far less than scanning and verifying it.
+
+The cache lives in $PYSEALER_CACHE_DIR, or $XDG_CACHE_HOME/pysealer (~/.cache/pysealer
+by default), as one JSON file per checked folder and public key. Files are replaced
+atomically, so concurrent runs never see a partly written cache; when two runs save
+at the same time the last one wins.
+
+A fresh checkout (as on a CI runner) has new modification times everywhere, so the
+folder cache never hits there. BlobCache instead keys verdicts by the git blob id of
+each tracked file and lives in a single compressed file chosen by the caller, which CI
+can save and restore between jobs. Blob ids come from the index in one `git ls-files`
+call; untracked files and files modified since they were staged are always checked.
+Whoever can write the CI cache can write that file, so it is authenticated with an
+HMAC keyed by $PYSEALER_CACHE_KEY (a CI secret), or else by a random key kept in the
+cache directory; a file that fails the check is ignored. Entries unused for
+MAX_BLOB_AGE_SECONDS are dropped, and at most MAX_BLOB_ENTRIES are kept.
+"""
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import __version__
+
+# Format of the cache files; bump when the entries change shape
+CACHE_FORMAT = 1
+
+# Format of blob cache files; bump when the entries change shape
+BLOB_CACHE_FORMAT = 2
+
+# Index modes of regular files (symlinks and submodules are never cached)
+_REGULAR_FILE_MODES = ("100644", "100755")
+
+# Cache files kept in the cache directory; the least recently used are removed first
+MAX_CACHE_FILES = 64
+
+# Blob cache entries not used for this long are dropped on save
+MAX_BLOB_AGE_SECONDS = 30 * 24 * 3600
+
+# Blob cache entries kept on save; the least recently used are dropped first
+MAX_BLOB_ENTRIES = 50_000
+
+# A hit refreshes the last use of a blob cache entry at most this often, so that runs
+# hitting every entry do not rewrite the file
+_BLOB_REFRESH_SECONDS = 24 * 3600
+
+# Entries of files modified less than this long before they were checked are always
+# confirmed by hash
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Leftover temporary files of interrupted saves older than this are removed
+_STALE_TEMP_SECONDS = 3600
+
+# Compact verdicts of one file: (name, line_start, line_end, seal, valid) per definition
+Verdicts = List[Tuple[str, int, int, Optional[str], bool]]
+
+
+def cache_dir() -> Path:
+    """Directory holding the cache files."""
+    configured = os.environ.get("PYSEALER_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base / "pysealer"
+
+
+def key_fingerprint(public_key: str) -> str:
+    """Short fingerprint identifying a public key."""
+    return hashlib.sha256(public_key.encode()).hexdigest()[:16]
+
+
+def content_hash(data: bytes) -> str:
+    """Hash of a file's content."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def blob_cache_key() -> Optional[bytes]:
+    """
+    Secret key authenticating blob cache files.
+
+    This is $PYSEALER_CACHE_KEY when set, otherwise a random key created on first use
+    in the cache directory. Either way it is kept apart from the blob cache file, so
+    replacing that file cannot forge verdicts.
+
+    Returns:
+        The key, or None if it is not configured and the key file cannot be read or created
+    """
+    configured = os.environ.get("PYSEALER_CACHE_KEY")
+    if configured:
+        return configured.encode()
+    path = cache_dir() / "blob-cache.key"
+    try:
+        return path.read_bytes() or None
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return None
+    key = os.urandom(32)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp creates the file readable by its owner only; linking fails if a
+        # concurrent run created the key first, and that key wins
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".blob-cache-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key)
+            os.link(temp_path, path)
+        finally:
+            os.unlink(temp_path)
+    except FileExistsError:
+        try:
+            return path.read_bytes() or None
+        except OSError:
+            return None
+    except OSError:
+        return None
+    return key
+
+
+def _stamp(file_path: str) -> Optional[Tuple[int, int, str]]:
+    """
+    Read a file's (size, modification time, content hash).
+
+    The modification time is recorded as -1 when it is too recent to be trusted.
+    Returns None if the file cannot be read.
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(file_path, 'rb') as f:
+            digest = content_hash(f.read())
+    except OSError:
+        return None
+    return stat.st_size, _trusted_mtime(stat), digest
+
+
+def _trusted_mtime(stat: os.stat_result) -> int:
+    """The modification time of a file, or -1 if it changed too recently to be trusted."""
+    if time.time_ns() - stat.st_mtime_ns < _RACY_WINDOW_NS:
+        return -1
+    return stat.st_mtime_ns
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    """
+    Replace a file with new content so that readers see either the old or new file.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def git_blob_ids(folder: str) -> Dict[str, str]:
+    """
+    Read the blob ids of the files of a folder that are unchanged in the git index.
+
+    Files that are untracked, conflicted, symlinks or modified in the working tree since
+    they were staged are left out, since their blob id does not describe their content.
+
+    Args:
+        folder: Folder inside a git work tree
+
+    Returns:
+        Dictionary mapping normalized file paths (joined onto folder) to blob ids; empty
+        if the folder is not in a git work tree or git is not installed
+    """
+    def ls_files(*options: str) -> Optional[List[str]]:
+        try:
+            result = subprocess.run(
+                ["git", "ls-files", "-z", *options, "--", "."],
+                cwd=folder,
+                capture_output=True,
+                timeout=60,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode("utf-8", "surrogateescape").split("\0")[:-1]
+
+    staged = ls_files("--stage")
+    modified = ls_files("--modified")
+    if staged is None or modified is None:
+        return {}
+
+    modified_paths = set(modified)
+    blob_ids = {}
+    for line in staged:
+        info, _, relative_path = line.partition("\t")
+        mode, blob_id, stage = info.split(" ")
+        if stage != "0" or mode not in _REGULAR_FILE_MODES or relative_path in modified_paths:
+            continue
+        blob_ids[os.path.normpath(os.path.join(folder, relative_path))] = blob_id
+    return blob_ids
+
+
+class VerdictCache:
+    """
+    Cached verdicts of the files of one folder checked with one public key.
+
+    Call get() for every file of the run, put() for every file checked afresh, then
+    save(). Entries of files that were not part of the run are dropped on save, unless
+    the run only covers some files of the folder.
+    """
+
+    def __init__(self, folder: str, public_key: str, directory: Optional[Path] = None, partial: bool = False):
+        """
+        Args:
+            folder: Folder being checked
+            public_key: Base58 public key the seals are verified with
+            directory: Cache directory (defaults to cache_dir())
+            partial: Whether the run checks only some files of the folder, in which case
+                the entries of the other files are kept on save
+        """
+        self.directory = Path(directory) if directory is not None else cache_dir()
+        self.partial = partial
+        name = hashlib.sha256(f"{os.path.abspath(folder)}\0{public_key}".encode()).hexdigest()[:16]
+        self.path = self.directory / f"check-{name}.json"
+        self.fingerprint = key_fingerprint(public_key)
+        self._entries = self._load()
+        # Entries written back on save: every file found unchanged or checked in this run
+        self._current: Dict[str, list] = {}
+        # (size, mtime, hash) of files that missed, taken before they were checked
+        self._pending: Dict[str, Optional[Tuple[int, int, str]]] = {}
+        # Whether an entry was added or refreshed in this run
+        self._modified = False
+
+    def _load(self) -> Dict[str, list]:
+        """Load the cache file, ignoring it if it is missing, damaged or stale."""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != CACHE_FORMAT
+            or data.get("pysealer") != __version__
+            or data.get("key") != self.fingerprint
+            or not isinstance(data.get("files"), dict)
+        ):
+            return {}
+        return data["files"]
+
+    def get(self, file_path: str) -> Optional[Verdicts]:
+        """
+        Return the cached verdicts of a file if it is unchanged since it was cached.
+
+        Args:
+            file_path: Path of the file, as reported by the check
+
+        Returns:
+            The cached verdicts, or None if the file has to be checked again
+        """
+        stamp = _stamp(file_path)
+        self._pending[file_path] = stamp
+        entry = self._entries.get(file_path)
+        if entry is None or stamp is None:
+            return None
+        try:
+            size, mtime_ns, digest, verdicts = entry
+        except (TypeError, ValueError):
+            return None
+
+        # Unchanged only if the content still hashes the same, whatever the timestamps say
+        if stamp[0] != size or stamp[2] != digest:
+            return None
+        if stamp[1] == mtime_ns and mtime_ns != -1:
+            self._current[file_path] = entry
+        else:
+            # Touched (or racily clean) but unchanged: refresh the recorded modification time
+            self._current[file_path] = [stamp[0], stamp[1], digest, verdicts]
+            self._modified = True
+        return [tuple(verdict) for verdict in verdicts]
+
+    def put(self, file_path: str, verdicts: Verdicts) -> None:
+        """
+        Record the verdicts of a file checked in this run.
+
+        The entry is keyed by the size, modification time and hash taken by get()
+        before the file was checked, so an edit made during the check is never cached.
+        """
+        stamp = self._pending.pop(file_path, None)
+        if stamp is None:
+            return
+        size, mtime_ns, digest = stamp
+        self._current[file_path] = [size, mtime_ns, digest, [list(verdict) for verdict in verdicts]]
+        self._modified = True
+
+    def save(self) -> None:
+        """
+        Atomically write the entries of this run and evict old cache files.
+
+        When every file hit an unchanged entry the cache file is only touched, which
+        keeps it from being evicted. Errors are ignored.
+        """
+        files = self._current
+        if self.partial:
+            # Keep the entries of files outside the run; those that missed and were not put are dropped
+            files = {
+                file_path: entry for file_path, entry in self._entries.items()
+                if file_path not in self._pending
+            }
+            files.update(self._current)
+        if not self._modified and files.keys() == self._entries.keys():
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+            return
+        data = {
+            "format": CACHE_FORMAT,
+            "pysealer": __version__,
+            "key": self.fingerprint,
+            "files": files,
+        }
+        try:
+            _write_atomically(self.path, json.dumps(data, separators=(',', ':')).encode())
+        except OSError:
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used cache files beyond MAX_CACHE_FILES and stale temporary files."""
+        try:
+            cache_files = []
+            now = time.time()
+            for entry in os.scandir(self.directory):
+                if entry.name.startswith("check-") and entry.name.endswith(".json"):
+                    cache_files.append((entry.stat().st_mtime, entry.path))
+                elif entry.name.startswith(".check-") and entry.name.endswith(".tmp"):
+                    if now - entry.stat().st_mtime > _STALE_TEMP_SECONDS:
+                        os.unlink(entry.path)
+            cache_files.sort(reverse=True)
+            for _, path in cache_files[MAX_CACHE_FILES:]:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+class BlobCache:
+    """
+    Cached verdicts of git blobs checked with one public key, stored in a portable file.
+
+    Used like VerdictCache: get() for every file of the run, put() for every file checked
+    afresh, then save(). Entries of blobs that were not part of the run are kept until
+    they age out, so one file can serve several branches. Every entry records when it
+    was last used.
+    """
+
+    def __init__(self, folder: str, public_key: str, path: str):
+        """
+        Args:
+            folder: Folder being checked
+            public_key: Base58 public key the seals are verified with
+            path: Cache file, created on save if it does not exist
+        """
+        self.path = Path(path)
+        self.fingerprint = key_fingerprint(public_key)
+        self._key = blob_cache_key()
+        self._blob_ids = git_blob_ids(folder) if self._key is not None else {}
+        self._entries = self._load()
+        # Whether an entry was added or its last use refreshed in this run
+        self._modified = False
+
+    def _load(self) -> Dict[str, list]:
+        """Load the cache file, ignoring it if it is missing, damaged, stale or not authentic."""
+        if self._key is None:
+            return {}
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                mac, _, body = f.read().partition(b"\n")
+        except (OSError, EOFError):
+            return {}
+        if not hmac.compare_digest(mac, self._mac(body).encode()):
+            return {}
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != BLOB_CACHE_FORMAT
+            or data.get("pysealer") != __version__
+            or data.get("key") != self.fingerprint
+            or not isinstance(data.get("blobs"), dict)
+        ):
+            return {}
+        return data["blobs"]
+
+    def _mac(self, body: bytes) -> str:
+        """HMAC of the serialized cache body."""
+        return hmac.new(self._key, body, hashlib.sha256).hexdigest()
+
+    def get(self, file_path: str) -> Optional[Verdicts]:
+        """
+        Return the cached verdicts of a file if its blob was checked before.
+
+        Args:
+            file_path: Path of the file, as reported by the check
+
+        Returns:
+            The cached verdicts, or None if the file has to be checked
+        """
+        blob_id = self._blob_ids.get(os.path.normpath(file_path))
+        if blob_id is None:
+            return None
+        entry = self._entries.get(blob_id)
+        try:
+            last_used, verdicts = entry
+            verdicts = [tuple(verdict) for verdict in verdicts]
+        except (TypeError, ValueError):
+            return None
+        now = int(time.time())
+        if not isinstance(last_used, int) or now - last_used > MAX_BLOB_AGE_SECONDS:
+            return None
+        if now - last_used > _BLOB_REFRESH_SECONDS:
+            entry[0] = now
+            self._modified = True
+        return verdicts
+
+    def put(self, file_path: str, verdicts: Verdicts) -> None:
+        """Record the verdicts of a file checked in this run, if its blob id is known."""
+        blob_id = self._blob_ids.get(os.path.normpath(file_path))
+        if blob_id is None:
+            return
+        self._entries[blob_id] = [int(time.time()), [list(verdict) for verdict in verdicts]]
+        self._modified = True
+
+    def save(self) -> None:
+        """
+        Atomically write the cache file if an entry was added or refreshed, dropping
+        entries that aged out and the least recently used beyond MAX_BLOB_ENTRIES.
+        Errors are ignored.
+        """
+        if not self._modified:
+            return
+        now = int(time.time())
+        entries = sorted(
+            (
+                (entry[0], blob_id, entry) for blob_id, entry in self._entries.items()
+                if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], int)
+                and now - entry[0] <= MAX_BLOB_AGE_SECONDS
+            ),
+            reverse=True,
+        )
+        data = {
+            "format": BLOB_CACHE_FORMAT,
+            "pysealer": __version__,
+            "key": self.fingerprint,
+            "blobs": {blob_id: entry for _, blob_id, entry in entries[:MAX_BLOB_ENTRIES]},
+        }
+        body = json.dumps(data, separators=(',', ':')).encode()
+        payload = gzip.compress(self._mac(body).encode() + b"\n" + body, mtime=0)
+        try:
+            _write_atomically(self.path, payload)
+        except OSError:
+            pass
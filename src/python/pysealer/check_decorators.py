@@ -1,23 +1,280 @@
 """Automatically verify cryptographic decorators for all functions and classes in a python file."""
 
-import ast
+import os
 from pathlib import Path
-from typing import Dict
-from pysealer import verify_signature
-from .setup import get_public_key
-from .git_diff import get_function_diff, is_git_available
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from pysealer import VerifyingKey, check_files
+from .cache import BlobCache, VerdictCache
+from .setup import env_file_stamp, get_public_key
+from .parallel import run_in_processes, run_in_threads
+from .scanner import read_source_if_sealed, scan_definitions, seal_signature
+from .git_diff import GitObjectReader, get_file_diffs
+from .walk import walk_python_files
+
+# Last public key loaded in this process, with the source it was read from (see
+# _public_key_source); reused until the source changes
+_cached_public_key: Optional[Tuple[tuple, str]] = None
+# Last public key decoded in this process, with its Base58 text
+_cached_verifying_key: Optional[Tuple[str, VerifyingKey]] = None
+
+# Verifying key (or key error) of a check worker process, set up once by _init_check_worker
+_worker_verifying_key: Optional[VerifyingKey] = None
+_worker_key_error: Optional[str] = None
+
+
+def _public_key_source() -> tuple:
+    """Identify where get_public_key reads the key from: the environment or the current .env file."""
+    from_environment = os.getenv("PYSEALER_PUBLIC_KEY")
+    if from_environment:
+        return ("environment", from_environment)
+    return ("file", env_file_stamp())
+
+
+def _load_public_key() -> str:
+    """
+    Load the public key, reusing the last one loaded while its source is unchanged.
+
+    Returns:
+        Base58 public key
+
+    Raises:
+        FileNotFoundError, ValueError: If no public key is configured
+    """
+    global _cached_public_key
+    source = _public_key_source()
+    if _cached_public_key is None or _cached_public_key[0] != source:
+        _cached_public_key = (source, get_public_key())
+    return _cached_public_key[1]
+
+
+def _load_verifying_key() -> VerifyingKey:
+    """
+    Load the public key and decode it into a reusable verifying key.
+
+    The decoded key is reused while the public key is unchanged.
+
+    Returns:
+        VerifyingKey handle that can verify any number of signatures
+    """
+    global _cached_verifying_key
+    try:
+        public_key = _load_public_key()
+    except (FileNotFoundError, ValueError) as e:
+        raise RuntimeError(f"Cannot verify decorators: {e}")
+
+    if _cached_verifying_key is not None and _cached_verifying_key[0] == public_key:
+        return _cached_verifying_key[1]
+
+    try:
+        verifying_key = VerifyingKey.from_base58(public_key)
+    except ValueError as e:
+        raise RuntimeError(f"Cannot verify decorators: invalid public key ({e})")
+    _cached_verifying_key = (public_key, verifying_key)
+    return verifying_key
+
+
+def _collect_decorators(file_path: str) -> Tuple[Dict[str, dict], List[Tuple[str, dict]]]:
+    """
+    Parse a Python file and collect every pysealer decorator that needs verification.
+
+    Args:
+        file_path: Path to the Python file to inspect
+
+    Returns:
+        Tuple of (results dictionary with unverified entries, list of (name, result) pairs
+        whose "source" and "signature" still have to be verified)
+    """
+    # Files without the marker can't hold a seal, so they are not decoded or parsed
+    content = read_source_if_sealed(file_path)
+    if content is None:
+        return {}, []
+
+    # Locate every definition and its decorators
+    definitions = scan_definitions(content)
+    content_lines = content.split('\n')
+
+    # Dictionary to store results
+    results = {}
+    pending = []
+
+    for definition in definitions:
+        name = definition.name
+
+        # Look for pysealer decorator (e.g., @pysealer._<signature>())
+        signature_from_decorator = None
+        has_pysealer_decorator = False
+        for decorator in definition.decorators:
+            signature = seal_signature(decorator)
+            if signature is not None:
+                signature_from_decorator = signature
+                has_pysealer_decorator = True
+                break
+
+        # Initialize result for this function/class
+        result = {
+            "has_decorator": has_pysealer_decorator,
+            "valid": False,
+            "signature": signature_from_decorator,
+            "message": "",
+            "line_start": definition.line_start,
+            "line_end": definition.line_end,
+            "source": "",
+            "diff": None
+        }
+
+        if not has_pysealer_decorator:
+            result["message"] = "No pysealer decorator found"
+            results[name] = result
+            continue
+
+        # Extract the source code without pysealer decorators for verification
+        # Use original source to preserve formatting (quotes, spacing, etc.)
+        start_line = definition.line_start - 1
+        end_line = result["line_end"]
+
+        # Get the source lines for this definition
+        source_lines = content_lines[start_line:end_line]
+
+        # Filter out pysealer decorator lines
+        filtered_lines = []
+        for line in source_lines:
+            stripped = line.strip()
+            # Skip lines that are pysealer decorators
+            if stripped.startswith('@pysealer.') or stripped.startswith('@pysealer'):
+                continue
+            filtered_lines.append(line)
+
+        # Store the source code
+        result["source"] = '\n'.join(filtered_lines)
+
+        results[name] = result
+        pending.append((name, result))
+
+    return results, pending
+
+
+def _verify_pending(verifying_key: VerifyingKey, pending: List[Tuple[str, dict]]) -> List[bool]:
+    """
+    Verify every collected (source, signature) pair with a single batch call.
+
+    Args:
+        verifying_key: Decoded public key used for every signature
+        pending: List of (name, result) pairs returned by _collect_decorators
+
+    Returns:
+        List of verdicts in the same order as pending
+    """
+    if not pending:
+        return []
+    sources = [result["source"] for _, result in pending]
+    signatures = [result["signature"] for _, result in pending]
+    return verifying_key.verify_many(sources, signatures)
+
+
+def _apply_verdicts(pending: List[Tuple[str, dict]], verdicts: List[bool]) -> None:
+    """
+    Record verification verdicts on the collected results.
+
+    Args:
+        pending: List of (name, result) pairs returned by _collect_decorators
+        verdicts: Verdicts returned by _verify_pending for these pairs
+    """
+    for (_, result), is_valid in zip(pending, verdicts):
+        result["valid"] = is_valid
+        if is_valid:
+            result["message"] = "✓ Signature valid - code has not been tampered with"
+        else:
+            result["message"] = "✗ Signature invalid - code may have been modified"
+
+
+def attach_diffs(
+    file_path: str,
+    results: Dict[str, dict],
+    git_reader: Optional[GitObjectReader] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Look up the git diffs of the invalid decorators of a checked file.
+
+    Checks leave "diff" empty so that callers that only need the verdicts never run
+    git; call this for the files whose diffs are shown. The file is diffed once per
+    candidate ref for all of its invalid definitions.
+
+    Args:
+        file_path: Path to the Python file the results belong to
+        results: Results of check_decorators for the file, updated in place
+        git_reader: Reader shared by every diff of the run (a temporary one if omitted)
+        limit: Look up at most this many diffs (all if None)
+
+    Returns:
+        Number of invalid definitions whose diff was looked up
+    """
+    if "error" in results:
+        return 0
+    failed = [
+        result for result in results.values()
+        if result["has_decorator"] and not result["valid"] and result.get("diff") is None
+    ]
+    if limit is not None:
+        failed = failed[:max(limit, 0)]
+    if not failed:
+        return 0
+
+    try:
+        diffs = get_file_diffs(
+            file_path,
+            [(result["line_start"], result["line_end"]) for result in failed],
+            reader=git_reader
+        )
+    except Exception:
+        # If git diff fails, just continue without it
+        return len(failed)
+    for result in failed:
+        diff = diffs.get((result["line_start"], result["line_end"]))
+        if diff:
+            result["diff"] = diff
+    return len(failed)
+
+
+def _record_verify_error(pending: List[Tuple[str, dict]], error: Exception) -> None:
+    """Mark every collected result as failed because verification itself raised."""
+    for _, result in pending:
+        result["valid"] = False
+        result["message"] = f"✗ Error verifying signature: {error}"
+
+
+def _finish_check(results: Dict[str, dict], pending: List[Tuple[str, dict]], verifying_key: VerifyingKey) -> Dict[str, dict]:
+    """
+    Verify the collected decorators of one file and record the verdicts on its results.
+
+    Args:
+        results: Results dictionary returned by _collect_decorators
+        pending: List of (name, result) pairs returned by _collect_decorators
+        verifying_key: Decoded public key used for every signature
+
+    Returns:
+        The completed results dictionary
+    """
+    try:
+        verdicts = _verify_pending(verifying_key, pending)
+    except Exception as e:
+        _record_verify_error(pending, e)
+        return results
+
+    _apply_verdicts(pending, verdicts)
+    return results
 
 
 def check_decorators(file_path: str) -> Dict[str, dict]:
     """
     Parse a Python file and verify all pysealer cryptographic decorators.
-    
+
     This function checks that each function/class with a pysealer decorator has a valid
     signature that matches the current source code of that function/class.
-    
+
     Args:
         file_path: Path to the Python file to verify
-        
+
     Returns:
         Dictionary mapping function/class names to their verification results:
         {
@@ -29,133 +286,264 @@ def check_decorators(file_path: str) -> Dict[str, dict]:
                 "line_start": int,       # Starting line number
                 "line_end": int,         # Ending line number
                 "source": str,           # Function source code
-                "diff": List[Tuple]      # Git diff if validation failed
+                "diff": List[Tuple]      # Git diff, once attach_diffs looked it up
             }
         }
     """
-    # Read the file content
-    with open(file_path, 'r') as f:
-        content = f.read()
+    results, pending = _collect_decorators(file_path)
+
+    # Decode the public key once for every signature in this file
+    verifying_key = _load_verifying_key()
+
+    return _finish_check(results, pending, verifying_key)
+
+
+def _check_one(file_path: str, verifying_key: Optional[VerifyingKey], key_error: Optional[str]) -> Dict[str, dict]:
+    """Check one file on its own, reporting read, parse and key errors as {"error": ...}."""
+    try:
+        results, pending = _collect_decorators(file_path)
+    except Exception as e:
+        return {"error": str(e)}
+    if not pending:
+        return results
+    if key_error:
+        return {"error": key_error}
+    return _finish_check(results, pending, verifying_key)
+
+
+def _init_check_worker(public_key: Optional[str], key_error: Optional[str]) -> None:
+    """Decode the public key once in a check worker process."""
+    global _worker_verifying_key, _worker_key_error
+    _worker_verifying_key, _worker_key_error = None, key_error
+    if public_key is None:
+        return
+    try:
+        _worker_verifying_key = VerifyingKey.from_base58(public_key)
+    except ValueError as e:
+        _worker_key_error = f"Cannot verify decorators: invalid public key ({e})"
+
+
+def _check_worker(file_path: str) -> Dict[str, dict]:
+    """Check one file in a worker process with the key set up by _init_check_worker."""
+    return _check_one(file_path, _worker_verifying_key, _worker_key_error)
+
+
+def _check_in_processes(python_files: List[Path], workers: int) -> Dict[str, Dict[str, dict]]:
+    """
+    Check every file independently on a pool of worker processes.
 
-    # Parse the Python source code into an AST
-    tree = ast.parse(content)
+    Args:
+        python_files: Python files to check
+        workers: Number of worker processes
 
-    # Get the public key for verification
+    Returns:
+        Dictionary mapping file paths to their verification results, in the order of
+        python_files
+    """
     try:
-        public_key = get_public_key()
+        public_key, key_error = _load_public_key(), None
     except (FileNotFoundError, ValueError) as e:
-        raise RuntimeError(f"Cannot verify decorators: {e}")
+        public_key, key_error = None, f"Cannot verify decorators: {e}"
 
-    # Dictionary to store results
-    results = {}
+    file_paths = [str(py_file) for py_file in python_files]
+    outcomes = run_in_processes(_check_worker, file_paths, workers, _init_check_worker, (public_key, key_error))
+    return dict(zip(file_paths, outcomes))
 
-    # Iterate through each node in the AST
-    for node in ast.walk(tree):
-        node_type = type(node).__name__
-
-        # Check if this node is a function or class definition
-        if node_type in ("FunctionDef", "AsyncFunctionDef", "ClassDef"):
-            name = node.name
-
-            # Look for pysealer decorator
-            signature_from_decorator = None
-            has_pysealer_decorator = False
-
-            if hasattr(node, 'decorator_list'):
-                for decorator in node.decorator_list:
-                    # Check if decorator is a Call node (e.g., @pysealer._<signature>())
-                    if isinstance(decorator, ast.Call):
-                        func = decorator.func
-                        # Check if it's pysealer._<signature>
-                        if isinstance(func, ast.Attribute):
-                            if isinstance(func.value, ast.Name) and func.value.id == "pysealer":
-                                attr_name = func.attr
-                                # Extract signature (remove leading underscore)
-                                if attr_name.startswith('_'):
-                                    signature_from_decorator = attr_name[1:]
-                                    has_pysealer_decorator = True
-                                    break
-
-            # Initialize result for this function/class
-            result = {
-                "has_decorator": has_pysealer_decorator,
-                "valid": False,
-                "signature": signature_from_decorator,
-                "message": "",
-                "line_start": node.lineno,
-                "line_end": node.end_lineno if hasattr(node, 'end_lineno') and node.end_lineno else node.lineno,
-                "source": "",
-                "diff": None
-            }
 
-            if not has_pysealer_decorator:
-                result["message"] = "No pysealer decorator found"
-                results[name] = result
-                continue
+def _check_in_threads(python_files: List[Path], workers: int) -> Dict[str, Dict[str, dict]]:
+    """
+    Check every file independently on a pool of threads sharing one verifying key.
 
-            # Extract the source code without pysealer decorators for verification
-            # Use original source to preserve formatting (quotes, spacing, etc.)
-            content_lines = content.split('\n')
-            start_line = node.lineno - 1
-            end_line = node.end_lineno if hasattr(node, 'end_lineno') and node.end_lineno else node.lineno
-
-            # Get the source lines for this node
-            source_lines = content_lines[start_line:end_line]
-
-            # Filter out pysealer decorator lines
-            filtered_lines = []
-            for line in source_lines:
-                stripped = line.strip()
-                # Skip lines that are pysealer decorators
-                if stripped.startswith('@pysealer.') or stripped.startswith('@pysealer'):
-                    continue
-                filtered_lines.append(line)
-
-            function_source = '\n'.join(filtered_lines)
-
-            # Store the source code
-            result["source"] = function_source
-
-            # Verify the signature
-            try:
-                is_valid = verify_signature(function_source, signature_from_decorator, public_key)
-
-                result["valid"] = is_valid
-                if is_valid:
-                    result["message"] = "✓ Signature valid - code has not been tampered with"
-                else:
-                    result["message"] = "✗ Signature invalid - code may have been modified"
-
-                    # Try to get git diff for failed validation (only if git is available)
-                    if is_git_available():
-                        try:
-                            diff = get_function_diff(
-                                file_path,
-                                name,
-                                function_source,
-                                node.lineno
-                            )
-                            if diff:
-                                result["diff"] = diff
-                        except Exception:
-                            # If git diff fails, just continue without it
-                            pass
-
-            except Exception as e:
-                result["message"] = f"✗ Error verifying signature: {e}"
+    Args:
+        python_files: Python files to check
+        workers: Number of threads
 
-            results[name] = result
+    Returns:
+        Dictionary mapping file paths to their verification results, in the order of
+        python_files
+    """
+    try:
+        verifying_key, key_error = _load_verifying_key(), None
+    except RuntimeError as e:
+        verifying_key, key_error = None, str(e)
+
+    file_paths = [str(py_file) for py_file in python_files]
+    outcomes = run_in_threads(lambda file_path: _check_one(file_path, verifying_key, key_error), file_paths, workers)
+    return dict(zip(file_paths, outcomes))
+
+
+def _check_files(python_files: List[Path], jobs: int, threads: bool = False) -> Dict[str, Dict[str, dict]]:
+    """
+    Check files with the Python engine (ast fallback).
+
+    By default every signature is verified with a single batch call. With jobs greater
+    than 1 each file is instead checked on its own on a pool of worker processes, or of
+    threads with threads set.
+
+    Args:
+        python_files: Python files to check
+        jobs: Number of workers (1 or less checks the files in the calling process)
+        threads: Use a thread pool instead of worker processes
+
+    Returns:
+        Dictionary mapping file paths to their verification results
+    """
+    if jobs > 1 and len(python_files) > 1:
+        if threads:
+            return _check_in_threads(python_files, jobs)
+        return _check_in_processes(python_files, jobs)
+
+    all_results = {}
+    # Decorators awaiting verification, grouped by file
+    pending_by_file = {}
+
+    for py_file in python_files:
+        try:
+            results, pending = _collect_decorators(str(py_file))
+            all_results[str(py_file)] = results
+            if pending:
+                pending_by_file[str(py_file)] = pending
+        except Exception as e:
+            all_results[str(py_file)] = {"error": str(e)}
+
+    if not pending_by_file:
+        return all_results
+
+    try:
+        verifying_key = _load_verifying_key()
+    except RuntimeError as e:
+        for file_path in pending_by_file:
+            all_results[file_path] = {"error": str(e)}
+        return all_results
+
+    # Verify every signature in the folder with one batch call
+    all_pending = [item for pending in pending_by_file.values() for item in pending]
+    try:
+        verdicts = _verify_pending(verifying_key, all_pending)
+    except Exception as e:
+        _record_verify_error(all_pending, e)
+        return all_results
 
+    offset = 0
+    for pending in pending_by_file.values():
+        _apply_verdicts(pending, verdicts[offset:offset + len(pending)])
+        offset += len(pending)
+
+    return all_results
+
+
+def _results_from_tree(definitions: List[tuple]) -> Dict[str, dict]:
+    """
+    Expand the compact per-file results of check_files into the results dictionary format.
+
+    The "source" of each entry is left empty because check_files does not return it.
+    """
+    results = {}
+    for name, line_start, line_end, signature, is_valid in definitions:
+        result = {
+            "has_decorator": signature is not None,
+            "valid": is_valid,
+            "signature": signature,
+            "message": "",
+            "line_start": line_start,
+            "line_end": line_end,
+            "source": "",
+            "diff": None
+        }
+        if signature is None:
+            result["message"] = "No pysealer decorator found"
+        elif is_valid:
+            result["message"] = "✓ Signature valid - code has not been tampered with"
+        else:
+            result["message"] = "✗ Signature invalid - code may have been modified"
+        results[name] = result
     return results
 
 
-def check_decorators_in_folder(folder_path: str) -> Dict[str, Dict[str, dict]]:
+def _compact_results(results: Dict[str, dict]) -> Optional[List[tuple]]:
+    """
+    Reduce the results of a file checked by the Python engine to the compact check_files
+    format, or None if the file or one of its signatures could not be checked.
+    """
+    if "error" in results:
+        return None
+    compact = []
+    for name, result in results.items():
+        if result["message"].startswith("✗ Error"):
+            return None
+        compact.append((name, result["line_start"], result["line_end"], result["signature"], result["valid"]))
+    return compact
+
+
+def _check_files_cached(file_paths: List[str], public_key: str, cache: Union[VerdictCache, BlobCache], jobs: int) -> List[tuple]:
+    """
+    Check files like check_files, reusing the cached verdicts of unchanged files.
+
+    Returns:
+        One (path, status, definitions, error) tuple per file, in the order of file_paths
+    """
+
+    cached = {}
+    changed = []
+    for file_path in file_paths:
+        verdicts = cache.get(file_path)
+        if verdicts is None:
+            changed.append(file_path)
+        else:
+            cached[file_path] = verdicts
+
+    checked = {}
+    if changed:
+        for file_path, status, definitions, error in check_files(changed, public_key, max(jobs, 0)):
+            checked[file_path] = (file_path, status, definitions, error)
+            if status == "checked":
+                cache.put(file_path, definitions)
+
+    return [
+        (file_path, "checked", cached[file_path], None) if file_path in cached else checked[file_path]
+        for file_path in file_paths
+    ]
+
+
+def check_decorators_in_folder(
+    folder_path: str,
+    jobs: int = 0,
+    use_cache: bool = False,
+    cache_file: Optional[str] = None,
+    files: Optional[List[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    include: Optional[Sequence[str]] = None,
+    threads: bool = False,
+) -> Dict[str, Dict[str, dict]]:
     """
     Check decorators in all Python files in a folder.
-    
+
+    Files are found with walk_python_files, which skips git-ignored files and excluded
+    directories such as virtualenvs. The file reads, decorator scanning and batched
+    verification run in the Rust extension (check_files) across all cores. Files the
+    native scanner cannot handle
+    are checked again with the Python engine. Without a usable public key the Python
+    engine checks the whole folder so that each file reports the key error. Diffs are
+    not looked up; see attach_diffs.
+
     Args:
         folder_path: Path to the folder containing Python files
-        
+        jobs: Number of native worker threads (0 uses one thread per core); with more
+            than 1, files left to the Python engine are checked on that many processes
+        use_cache: Reuse the verdicts of files unchanged since an earlier check with the
+            same public key, and record the new ones (see pysealer.cache)
+        cache_file: Reuse and record verdicts by git blob id in this file instead, so
+            that files unchanged in git skip the check even in a fresh checkout
+        files: Check only these Python files of the folder (e.g. those changed versus a
+            base ref, see git_diff.get_changed_python_files) instead of walking it
+        exclude: Patterns of the files and directories to skip when walking the folder
+            (defaults to walk.DEFAULT_EXCLUDES)
+        include: Patterns of the files to check when walking the folder (defaults to "*.py")
+        threads: Check the files the Python engine handles on a pool of jobs threads
+            sharing one verifying key instead of worker processes, for embedders that
+            cannot spawn processes (verification releases the GIL); the native engine
+            always runs on threads
+
     Returns:
         Dictionary mapping file paths to their verification results
     """
@@ -167,19 +555,83 @@ def check_decorators_in_folder(folder_path: str) -> Dict[str, Dict[str, dict]]:
     if not folder.is_dir():
         raise NotADirectoryError(f"'{folder_path}' is not a directory.")
 
-    # Find all Python files in the folder (recursive)
-    python_files = list(folder.rglob('*.py'))
-
-    if not python_files:
+    # Find all Python files in the folder (recursive), in sorted path order
+    file_paths = sorted(walk_python_files(str(folder), include=include, exclude=exclude)) if files is None else list(files)
+    if not file_paths:
         raise ValueError(f"No Python files found in '{folder_path}'.")
 
-    all_results = {}
+    cache = None
+    try:
+        public_key = _load_public_key()
+        if cache_file is not None:
+            cache = BlobCache(str(folder), public_key, cache_file)
+            tree = _check_files_cached(file_paths, public_key, cache, jobs)
+        elif use_cache:
+            cache = VerdictCache(str(folder), public_key, partial=files is not None)
+            tree = _check_files_cached(file_paths, public_key, cache, jobs)
+        else:
+            tree = check_files(file_paths, public_key, max(jobs, 0))
+    except (FileNotFoundError, ValueError):
+        tree = None
+
+    if tree is None:
+        return _check_files([Path(file_path) for file_path in file_paths], jobs, threads)
 
-    for py_file in python_files:
-        try:
-            results = check_decorators(str(py_file))
-            all_results[str(py_file)] = results
-        except Exception as e:
-            all_results[str(py_file)] = {"error": str(e)}
+    all_results = {}
+    unsupported = []
+
+    for file_path, status, definitions, error in tree:
+        if status == "error":
+            all_results[file_path] = {"error": error}
+        elif status == "checked":
+            all_results[file_path] = _results_from_tree(definitions)
+        else:
+            # Keep the file's position in the results until the Python engine fills it in
+            all_results[file_path] = None
+            unsupported.append(file_path)
+
+    if unsupported:
+        all_results.update(_check_files([Path(file_path) for file_path in unsupported], jobs, threads))
+
+    if cache is not None:
+        for file_path in unsupported:
+            verdicts = _compact_results(all_results[file_path])
+            if verdicts is not None:
+                cache.put(file_path, verdicts)
+        cache.save()
 
     return all_results
+
+
+def check_decorators_in_files(
+    file_paths: List[str],
+    jobs: int = 0,
+    use_cache: bool = False,
+    cache_file: Optional[str] = None,
+    threads: bool = False,
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Check decorators in the given Python files as one run.
+
+    The files are checked like the files of their closest common folder (see
+    check_decorators_in_folder), so the key is loaded once and the workers and caches
+    are shared by all of them.
+
+    Args:
+        file_paths: Absolute paths of the Python files to check
+        jobs: Number of native worker threads (0 uses one thread per core)
+        use_cache: Reuse and record verdicts in the cache of the common folder
+        cache_file: Reuse and record verdicts by git blob id in this file instead
+        threads: Use threads instead of worker processes for the Python engine (see
+            check_decorators_in_folder)
+
+    Returns:
+        Dictionary mapping file paths to their verification results, in the order of
+        file_paths
+    """
+    file_paths = [str(file_path) for file_path in file_paths]
+    if not file_paths:
+        raise ValueError("No Python files to check.")
+
+    folder = os.path.commonpath([os.path.dirname(file_path) for file_path in file_paths])
+    return check_decorators_in_folder(folder, jobs=jobs, use_cache=use_cache, cache_file=cache_file, files=file_paths, threads=threads)
@@ -11,18 +11,22 @@ Use `pysealer --help` to see available options and command details.
 Use `pysealer --version` to see the current version of pysealer installed.
 """
 
+import glob
+import os
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import typer
 from typing_extensions import Annotated
 
 from . import __version__, generate_signature, verify_signature
 from .setup import setup_keypair
-from .add_decorators import add_decorators, add_decorators_to_folder
-from .check_decorators import check_decorators, check_decorators_in_folder
-from .remove_decorators import remove_decorators, remove_decorators_from_folder
-from .git_diff import is_git_available
+from .add_decorators import LockResult, add_decorators_to_files, add_decorators_to_folder, lock_file
+from .check_decorators import attach_diffs, check_decorators, check_decorators_in_files, check_decorators_in_folder
+from .remove_decorators import remove_decorators, remove_decorators_from_files, remove_decorators_from_folder
+from .git_diff import GitObjectReader, get_changed_python_files, is_git_available
 from .git_pre_commit import install_hook, get_hook_status, is_git_repository
+from .walk import DEFAULT_EXCLUDES, walk_python_files
 
 app = typer.Typer(
     name="pysealer",
@@ -31,6 +35,66 @@ app = typer.Typer(
 )
 
 
+def _expand_targets(file_paths: List[str]) -> List[Path]:
+    """
+    Expand the glob patterns among the paths given to a command and validate every path.
+
+    Exits with an error if a path does not exist, a pattern matches no Python file or
+    folder, or a file is not a Python file.
+
+    Returns:
+        Resolved files and folders in the order given, each once
+    """
+    targets = {}
+    for file_path in file_paths:
+        if not os.path.exists(file_path) and any(char in file_path for char in "*?["):
+            matches = [
+                Path(match) for match in sorted(glob.glob(file_path, recursive=True))
+                if os.path.isdir(match) or match.endswith('.py')
+            ]
+            if not matches:
+                typer.echo(typer.style(f"Error: No Python files or folders match '{file_path}'.", fg=typer.colors.RED, bold=True), err=True)
+                raise typer.Exit(code=1)
+        else:
+            path = Path(file_path)
+
+            # Validate path exists
+            if not path.exists():
+                typer.echo(typer.style(f"Error: Path '{path}' does not exist.", fg=typer.colors.RED, bold=True), err=True)
+                raise typer.Exit(code=1)
+
+            # Validate it's a Python file or directory
+            if path.is_file() and path.suffix != '.py':
+                typer.echo(typer.style(f"Error: File '{path}' is not a Python file.", fg=typer.colors.RED, bold=True), err=True)
+                raise typer.Exit(code=1)
+
+            matches = [path]
+
+        for match in matches:
+            targets.setdefault(match.resolve(), None)
+    return list(targets)
+
+
+def _walk_patterns(include: Optional[List[str]], exclude: Optional[List[str]]) -> Dict[str, Optional[List[str]]]:
+    """Turn --include and --exclude options into walk_python_files arguments; --exclude adds to the defaults."""
+    return {
+        "include": include or None,
+        "exclude": [*DEFAULT_EXCLUDES, *exclude] if exclude else None,
+    }
+
+
+def _python_files(targets: List[Path], include: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> List[str]:
+    """List the Python files of several targets (folders recursively, see walk_python_files), each file once."""
+    python_files = {}
+    for target in targets:
+        if target.is_dir():
+            for py_file in walk_python_files(str(target), include=include, exclude=exclude):
+                python_files.setdefault(py_file, None)
+        else:
+            python_files.setdefault(str(target), None)
+    return list(python_files)
+
+
 def _format_diff_output(func_name: str, diff_lines):
     """Format and display git diff with color coding."""
     if not diff_lines:
@@ -52,6 +116,27 @@ def _format_diff_output(func_name: str, diff_lines):
         typer.echo(line_str)
 
 
+def _show_failure_diffs(file_path: str, results: dict, git_reader: GitObjectReader, limit: Optional[int]) -> int:
+    """
+    Look up (at most limit, or all if None) and display the diffs of the invalid
+    decorators of a file.
+
+    Returns:
+        Number of diffs looked up
+    """
+    looked_up = attach_diffs(file_path, results, git_reader, limit) if limit is None or limit > 0 else 0
+    for func_name, result in results.items():
+        if result["has_decorator"] and not result["valid"]:
+            if result.get("diff"):
+                _format_diff_output(func_name, result["diff"])
+    return looked_up
+
+
+def _format_lock_counts(result: LockResult) -> str:
+    """Summarize the new, re-sealed and kept seals of a lock run."""
+    return f"{result.new} new, {result.resealed} re-sealed, {result.kept} kept"
+
+
 def version_callback(value: bool):
     """Helper function to display version information."""
     if value:
@@ -87,7 +172,11 @@ def init(
     hook_pattern: Annotated[
         str,
         typer.Option("--hook-pattern", help="File pattern for hook to process. Use quotes to prevent shell expansion: '**/*.py' or 'src/**/*.py'")
-    ] = "**/*.py"
+    ] = "**/*.py",
+    hook_staged: Annotated[
+        bool,
+        typer.Option("--hook-staged", help="Make the hook seal the staged content in the git index, leaving unstaged edits out of the commit.")
+    ] = False
 ):
     """Initialize pysealer with an .env file and optionally upload public key to GitHub."""
     try:
@@ -138,12 +227,14 @@ def init(
                 typer.echo(typer.style("✓ Git pre-commit hook already installed", fg=typer.colors.GREEN))
             else:
                 typer.echo(typer.style("Installing Pysealer git pre-commit hook...", fg=typer.colors.BLUE, bold=True))
-                success, message = install_hook(mode=hook_mode, target_pattern=hook_pattern)
+                success, message = install_hook(mode=hook_mode, target_pattern=hook_pattern, staged=hook_staged)
 
                 if success:
                     typer.echo(typer.style(f"✓ {message}", fg=typer.colors.GREEN))
                     typer.echo(f"   Mode: {hook_mode}")
                     typer.echo(f"   Pattern: {hook_pattern}")
+                    if hook_staged:
+                        typer.echo("   Seals: staged content")
                     typer.echo("   The hook will automatically lock files before each commit.")
                     typer.echo("   To bypass: git commit --no-verify")
                 else:
@@ -156,52 +247,77 @@ def init(
 
 @app.command()
 def lock(
-    file_path: Annotated[
+    file_paths: Annotated[
+        List[str],
+        typer.Argument(help="Python files, folders or glob patterns to lock")
+    ],
+    prehash: Annotated[
+        bool,
+        typer.Option("--prehash", help="Seal the SHA-512 digest of each function or class (Ed25519ph) instead of its full source. Faster for very large classes.")
+    ] = False,
+    encoding: Annotated[
         str,
-        typer.Argument(help="Path to the Python file or folder to lock")
-    ]
+        typer.Option("--encoding", help="Signature encoding: 'base58' (shortest) or 'hex' (faster to lock and check).")
+    ] = "base58",
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="Number of worker processes (0 uses one per CPU core once there are enough files to pay for starting them).")
+    ] = 0,
+    include: Annotated[
+        Optional[List[str]],
+        typer.Option("--include", help="Glob pattern of the files to lock in folders; repeat for several (default: '*.py').")
+    ] = None,
+    exclude: Annotated[
+        Optional[List[str]],
+        typer.Option("--exclude", help="Glob pattern of files or directories to skip in folders, in addition to virtualenvs, caches and VCS metadata; repeat for several.")
+    ] = None
 ):
-    """Add decorators to all functions and classes in a Python file or all Python files in a folder."""
-    path = Path(file_path)
-
-    # Validate path exists
-    if not path.exists():
-        typer.echo(typer.style(f"Error: Path '{path}' does not exist.", fg=typer.colors.RED, bold=True), err=True)
-        raise typer.Exit(code=1)
-
-    # Validate it's a Python file or directory
-    if path.is_file() and path.suffix != '.py':
-        typer.echo(typer.style(f"Error: File '{path}' is not a Python file.", fg=typer.colors.RED, bold=True), err=True)
-        raise typer.Exit(code=1)
+    """Add decorators to all functions and classes in Python files, or in all Python files of folders."""
+    targets = _expand_targets(file_paths)
+    patterns = _walk_patterns(include, exclude)
 
     try:
+        # Handle several paths as one run sharing the key and the workers
+        if len(targets) > 1:
+            python_files = _python_files(targets, **patterns)
+            results = add_decorators_to_files(python_files, jobs=jobs, prehash=prehash, encoding=encoding) if python_files else {}
+            if not results:
+                file_word = "file" if len(python_files) == 1 else "files"
+                typer.echo(typer.style(f"No functions or classes found in {len(python_files)} {file_word}.", fg=typer.colors.YELLOW, bold=True))
+                return
         # Handle folder path
-        if path.is_dir():
-            resolved_path = str(path.resolve())
-            decorated_files = add_decorators_to_folder(resolved_path)
-
-            file_word = "file" if len(decorated_files) == 1 else "files"
-            typer.echo(typer.style(f"Successfully added decorators to {len(decorated_files)} {file_word}:", fg=typer.colors.BLUE, bold=True))
-            for file in decorated_files:
-                typer.echo(f"  {typer.style('✓', fg=typer.colors.GREEN)} {file}")
-
+        elif targets[0].is_dir():
+            resolved_path = str(targets[0])
+            results = add_decorators_to_folder(resolved_path, jobs=jobs, prehash=prehash, encoding=encoding, **patterns)
         # Handle file path
         else:
+            # Add decorators to all functions and classes in the file, keeping valid seals
+            resolved_path = str(targets[0])
+            result = lock_file(resolved_path, prehash=prehash, encoding=encoding)
+            results = {resolved_path: result} if result.new or result.resealed or result.kept else {}
+
+        if not results:
+            typer.echo(typer.style("No functions or classes found in file:" if targets[0].is_file() else "No functions or classes found in folder:", fg=typer.colors.YELLOW, bold=True))
+            typer.echo(f"  {typer.style('⊘', fg=typer.colors.YELLOW)} {resolved_path}")
+            return
+
+        changed_files = [file for file, result in results.items() if result.changed]
+        if changed_files:
+            file_word = "file" if len(changed_files) == 1 else "files"
+            typer.echo(typer.style(f"Successfully added decorators to {len(changed_files)} {file_word}:", fg=typer.colors.BLUE, bold=True))
+            for file in changed_files:
+                typer.echo(f"  {typer.style('✓', fg=typer.colors.GREEN)} {file} ({_format_lock_counts(results[file])})")
+        else:
+            file_word = "file" if len(results) == 1 else "files"
+            typer.echo(typer.style(f"All seals are up to date in {len(results)} {file_word}.", fg=typer.colors.GREEN, bold=True))
 
-            # Add decorators to all functions and classes in the file
-            resolved_path = str(path.resolve())
-            modified_code, has_changes = add_decorators(resolved_path)
-
-            if has_changes:
-                # Write the modified code back to the file
-                with open(resolved_path, 'w') as f:
-                    f.write(modified_code)
-
-                typer.echo(typer.style("Successfully added decorators to 1 file:", fg=typer.colors.BLUE, bold=True))
-                typer.echo(f"  {typer.style('✓', fg=typer.colors.GREEN)} {resolved_path}")
-            else:
-                typer.echo(typer.style("No functions or classes found in file:", fg=typer.colors.YELLOW, bold=True))
-                typer.echo(f"  {typer.style('⊘', fg=typer.colors.YELLOW)} {resolved_path}")
+        total = LockResult(
+            bool(changed_files),
+            sum(result.new for result in results.values()),
+            sum(result.resealed for result in results.values()),
+            sum(result.kept for result in results.values()),
+        )
+        typer.echo(f"Seals: {_format_lock_counts(total)}")
 
     except (RuntimeError, FileNotFoundError, NotADirectoryError, ValueError) as e:
         typer.echo(typer.style(f"Error: {e}", fg=typer.colors.RED, bold=True), err=True)
@@ -213,35 +329,92 @@ def lock(
 
 @app.command()
 def check(
-    file_path: Annotated[
+    file_paths: Annotated[
+        List[str],
+        typer.Argument(help="Python files, folders or glob patterns to check")
+    ],
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="Number of workers for folders (0 uses one thread per CPU core).")
+    ] = 0,
+    no_cache: Annotated[
+        bool,
+        typer.Option("--no-cache", help="Check every file of a folder again instead of reusing the verdicts of unchanged files.")
+    ] = False,
+    cache_file: Annotated[
         str,
-        typer.Argument(help="Path to the Python file or folder to check")
-    ]
+        typer.Option("--cache-file", help="Reuse verdicts by git blob id from this file (e.g. restored by CI) and record new ones in it; set PYSEALER_CACHE_KEY to a CI secret to share it between jobs.")
+    ] = None,
+    no_diff: Annotated[
+        bool,
+        typer.Option("--no-diff", help="Only report which decorators failed, without looking up git diffs.")
+    ] = False,
+    max_diffs: Annotated[
+        Optional[int],
+        typer.Option("--max-diffs", help="Show git diffs for at most this many failed decorators (default: all).")
+    ] = None,
+    changed_only: Annotated[
+        bool,
+        typer.Option("--changed-only", help="Only check the Python files of the folders that changed versus a base git ref.")
+    ] = False,
+    base: Annotated[
+        str,
+        typer.Option("--base", help="Git ref to compare against with --changed-only (defaults to the PR base or push 'before' SHA in GitHub Actions, else HEAD~1).")
+    ] = None,
+    include: Annotated[
+        Optional[List[str]],
+        typer.Option("--include", help="Glob pattern of the files to check in folders; repeat for several (default: '*.py').")
+    ] = None,
+    exclude: Annotated[
+        Optional[List[str]],
+        typer.Option("--exclude", help="Glob pattern of files or directories to skip in folders, in addition to virtualenvs, caches and VCS metadata; repeat for several.")
+    ] = None
 ):
-    """Check the integrity of decorators in a Python file or all Python files in a folder."""
-    path = Path(file_path)
+    """Check the integrity of decorators in Python files, or in all Python files of folders."""
+    targets = _expand_targets(file_paths)
+    patterns = _walk_patterns(include, exclude)
 
-    # Validate path exists
-    if not path.exists():
-        typer.echo(typer.style(f"Error: Path '{path}' does not exist.", fg=typer.colors.RED, bold=True), err=True)
+    if changed_only and not all(target.is_dir() for target in targets):
+        typer.echo(typer.style("Error: --changed-only requires a folder.", fg=typer.colors.RED, bold=True), err=True)
         raise typer.Exit(code=1)
 
-    # Validate it's a Python file or directory
-    if path.is_file() and path.suffix != '.py':
-        typer.echo(typer.style(f"Error: File '{path}' is not a Python file.", fg=typer.colors.RED, bold=True), err=True)
-        raise typer.Exit(code=1)
+    # Several paths are checked as one run and reported like a folder
+    folder_word = "folder" if len(targets) == 1 else "folders"
 
+    # Diffs are looked up while the failures are displayed, up to max_diffs of them
+    git_reader = GitObjectReader()
+    show_diffs = False
     try:
         # Check if git is available for diff output
-        git_available = is_git_available()
-        if not git_available:
-            typer.echo(typer.style("Note: Git not available - diff output will not be shown for invalid signatures.", fg=typer.colors.YELLOW))
-            typer.echo()
-
-        # Handle folder path
-        if path.is_dir():
-            resolved_path = str(path.resolve())
-            all_results = check_decorators_in_folder(resolved_path)
+        if not no_diff:
+            show_diffs = is_git_available()
+            if not show_diffs:
+                typer.echo(typer.style("Note: Git not available - diff output will not be shown for invalid signatures.", fg=typer.colors.YELLOW))
+                typer.echo()
+
+        # Handle folder path (or several paths)
+        if len(targets) > 1 or targets[0].is_dir():
+            python_files = None
+            if changed_only:
+                try:
+                    python_files = sorted({
+                        changed_file for target in targets
+                        for changed_file in get_changed_python_files(str(target), base)
+                    })
+                except RuntimeError as e:
+                    typer.echo(typer.style(f"Error: {e}", fg=typer.colors.RED, bold=True), err=True)
+                    raise typer.Exit(code=1)
+                if not python_files:
+                    typer.echo(typer.style(f"No changed Python files in {folder_word}.", fg=typer.colors.BLUE, bold=True))
+                    return
+            elif len(targets) > 1:
+                python_files = _python_files(targets, **patterns)
+
+            cache_options = {"use_cache": not no_cache, "cache_file": None if no_cache else cache_file}
+            if len(targets) == 1:
+                all_results = check_decorators_in_folder(str(targets[0]), jobs=jobs, files=python_files, **cache_options, **patterns)
+            else:
+                all_results = check_decorators_in_files(python_files, jobs=jobs, **cache_options)
 
             total_decorated = 0
             total_valid = 0
@@ -278,8 +451,13 @@ def check(
                 typer.echo(typer.style(f"\nFailed to check decorators in {error_count} {file_word} due to errors.", fg=typer.colors.RED, bold=True))
                 typer.echo(typer.style("Fix the errors above to verify decorators.", fg=typer.colors.YELLOW))
                 raise typer.Exit(code=1)
+            elif total_decorated == 0 and changed_only:
+                # Changes that touch no sealed code have nothing to verify
+                file_word = "file" if len(all_results) == 1 else "files"
+                typer.echo(typer.style(f"No pysealer decorators found in {len(all_results)} changed {file_word}.", fg=typer.colors.BLUE, bold=True))
+                return
             elif total_decorated == 0:
-                typer.echo(typer.style("No pysealer decorators found in folder.", fg=typer.colors.RED, bold=True))
+                typer.echo(typer.style(f"No pysealer decorators found in {folder_word}.", fg=typer.colors.RED, bold=True))
                 raise typer.Exit(code=1)
             elif total_valid == total_decorated:
                 file_word = "file" if len(files_with_decorators) == 1 else "files"
@@ -292,6 +470,8 @@ def check(
                 typer.echo(typer.style(f"{failed_count} {decorator_word} failed in {failed_files} {file_word}:", fg=typer.colors.BLUE, bold=True), err=True)
 
             # File-by-file details - only show files with decorators
+            diffs_left = max_diffs if show_diffs else 0
+            diffs_skipped = 0
             if total_decorated > 0:
                 for file_path in files_with_decorators:
                     results = all_results[file_path]
@@ -307,10 +487,14 @@ def check(
                         typer.echo(f"  {typer.style('✗', fg=typer.colors.RED)} {file_path}")
 
                         # Show diff for each failed function
-                        for func_name, result in results.items():
-                            if result["has_decorator"] and not result["valid"]:
-                                if result.get("diff"):
-                                    _format_diff_output(func_name, result["diff"])
+                        looked_up = _show_failure_diffs(file_path, results, git_reader, diffs_left)
+                        if diffs_left is not None:
+                            diffs_left -= looked_up
+                        diffs_skipped += decorated_count - valid_count - looked_up
+
+                if show_diffs and diffs_skipped > 0:
+                    decorator_word = "decorator" if diffs_skipped == 1 else "decorators"
+                    typer.echo(typer.style(f"  Diffs not shown for {diffs_skipped} more failed {decorator_word} (see --max-diffs).", fg=typer.colors.YELLOW))
 
             # Exit with error if there were failures or errors
             if files_with_errors:
@@ -322,7 +506,7 @@ def check(
         else:
 
             # Check all decorators in the file
-            resolved_path = str(path.resolve())
+            resolved_path = str(targets[0])
             results = check_decorators(resolved_path)
 
             # Return success if all decorated functions are valid
@@ -344,43 +528,47 @@ def check(
                 typer.echo(f"  {typer.style('✗', fg=typer.colors.RED)} {resolved_path}")
 
                 # Show diff for each failed function
-                for func_name, result in results.items():
-                    if result["has_decorator"] and not result["valid"]:
-                        if result.get("diff"):
-                            _format_diff_output(func_name, result["diff"])
+                _show_failure_diffs(resolved_path, results, git_reader, max_diffs if show_diffs else 0)
 
                 raise typer.Exit(code=1)
 
     except (FileNotFoundError, NotADirectoryError, ValueError) as e:
         typer.echo(typer.style(f"Error: {e}", fg=typer.colors.RED, bold=True), err=True)
         raise typer.Exit(code=1)
+    finally:
+        git_reader.close()
 
 
 @app.command()
 def remove(
-    file_path: Annotated[
-        str,
-        typer.Argument(help="Path to the Python file or folder to remove pysealer decorators from")
-    ]
+    file_paths: Annotated[
+        List[str],
+        typer.Argument(help="Python files, folders or glob patterns to remove pysealer decorators from")
+    ],
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="Number of worker processes (0 uses one per CPU core once there are enough files to pay for starting them).")
+    ] = 0,
+    include: Annotated[
+        Optional[List[str]],
+        typer.Option("--include", help="Glob pattern of the files to remove pysealer decorators from in folders; repeat for several (default: '*.py').")
+    ] = None,
+    exclude: Annotated[
+        Optional[List[str]],
+        typer.Option("--exclude", help="Glob pattern of files or directories to skip in folders, in addition to virtualenvs, caches and VCS metadata; repeat for several.")
+    ] = None
 ):
-    """Remove pysealer decorators from all functions and classes in a Python file or all Python files in a folder."""
-    path = Path(file_path)
-
-    # Validate path exists
-    if not path.exists():
-        typer.echo(typer.style(f"Error: Path '{path}' does not exist.", fg=typer.colors.RED, bold=True), err=True)
-        raise typer.Exit(code=1)
-
-    # Validate it's a Python file or directory
-    if path.is_file() and path.suffix != '.py':
-        typer.echo(typer.style(f"Error: File '{path}' is not a Python file.", fg=typer.colors.RED, bold=True), err=True)
-        raise typer.Exit(code=1)
+    """Remove pysealer decorators from all functions and classes in Python files, or in all Python files of folders."""
+    targets = _expand_targets(file_paths)
+    patterns = _walk_patterns(include, exclude)
 
     try:
-        # Handle folder path
-        if path.is_dir():
-            resolved_path = str(path.resolve())
-            modified_files = remove_decorators_from_folder(resolved_path)
+        # Handle folder path (or several paths)
+        if len(targets) > 1 or targets[0].is_dir():
+            if len(targets) > 1:
+                modified_files = remove_decorators_from_files(_python_files(targets, **patterns), jobs=jobs)
+            else:
+                modified_files = remove_decorators_from_folder(str(targets[0]), jobs=jobs, **patterns)
 
             file_word = "file" if len(modified_files) == 1 else "files"
             typer.echo(typer.style(f"Successfully removed decorators from {len(modified_files)} {file_word}:", fg=typer.colors.BLUE, bold=True))
@@ -388,7 +576,7 @@ def remove(
                 typer.echo(f"  {typer.style('✓', fg=typer.colors.GREEN)} {file}")
         # Handle single file
         else:
-            resolved_path = str(path.resolve())
+            resolved_path = str(targets[0])
             modified_content, _ = remove_decorators(resolved_path)
             typer.echo(typer.style(f"✓ Successfully removed decorators from: {resolved_path}", fg=typer.colors.GREEN))
 
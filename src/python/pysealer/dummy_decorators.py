@@ -1,8 +1,8 @@
 """Defines dummy decorators for all decorators found in the target file."""
 
 import os
-import ast
 import inspect
+from .scanner import scan_definitions
 
 
 def _dummy_decorator(func=None, *args, **kwargs):
@@ -30,7 +30,7 @@ def _discover_decorators(file_path):
     """
     Yield all decorator names used in the given Python file.
 
-    This function parses the specified Python file and walks its AST to find all decorator names
+    This function scans the specified Python file for definitions to find all decorator names
     used on functions, async functions, and classes. It handles decorators used as @deco, @deco(...),
     and @obj.deco or @obj.deco(...).
 
@@ -45,21 +45,14 @@ def _discover_decorators(file_path):
     with open(file_path, "r") as f:
         src = f.read()
     try:
-        tree = ast.parse(src)
+        definitions = scan_definitions(src)
     except Exception:
         return
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-            for deco in node.decorator_list:
-                # Handles @deco or @deco(...)
-                if isinstance(deco, ast.Name):
-                    yield deco.id
-                elif isinstance(deco, ast.Attribute):
-                    yield deco.attr
-                elif isinstance(deco.func, ast.Name):
-                    yield deco.func.id
-                elif isinstance(deco.func, ast.Attribute):
-                    yield deco.func.attr
+    for definition in definitions:
+        for deco in definition.decorators:
+            # Handles @deco, @deco(...), @obj.deco and @obj.deco(...)
+            if deco.name:
+                yield deco.name.rsplit('.', 1)[-1]
 
 def _get_caller_file():
     """
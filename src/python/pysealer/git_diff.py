@@ -1,12 +1,13 @@
 """Git-based diff functionality for comparing function/class changes."""
 
 import ast
+import bisect
 import json
 import os
 import subprocess
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any
-import difflib
+from pysealer import diff_lines, diff_opcodes
 
 
 def get_file_from_git(file_path: str, ref: str = "HEAD") -> Optional[str]:
@@ -20,40 +21,207 @@ def get_file_from_git(file_path: str, ref: str = "HEAD") -> Optional[str]:
     Returns:
         File content as string, or None if not in git or error occurs
     """
-    try:
-        # Get relative path from git root
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            cwd=Path(file_path).parent,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+    with GitObjectReader() as reader:
+        return reader.read_file(file_path, ref)
+
+
+class GitObjectReader:
+    """
+    Read files from git history through one long-lived `git cat-file --batch` process.
 
-        if result.returncode != 0:
+    One process is started per repository the first time a file of it is read. Each
+    ref is resolved to a commit once, and the content and parsed definitions of every
+    (commit, path) pair are kept, so diffing many functions of the same files costs no
+    extra subprocesses. Use as a context manager, or call close(), to stop the processes.
+    """
+
+    def __init__(self):
+        # Candidate refs, computed on first use
+        self._refs: Optional[List[str]] = None
+        # Repository root of each directory looked up (None outside a repository)
+        self._roots: Dict[str, Optional[str]] = {}
+        # cat-file process of each repository (None once it failed)
+        self._processes: Dict[str, Optional[subprocess.Popen]] = {}
+        # Commit id of each (repository, ref) pair (None if the ref does not resolve)
+        self._commits: Dict[Tuple[str, str], Optional[str]] = {}
+        # Content of each (repository, commit, path) triple (None if the file is missing)
+        self._contents: Dict[Tuple[str, str, str], Optional[str]] = {}
+        # Definitions by name of each (repository, commit, path) triple
+        self._definitions: Dict[Tuple[str, str, str], Dict[str, Tuple[str, int]]] = {}
+
+    def __enter__(self) -> "GitObjectReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop every cat-file process."""
+        for process in self._processes.values():
+            if process is None:
+                continue
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except (OSError, subprocess.SubprocessError):
+                process.kill()
+        self._processes.clear()
+
+    def _stop(self, root: str) -> None:
+        """Kill a repository's cat-file process after it failed; later reads return None."""
+        process = self._processes.get(root)
+        if process is not None:
+            process.kill()
+            process.wait()
+        self._processes[root] = None
+
+    @property
+    def refs(self) -> List[str]:
+        """Refs tried in order when looking for an old version (see get_candidate_git_refs)."""
+        if self._refs is None:
+            self._refs = get_candidate_git_refs()
+        return self._refs
+
+    def _repository_root(self, directory: str) -> Optional[str]:
+        """Find the work tree containing a directory by looking for .git in it and its parents."""
+        if directory in self._roots:
+            return self._roots[directory]
+        parent = os.path.dirname(directory)
+        if os.path.exists(os.path.join(directory, ".git")):
+            root = directory
+        elif parent == directory:
+            root = None
+        else:
+            root = self._repository_root(parent)
+        self._roots[directory] = root
+        return root
+
+    def _query(self, root: str, spec: str) -> Optional[Tuple[str, str, bytes]]:
+        """
+        Look up one object with the repository's cat-file process.
+
+        Returns:
+            Tuple of (object id, object type, content), or None if the object is missing
+            or git cannot be run
+        """
+        if root not in self._processes:
+            try:
+                self._processes[root] = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=root,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError:
+                self._processes[root] = None
+        process = self._processes[root]
+        if process is None or "\n" in spec:
             return None
 
-        git_root = result.stdout.strip()
-        relative_path = Path(file_path).relative_to(git_root)
+        try:
+            process.stdin.write(spec.encode("utf-8", "surrogateescape") + b"\n")
+            process.stdin.flush()
+            line = process.stdout.readline()
+            if not line:
+                # The process exited
+                self._stop(root)
+                return None
+            # "<spec> missing" or "<spec> ambiguous", where the spec may contain spaces
+            if line.endswith((b" missing\n", b" ambiguous\n")):
+                return None
+            object_id, object_type, size = line.split()
+            content = process.stdout.read(int(size))
+            process.stdout.read(1)
+        except (OSError, ValueError):
+            self._stop(root)
+            return None
+        return object_id.decode(), object_type.decode(), content
+
+    def _resolve(self, root: str, ref: str) -> Optional[str]:
+        """Resolve a ref to a commit id once per repository."""
+        key = (root, ref)
+        if key not in self._commits:
+            found = self._query(root, f"{ref}^{{commit}}")
+            self._commits[key] = found[0] if found is not None else None
+        return self._commits[key]
+
+    def read_file(self, file_path: str, ref: str = "HEAD") -> Optional[str]:
+        """
+        Retrieve file content from a specific git reference.
+
+        Args:
+            file_path: Absolute path to the file
+            ref: Git reference (default: HEAD)
+
+        Returns:
+            File content as string, or None if not in git or error occurs
+        """
+        located = self._locate(file_path, ref)
+        if located is None:
+            return None
+        return self._contents[located]
 
-        # Get file content from git
-        result = subprocess.run(
-            ["git", "show", f"{ref}:{relative_path}"],
-            cwd=git_root,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+    def _locate(self, file_path: str, ref: str) -> Optional[Tuple[str, str, str]]:
+        """Read a file at a ref into the content cache and return its cache key."""
+        root = self._repository_root(os.path.dirname(os.path.abspath(file_path)))
+        if root is None:
+            return None
+        commit = self._resolve(root, ref)
+        if commit is None:
+            return None
+        relative_path = Path(os.path.abspath(file_path)).relative_to(root).as_posix()
+        key = (root, commit, relative_path)
+        if key not in self._contents:
+            found = self._query(root, f"{commit}:{relative_path}")
+            if found is None or found[1] != "blob":
+                self._contents[key] = None
+            else:
+                self._contents[key] = found[2].decode("utf-8", "replace")
+        return key
+
+    def old_definition(self, file_path: str, function_name: str, ref: str) -> Optional[Tuple[str, int]]:
+        """
+        Extract a function or class from a file as it was at a git reference.
+
+        The file is parsed once per commit; later lookups of other names reuse it.
+
+        Args:
+            file_path: Absolute path to the file
+            function_name: Name of function/class to extract
+            ref: Git reference
+
+        Returns:
+            Tuple of (function_source, start_line) or None if not found
+        """
+        key = self._locate(file_path, ref)
+        if key is None or self._contents[key] is None:
+            return None
+        if key not in self._definitions:
+            self._definitions[key] = _definitions_by_name(self._contents[key])
+        return self._definitions[key].get(function_name)
 
-        if result.returncode == 0:
-            return result.stdout
-        return None
 
-    except FileNotFoundError:
-        # Git command not found
-        return None
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError, ValueError, OSError):
-        return None
+def _definitions_by_name(source_code: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Index every function and class of a source by name.
+
+    Returns:
+        Dictionary mapping each name to the (source, start_line) of its first definition
+        in ast.walk order; empty if the source does not parse
+    """
+    try:
+        tree = ast.parse(source_code)
+    except (SyntaxError, ValueError):
+        return {}
+    # Only newlines end lines, as for ast line numbers (splitlines also splits on \f, \x1c, ...)
+    lines = source_code.split('\n')
+    definitions: Dict[str, Tuple[str, int]] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name not in definitions:
+            end_line = node.end_lineno if node.end_lineno else node.lineno
+            definitions[node.name] = ('\n'.join(lines[node.lineno - 1:end_line]), node.lineno)
+    return definitions
 
 
 def _load_github_event_data() -> Optional[Dict[str, Any]]:
@@ -78,19 +246,13 @@ def _load_github_event_data() -> Optional[Dict[str, Any]]:
     return None
 
 
-def get_candidate_git_refs() -> List[str]:
+def _detected_base_refs() -> List[str]:
     """
-    Determine git references to compare against, preferring CI-aware refs.
-
-    Priority:
-      1. Explicit override via PYSEALER_GIT_REF
-      2. GitHub Actions PR base SHA (pull_request base.sha)
-      3. GitHub Actions push "before" SHA
-      4. HEAD~1 as a local heuristic
-      5. HEAD fallback
+    Base refs set by the user or detected from the CI event, in priority order.
 
     Returns:
-        Ordered list of git refs to try
+        PYSEALER_GIT_REF if set, then the pull request base SHA or push "before" SHA
+        in GitHub Actions; empty if none applies
     """
     refs: List[str] = []
 
@@ -119,6 +281,24 @@ def get_candidate_git_refs() -> List[str]:
             ):
                 refs.append(before_sha)
 
+    return refs
+
+
+def get_candidate_git_refs() -> List[str]:
+    """
+    Determine git references to compare against, preferring CI-aware refs.
+
+    Priority:
+      1. Explicit override via PYSEALER_GIT_REF
+      2. GitHub Actions PR base SHA (pull_request base.sha)
+      3. GitHub Actions push "before" SHA
+      4. HEAD~1 as a local heuristic
+      5. HEAD fallback
+
+    Returns:
+        Ordered list of git refs to try
+    """
+    refs = _detected_base_refs()
     refs.extend(["HEAD~1", "HEAD"])
 
     deduped: List[str] = []
@@ -131,6 +311,72 @@ def get_candidate_git_refs() -> List[str]:
     return deduped
 
 
+def _git_paths(folder_path: str, args: List[str]) -> Optional[List[str]]:
+    """Run a git command listing NUL-separated paths in folder_path, or None if it fails."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=folder_path,
+            capture_output=True,
+            check=False
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return [path for path in result.stdout.decode("utf-8", "surrogateescape").split("\0") if path]
+
+
+def get_changed_python_files(folder_path: str, base: Optional[str] = None) -> List[str]:
+    """
+    List the Python files of a folder that changed versus a base ref.
+
+    The working tree is compared with the base using a single git diff, so committed,
+    staged and unstaged changes all count; untracked files that are not ignored count
+    as changed too. Deleted files are left out.
+
+    Without a base, the ref set in PYSEALER_GIT_REF or detected from the GitHub Actions
+    event (pull request base or push "before" SHA) is used, else HEAD~1. A base that
+    does not resolve is an error rather than a reason to fall back to a later ref: in a
+    shallow clone that would silently check fewer files, down to none against HEAD.
+
+    Args:
+        folder_path: Folder inside a git repository
+        base: Ref to compare against (see above when omitted)
+
+    Returns:
+        Absolute paths of the changed .py files under folder_path, sorted
+
+    Raises:
+        RuntimeError: If git fails or the base ref cannot be resolved
+    """
+    folder = Path(folder_path).resolve()
+    if not base:
+        detected = _detected_base_refs()
+        base = detected[0] if detected else "HEAD~1"
+
+    if _git_paths(str(folder), ["rev-parse", "--verify", "--quiet", f"{base}^{{commit}}"]) is None:
+        raise RuntimeError(
+            f"Cannot resolve base ref '{base}' in '{folder_path}'; "
+            "fetch the history it needs (e.g. fetch-depth: 0 in CI) or pass --base."
+        )
+
+    # --relative limits the diff to the folder and prints paths relative to it
+    changed = _git_paths(
+        str(folder),
+        ["diff", "--name-only", "-z", "--relative", "--diff-filter=d", base, "--", "*.py"]
+    )
+    if changed is None:
+        raise RuntimeError(f"Cannot list changed files: git diff against {base} failed in '{folder_path}'.")
+
+    untracked = _git_paths(str(folder), ["ls-files", "-z", "--others", "--exclude-standard", "--", "*.py"])
+    if untracked is None:
+        raise RuntimeError(f"Cannot list untracked files in '{folder_path}'.")
+
+    paths = {str(folder / relative_path) for relative_path in changed + untracked}
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
 def extract_function_from_source(source_code: str, function_name: str) -> Optional[Tuple[str, int]]:
     """
     Extract a specific function or class from source code.
@@ -142,25 +388,7 @@ def extract_function_from_source(source_code: str, function_name: str) -> Option
     Returns:
         Tuple of (function_source, start_line) or None if not found
     """
-    try:
-        tree = ast.parse(source_code)
-        lines = source_code.splitlines(keepends=True)
-
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                if node.name == function_name:
-                    # Get the source lines for this node
-                    start_line = node.lineno
-                    end_line = node.end_lineno if node.end_lineno else start_line
-
-                    function_lines = lines[start_line - 1:end_line]
-                    function_source = ''.join(function_lines)
-
-                    return function_source, start_line
-
-        return None
-    except (SyntaxError, AttributeError):
-        return None
+    return _definitions_by_name(source_code).get(function_name)
 
 
 def generate_function_diff(
@@ -186,63 +414,108 @@ def generate_function_diff(
         List of tuples: (diff_type, line_content, line_number)
         where diff_type is ' ', '-', or '+'
     """
-    old_lines = old_source.splitlines(keepends=False)
-    new_lines = new_source.splitlines(keepends=False)
-
-    # Generate unified diff
-    diff = list(difflib.unified_diff(
-        old_lines,
-        new_lines,
-        lineterm='',
-        n=context_lines
-    ))
-
-    # Skip the header lines (first 3 lines of unified diff)
-    if len(diff) > 3:
-        diff = diff[3:]
-
-    result = []
-    current_old_line = old_start_line
-    current_new_line = new_start_line
-
-    for line in diff:
-        if not line:
+    old_lines = old_source.split('\n')
+    new_lines = new_source.split('\n')
+
+    # Diff in Rust; difflib degrades badly on big classes
+    return diff_lines(old_lines, new_lines, old_start_line, new_start_line, context_lines)
+
+
+def _unsealed_lines(content: str) -> Tuple[List[int], List[str]]:
+    """Split a file into lines, leaving out pysealer decorators, which are never signed."""
+    numbers = []
+    lines = []
+    for number, line in enumerate(content.split('\n'), start=1):
+        if line.lstrip().startswith('@pysealer'):
             continue
+        numbers.append(number)
+        lines.append(line)
+    return numbers, lines
 
-        prefix = line[0]
-        content = line[1:] if len(line) > 1 else ''
-
-        if prefix == '-':
-            result.append(('-', content, current_old_line))
-            current_old_line += 1
-        elif prefix == '+':
-            result.append(('+', content, current_new_line))
-            current_new_line += 1
-        elif prefix == ' ':
-            result.append((' ', content, current_new_line))
-            current_old_line += 1
-            current_new_line += 1
-        elif prefix == '@':
-            # Parse line numbers from @@ -old_start,old_count +new_start,new_count @@
-            try:
-                parts = line.split()
-                if len(parts) >= 3:
-                    old_part = parts[1].lstrip('-')
-                    new_part = parts[2].lstrip('+')
 
-                    if ',' in old_part:
-                        current_old_line = int(old_part.split(',')[0])
-                    else:
-                        current_old_line = int(old_part)
+class FileDiff:
+    """
+    Diff of an old and a new version of a file, computed once and sliced per definition.
 
-                    if ',' in new_part:
-                        current_new_line = int(new_part.split(',')[0])
-                    else:
-                        current_new_line = int(new_part)
-            except (ValueError, IndexError):
-                pass
+    Pysealer decorator lines are ignored on both sides, as they are when sealing, so
+    re-sealed definitions do not show up as changed.
+    """
 
-    return result
+    def __init__(self, old_content: str, new_content: str):
+        """
+        Args:
+            old_content: File content at a git reference
+            new_content: Current file content
+        """
+        self._old_numbers, self._old_lines = _unsealed_lines(old_content)
+        self._new_numbers, self._new_lines = _unsealed_lines(new_content)
+        self._opcodes = diff_opcodes(self._old_lines, self._new_lines)
+        # End of each opcode in the new lines, to find the opcodes of a span by bisection
+        self._opcode_ends = [j2 for _, _, _, _, j2 in self._opcodes]
+
+    def definition_diff(self, line_start: int, line_end: int, context_lines: int = 2) -> List[Tuple[str, str, int]]:
+        """
+        Select the changes of the file that fall within one definition.
+
+        Lines removed inside the definition, or directly after its last line and
+        indented deeper than it, are attributed to it.
+
+        Args:
+            line_start: Line of the def/class keyword in the new file
+            line_end: Last line of the definition in the new file
+            context_lines: Number of unchanged lines shown around each change
+
+        Returns:
+            List of tuples: (diff_type, line_content, line_number) like
+            generate_function_diff; empty if the definition did not change
+        """
+        first = bisect.bisect_left(self._new_numbers, line_start)
+        end = bisect.bisect_right(self._new_numbers, line_end)
+        if first >= end:
+            return []
+        def_line = self._new_lines[first]
+        indent = len(def_line) - len(def_line.lstrip())
+
+        entries: List[Tuple[str, str, int]] = []
+        for tag, i1, i2, j1, j2 in self._opcodes[bisect.bisect_right(self._opcode_ends, first):]:
+            if j1 > end or (j1 == end and tag != 'delete'):
+                break
+            if tag == 'delete':
+                removed = range(i1, i2)
+                if j1 == end:
+                    # Removed lines right after the definition belong to it if they were in its body
+                    removed = self._trailing_body_lines(i1, i2, indent)
+                entries.extend(('-', self._old_lines[i], self._old_numbers[i]) for i in removed)
+                continue
+            if tag == 'replace':
+                entries.extend(('-', self._old_lines[i], self._old_numbers[i]) for i in range(i1, i2))
+            kind = ' ' if tag == 'equal' else '+'
+            entries.extend((kind, self._new_lines[j], self._new_numbers[j]) for j in range(max(j1, first), min(j2, end)))
+
+        return _with_context(entries, context_lines)
+
+    def _trailing_body_lines(self, i1: int, i2: int, indent: int) -> range:
+        """The leading removed old lines that are indented deeper than indent, without trailing blanks."""
+        last = i1
+        for i in range(i1, i2):
+            line = self._old_lines[i]
+            if not line.strip():
+                continue
+            if len(line) - len(line.lstrip()) <= indent:
+                break
+            last = i + 1
+        return range(i1, last)
+
+
+def _with_context(entries: List[Tuple[str, str, int]], context_lines: int) -> List[Tuple[str, str, int]]:
+    """Keep the changes of a diff and only the unchanged lines within context_lines of one."""
+    changed = [index for index, entry in enumerate(entries) if entry[0] != ' ']
+    if not changed:
+        return []
+    keep = set()
+    for index in changed:
+        keep.update(range(max(0, index - context_lines), min(len(entries), index + context_lines + 1)))
+    return [entry for index, entry in enumerate(entries) if index in keep]
 
 
 def is_git_available() -> bool:
@@ -264,7 +537,8 @@ def get_function_diff(
     file_path: str,
     function_name: str,
     new_source: str,
-    new_start_line: int
+    new_start_line: int,
+    reader: Optional[GitObjectReader] = None
 ) -> Optional[List[Tuple[str, str, int]]]:
     """
     Get diff for a specific function comparing current version to git history.
@@ -274,16 +548,18 @@ def get_function_diff(
         function_name: Name of the function/class
         new_source: Current source code of the function
         new_start_line: Starting line number of function in current file
+        reader: Reader shared by every diff of a check run; a temporary one is used
+            if omitted
         
     Returns:
         List of diff tuples or None if git history unavailable
     """
-    for ref in get_candidate_git_refs():
-        old_file_content = get_file_from_git(file_path, ref=ref)
-        if not old_file_content:
-            continue
+    if reader is None:
+        with GitObjectReader() as temporary_reader:
+            return get_function_diff(file_path, function_name, new_source, new_start_line, temporary_reader)
 
-        old_function = extract_function_from_source(old_file_content, function_name)
+    for ref in reader.refs:
+        old_function = reader.old_definition(file_path, function_name, ref)
         if not old_function:
             continue
 
@@ -302,3 +578,55 @@ def get_function_diff(
             return diff
 
     return None
+
+
+def get_file_diffs(
+    file_path: str,
+    spans: List[Tuple[int, int]],
+    reader: Optional[GitObjectReader] = None,
+    new_content: Optional[str] = None
+) -> Dict[Tuple[int, int], List[Tuple[str, str, int]]]:
+    """
+    Get the diffs of several definitions of one file, diffing the whole file once per ref.
+
+    Each definition gets the diff against the first candidate ref in which it differs,
+    as with get_function_diff, but the cost grows with the size of the file rather than
+    with the number of definitions times the file.
+
+    Args:
+        file_path: Absolute path to the Python file
+        spans: (line_start, line_end) of each definition in the current file
+        reader: Reader shared by every diff of a check run; a temporary one is used
+            if omitted
+        new_content: Current content of the file (read from file_path if omitted)
+
+    Returns:
+        Dictionary mapping each span that changed to its diff tuples
+    """
+    if reader is None:
+        with GitObjectReader() as temporary_reader:
+            return get_file_diffs(file_path, spans, temporary_reader, new_content)
+
+    diffs: Dict[Tuple[int, int], List[Tuple[str, str, int]]] = {}
+    remaining = list(dict.fromkeys(spans))
+    for ref in reader.refs:
+        if not remaining:
+            break
+        old_content = reader.read_file(file_path, ref)
+        if not old_content:
+            continue
+        if new_content is None:
+            with open(file_path, 'r') as f:
+                new_content = f.read()
+
+        file_diff = FileDiff(old_content, new_content)
+        unchanged = []
+        for span in remaining:
+            diff = file_diff.definition_diff(*span)
+            if diff:
+                diffs[span] = diff
+            else:
+                unchanged.append(span)
+        remaining = unchanged
+
+    return diffs
@@ -7,11 +7,17 @@ that automatically run pysealer decorate on specified files before each commit.
 The hook can be configured as:
 - Mandatory: Commit fails if decorating fails
 - Optional: Warnings are shown but commit proceeds
+
+By default the hook seals the working-tree files and re-stages them. A staged hook
+seals the staged content in the index instead, leaving unstaged edits alone.
 """
 
+import os
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from .add_decorators import SigningContext, _lock_one, _seal_source
 
 
 def is_git_repository(path: Optional[Path] = None) -> bool:
@@ -53,23 +59,236 @@ def get_git_root(path: Optional[Path] = None) -> Optional[Path]:
         return None
 
 
-def create_hook_script(mode: str = "mandatory", target_pattern: str = "**/*.py") -> str:
+def lock_staged_files(files: List[str]) -> Dict[str, str]:
+    """
+    Seal the staged files of a commit in this process and re-stage them with one git add.
+
+    Used by the pre-commit hook so that the interpreter, the extension and the private
+    key are loaded once per commit rather than once per file.
+
+    Args:
+        files: Paths of the staged Python files, relative to the current directory
+
+    Returns:
+        Dictionary mapping each file that could not be sealed to its error message
+    """
+    # Load the key once; without a usable key every file that needs sealing reports the error
+    try:
+        context = SigningContext.load()
+    except RuntimeError:
+        context = None
+
+    errors = {}
+    locked = []
+    for file in files:
+        _, error = _lock_one(file, False, "base58", context)
+        if error is None:
+            locked.append(file)
+        else:
+            errors[file] = error
+
+    if locked:
+        subprocess.run(["git", "add", "--", *locked], check=False)
+
+    return errors
+
+
+def _read_blobs(object_ids: List[str]) -> List[bytes]:
+    """Read the content of several blobs through one git cat-file --batch process."""
+    result = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        input="".join(f"{object_id}\n" for object_id in object_ids).encode(),
+        capture_output=True,
+        check=True
+    )
+    output = result.stdout
+    blobs = []
+    position = 0
+    for _ in object_ids:
+        end = output.index(b"\n", position)
+        header = output[position:end].split()
+        if len(header) != 3:
+            raise RuntimeError(f"Cannot read staged blob: {output[position:end].decode(errors='replace')}")
+        size = int(header[2])
+        blobs.append(output[end + 1:end + 1 + size])
+        position = end + 1 + size + 1
+    return blobs
+
+
+def _write_blobs(contents: List[bytes]) -> List[str]:
+    """Write several blobs to the object database with one git hash-object process."""
+    with tempfile.TemporaryDirectory(prefix="pysealer-") as directory:
+        paths = []
+        for index, content in enumerate(contents):
+            path = os.path.join(directory, str(index))
+            with open(path, 'wb') as f:
+                f.write(content)
+            paths.append(path)
+        result = subprocess.run(
+            ["git", "hash-object", "-w", "--no-filters", "--stdin-paths"],
+            input="".join(f"{path}\n" for path in paths).encode(),
+            capture_output=True,
+            check=True
+        )
+    return result.stdout.decode().split()
+
+
+def _newline_style(blob: bytes) -> str:
+    """The line ending a blob uses: that of its first line break, "\\n" if it has none."""
+    position = blob.find(b"\r")
+    if position == -1 or -1 < blob.find(b"\n") < position:
+        return "\n"
+    return "\r\n" if blob[position + 1:position + 2] == b"\n" else "\r"
+
+
+def seal_staged_files(files: List[str]) -> Dict[str, str]:
+    """
+    Seal the staged content of files in the index, for the staged pre-commit hook.
+
+    The staged blobs are read in bulk, sealed in memory, written back as new blobs and
+    staged with one git update-index call, so unstaged edits are never committed. A
+    working-tree file is given the same change only if it matches its staged content
+    once git's line ending conversion and filters are applied. Sources are sealed with universal newlines, as check reads them, and written back
+    with the line endings of the staged blob.
+
+    Args:
+        files: Paths of the staged Python files, relative to the repository root (the
+            current directory)
+
+    Returns:
+        Dictionary mapping each file that could not be sealed to its error message
+    """
+    if not files:
+        return {}
+
+    errors = {}
+    try:
+        listed = subprocess.run(
+            ["git", "--literal-pathspecs", "ls-files", "-z", "--stage", "--", *files],
+            capture_output=True,
+            check=True
+        ).stdout.decode("utf-8", "surrogateescape")
+
+        # (mode, blob id, path) of every staged regular file
+        entries = []
+        for record in listed.split("\0"):
+            if not record:
+                continue
+            info, path = record.split("\t", 1)
+            mode, object_id, stage = info.split()
+            if stage != "0":
+                errors[path] = "File has unresolved merge conflicts"
+            elif mode in ("100644", "100755"):
+                entries.append((mode, object_id, path))
+
+        blobs = _read_blobs([object_id for _, object_id, _ in entries])
+    except (OSError, subprocess.CalledProcessError, RuntimeError) as e:
+        return {file: f"Cannot read the staged content: {e}" for file in files}
+
+    # Load the key once; without a usable key every file that needs sealing reports the error
+    try:
+        context = SigningContext.load()
+    except RuntimeError:
+        context = None
+
+    sealed = []
+    # (path, staged blob id) of every sealed file, to find those clean in the working tree
+    staged_ids = []
+    for (mode, object_id, path), blob in zip(entries, blobs):
+        try:
+            # Seal the text as check reads it, with universal newlines like open() in text mode
+            newline = _newline_style(blob)
+            text = blob.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            content, result = _seal_source(text, False, "base58", context)
+        except Exception as e:
+            errors[path] = str(e)
+            continue
+        if result.changed:
+            sealed.append((mode, path, content.replace("\n", newline).encode("utf-8")))
+            staged_ids.append((path, object_id))
+
+    if not sealed:
+        return errors
+
+    try:
+        object_ids = _write_blobs([content for _, _, content in sealed])
+        subprocess.run(
+            ["git", "update-index", "-z", "--index-info"],
+            input="".join(
+                f"{mode} {object_id}\t{path}\0" for (mode, path, _), object_id in zip(sealed, object_ids)
+            ).encode("utf-8", "surrogateescape"),
+            capture_output=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        for _, path, _ in sealed:
+            errors[path] = f"Cannot stage the sealed content: {e}"
+        return errors
+
+    # Bring clean working-tree files up to date; files with unstaged edits are left alone.
+    # A file is clean when git would stage it as the blob that was staged, after autocrlf,
+    # eol attributes and clean filters, and checkout-index writes the sealed blob back
+    # through the same conversion
+    clean = [
+        path for (path, object_id), working_id in zip(staged_ids, _working_tree_blob_ids([path for path, _ in staged_ids]))
+        if working_id == object_id
+    ]
+    if clean:
+        subprocess.run(
+            ["git", "checkout-index", "-f", "-z", "--stdin"],
+            input="".join(f"{path}\0" for path in clean).encode("utf-8", "surrogateescape"),
+            capture_output=True,
+            check=False
+        )
+
+    return errors
+
+
+def _working_tree_blob_ids(paths: List[str]) -> List[Optional[str]]:
+    """
+    Hash working-tree files as git add would store them, with one git hash-object process.
+
+    Returns:
+        The blob id of each file, None for files that are missing or cannot be hashed
+    """
+    existing = [path for path in paths if os.path.isfile(path) and not os.path.islink(path)]
+    if not existing:
+        return [None] * len(paths)
+    try:
+        result = subprocess.run(
+            ["git", "hash-object", "--stdin-paths"],
+            input="".join(f"{path}\n" for path in existing).encode("utf-8", "surrogateescape"),
+            capture_output=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return [None] * len(paths)
+    blob_ids = dict(zip(existing, result.stdout.decode().split()))
+    return [blob_ids.get(path) for path in paths]
+
+
+def create_hook_script(mode: str = "mandatory", target_pattern: str = "**/*.py", staged: bool = False) -> str:
     """
     Create the pre-commit hook script content.
     
     Args:
         mode: Either 'mandatory' (fail on error) or 'optional' (warn on error)
         target_pattern: Glob pattern for files to process (e.g., '**/*.py', 'src/**/*.py')
+        staged: Seal the staged content in the index (see seal_staged_files) instead of
+            the working-tree files
     
     Returns:
         The hook script as a string
     """
+    seal_function = "seal_staged_files" if staged else "lock_staged_files"
+    sealed_content = "staged content" if staged else "working tree"
     hook_script = f'''#!/usr/bin/env python3
 """
 Pysealer pre-commit hook - {mode.upper()} mode
 Automatically adds cryptographic decorators to Python files before commit.
 
 Target pattern: {target_pattern}
+Seals: {sealed_content}
 """
 
 import subprocess
@@ -102,6 +321,54 @@ def get_staged_python_files(pattern="{target_pattern}"):
         return []
 
 
+def lock_in_process(staged_files):
+    """
+    Seal all staged files in this process with the installed pysealer package.
+
+    Returns the files that failed, or None if pysealer cannot be imported here.
+    """
+    try:
+        from pysealer.git_pre_commit import {seal_function} as seal_files
+    except ImportError:
+        return None
+
+    errors = seal_files(staged_files)
+    if errors:
+        print("❌ Pysealer lock command failed:")
+        for file, error in errors.items():
+            print(f"{{file}}: {{error}}")
+    return list(errors)
+
+
+def lock_with_command(staged_files):
+    """Seal the staged files with one pysealer lock command and re-stage them."""
+    try:
+        result = subprocess.run(
+            ["pysealer", "lock", *staged_files],
+            capture_output=True,
+            text=True,
+            check=False
+        )
+    except FileNotFoundError:
+        print("❌ Error: pysealer command not found")
+        print("   Make sure pysealer is installed: pip install pysealer")
+        
+        if "{mode}" == "mandatory":
+            sys.exit(1)
+        else:
+            print("   Proceeding with commit (optional mode)")
+            sys.exit(0)
+    
+    if result.returncode != 0:
+        print("❌ Pysealer lock command failed:")
+        print(result.stderr or result.stdout)
+        return staged_files
+    
+    # Re-stage the modified files
+    subprocess.run(["git", "add", "--", *staged_files], check=False)
+    return []
+
+
 def main():
     """Main pre-commit hook logic."""
     staged_files = get_staged_python_files()
@@ -110,42 +377,15 @@ def main():
         # No Python files staged, nothing to do
         sys.exit(0)
     
-    file_word = "file" if len(staged_files) == 1 else "files"
     print(f"🔒 Pysealer pre-commit hook")
     
-    # Run pysealer lock on each staged file individually
-    failed_files = []
-    
-    for file in staged_files:
-        try:
-            result = subprocess.run(
-                ["pysealer", "lock", file],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            
-            if result.returncode != 0:
-                failed_files.append(file)
-                if len(failed_files) == 1:  # Only print header once
-                    print("❌ Pysealer lock command failed:")
-                print(result.stderr or result.stdout)
-            else:
-                # Re-stage the modified file
-                subprocess.run(["git", "add", file], check=False)
-                
-        except FileNotFoundError:
-            print("❌ Error: pysealer command not found")
-            print("   Make sure pysealer is installed: pip install pysealer")
-            
-            if "{mode}" == "mandatory":
-                sys.exit(1)
-            else:
-                print("   Proceeding with commit (optional mode)")
-                sys.exit(0)
-        except Exception as e:
-            failed_files.append(file)
-            print(f"❌ Unexpected error processing {{file}}: {{e}}")
+    # Seal every staged file in one run, falling back to the pysealer command when
+    # this interpreter cannot import pysealer
+    failed_files = lock_in_process(staged_files)
+    if failed_files is None:
+        if {staged}:
+            print("⚠️  pysealer cannot be imported by this hook's Python; sealing the working tree instead")
+        failed_files = lock_with_command(staged_files)
     
     # Check if there were any failures
     if failed_files:
@@ -170,7 +410,8 @@ if __name__ == "__main__":
 def install_hook(
     mode: str = "mandatory",
     target_pattern: str = "**/*.py",
-    repo_path: Optional[Path] = None
+    repo_path: Optional[Path] = None,
+    staged: bool = False
 ) -> Tuple[bool, str]:
     """
     Install the pysealer pre-commit hook.
@@ -179,6 +420,7 @@ def install_hook(
         mode: Either 'mandatory' (fail on error) or 'optional' (warn on error)
         target_pattern: Glob pattern for files to process
         repo_path: Path to git repository (defaults to current directory)
+        staged: Seal the staged content in the index instead of the working-tree files
     
     Returns:
         Tuple of (success: bool, message: str)
@@ -209,7 +451,7 @@ def install_hook(
             return False, f"A different pre-commit hook already exists at {hook_path}. Remove it first or merge manually."
 
     # Create and write the hook script
-    hook_script = create_hook_script(mode, target_pattern)
+    hook_script = create_hook_script(mode, target_pattern, staged)
     hook_path.write_text(hook_script)
 
     # Make the hook executable
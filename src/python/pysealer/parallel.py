@@ -0,0 +1,161 @@
+"""Process and thread pools shared by the folder-wide lock, check and remove commands."""
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Work items handed to a worker at once are kept small enough that every worker gets
+# about this many batches, so the pool stays balanced
+_BATCHES_PER_WORKER = 16
+
+# With jobs=0 every worker process gets at least this many files. Starting a spawned
+# worker (a fresh interpreter importing the extension and decoding the key) takes a few
+# hundred milliseconds, about as long as sealing this many small files in-process.
+MIN_FILES_PER_WORKER = 256
+
+
+def resolve_jobs(jobs: int) -> int:
+    """
+    Turn a --jobs value into a number of workers.
+
+    Args:
+        jobs: Number of workers, or 0 for one worker per CPU core
+
+    Returns:
+        Number of workers (at least 1)
+
+    Raises:
+        ValueError: If jobs is negative
+    """
+    if jobs < 0:
+        raise ValueError(f"Invalid number of jobs: {jobs}. Use 0 for one job per CPU core.")
+    return jobs or os.cpu_count() or 1
+
+
+def plan_workers(jobs: int, paths: Iterable[str]) -> Tuple[int, Iterable[str]]:
+    """
+    Decide how many worker processes to process a stream of files with.
+
+    An explicit number of jobs is used as given, capped at the number of files. With
+    jobs=0 a pool is only started when every worker gets at least MIN_FILES_PER_WORKER
+    files, so a handful of files (as passed by the pre-commit hook) are processed in the
+    calling process. The paths are listed up front only when a pool is used.
+
+    Args:
+        jobs: Number of workers, or 0 for one per CPU core on large runs
+        paths: File paths to process
+
+    Returns:
+        Tuple of (number of workers, paths to process); the paths are a list when more
+        than one worker is used
+
+    Raises:
+        ValueError: If jobs is negative
+    """
+    workers = resolve_jobs(jobs)
+    if workers == 1:
+        return 1, paths
+
+    paths = iter(paths)
+    if jobs == 0:
+        # Read only as far as needed to tell whether two workers would pay off
+        head = list(itertools.islice(paths, 2 * MIN_FILES_PER_WORKER))
+        if len(head) < 2 * MIN_FILES_PER_WORKER:
+            return 1, head
+        listed = head + list(paths)
+        return min(workers, len(listed) // MIN_FILES_PER_WORKER), listed
+
+    listed = list(paths)
+    return max(1, min(workers, len(listed))), listed
+
+
+def largest_first(paths: Sequence[str]) -> List[int]:
+    """
+    Order files from the largest to the smallest.
+
+    Args:
+        paths: File paths
+
+    Returns:
+        Indices into paths; files that cannot be read are placed last
+    """
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(-1)
+    return sorted(range(len(paths)), key=lambda index: sizes[index], reverse=True)
+
+
+def run_in_processes(
+    task: Callable[[str], T],
+    paths: Sequence[str],
+    workers: int,
+    initializer: Optional[Callable[..., Any]] = None,
+    initargs: Tuple = (),
+) -> List[T]:
+    """
+    Run a task on every file with a pool of worker processes.
+
+    Workers are started with the spawn method, because forking a process whose Rust
+    extension already runs worker threads can deadlock the child. Each worker runs
+    initializer(*initargs) once, so key material is sent to it once rather than with
+    every file. Files are submitted largest first so that no big file starts last and
+    keeps one worker busy after the others are done. Results come back in the order
+    of paths whatever order the workers finish in.
+
+    Args:
+        task: Module-level function called with each path in a worker
+        paths: File paths to process
+        workers: Number of worker processes (capped at the number of files)
+        initializer: Module-level function setting up the state of each worker
+        initargs: Arguments of initializer
+
+    Returns:
+        The result of task for every path, in the order of paths
+    """
+    if not paths:
+        return []
+
+    workers = max(1, min(workers, len(paths)))
+    order = largest_first(paths)
+    chunksize = max(1, len(paths) // (workers * _BATCHES_PER_WORKER))
+
+    results: List[Any] = [None] * len(paths)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    ) as executor:
+        ordered = executor.map(task, [paths[index] for index in order], chunksize=chunksize)
+        for index, result in zip(order, ordered):
+            results[index] = result
+    return results
+
+
+def run_in_threads(task: Callable[[str], T], paths: Sequence[str], workers: int) -> List[T]:
+    """
+    Run a task on every file with a pool of threads of the calling process.
+
+    Threads share the caller's decoded key and need no start-up, but only overlap
+    where the task releases the GIL (file reads and the signing and verification in
+    the Rust extension). Useful to embedders that cannot spawn processes.
+
+    Args:
+        task: Function called with each path in a thread
+        paths: File paths to process
+        workers: Number of threads (capped at the number of files)
+
+    Returns:
+        The result of task for every path, in the order of paths
+    """
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as executor:
+        return list(executor.map(task, paths))
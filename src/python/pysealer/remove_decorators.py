@@ -1,45 +1,40 @@
 """Remove cryptographic pysealer decorators from all functions and classes in a Python file."""
 
-import ast
-from typing import List, Tuple
+import itertools
+from typing import Iterable, List, Optional, Sequence, Tuple
 from pathlib import Path
+from .parallel import plan_workers, run_in_processes
+from .scanner import SEAL_MARKER, decode_source, is_pysealer_decorator, read_source_if_sealed, scan_definitions
+from .walk import walk_python_files
 
 def remove_decorators(file_path: str) -> Tuple[str, bool]:
     """
     Parse a Python file, remove all @pysealer.* decorators from functions and classes, and return the modified code.
 
+    Files whose raw bytes don't contain "pysealer" are returned unchanged without being parsed.
+
     Args:
         file_path: Path to the Python file to process
     Returns:
         Modified Python source code as a string
     """
-    with open(file_path, 'r') as f:
-        content = f.read()
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    content = decode_source(raw)
+    if SEAL_MARKER not in raw:
+        return content, False
+    return _remove_from_source(content)
+
 
-    tree = ast.parse(content)
+def _remove_from_source(content: str) -> Tuple[str, bool]:
+    """Remove the @pysealer.* decorators from Python source, returning it and whether any were found."""
     lines = content.split('\n')
     lines_to_remove = set()
 
-    for node in ast.walk(tree):
-        if type(node).__name__ in ("FunctionDef", "AsyncFunctionDef", "ClassDef"):
-            if hasattr(node, 'decorator_list'):
-                for decorator in node.decorator_list:
-                    is_pysealer_decorator = False
-                    if isinstance(decorator, ast.Name):
-                        if decorator.id.startswith("pysealer"):
-                            is_pysealer_decorator = True
-                    elif isinstance(decorator, ast.Attribute):
-                        if isinstance(decorator.value, ast.Name) and decorator.value.id == "pysealer":
-                            is_pysealer_decorator = True
-                    elif isinstance(decorator, ast.Call):
-                        func = decorator.func
-                        if isinstance(func, ast.Attribute):
-                            if isinstance(func.value, ast.Name) and func.value.id == "pysealer":
-                                is_pysealer_decorator = True
-                        elif isinstance(func, ast.Name) and func.id.startswith("pysealer"):
-                            is_pysealer_decorator = True
-                    if is_pysealer_decorator:
-                        lines_to_remove.add(decorator.lineno - 1)
+    for definition in scan_definitions(content):
+        for decorator in definition.decorators:
+            if is_pysealer_decorator(decorator):
+                lines_to_remove.add(decorator.line - 1)
 
     found = len(lines_to_remove) > 0
     for line_idx in sorted(lines_to_remove, reverse=True):
@@ -49,12 +44,47 @@ def remove_decorators(file_path: str) -> Tuple[str, bool]:
     return modified_code, found
 
 
-def remove_decorators_from_folder(folder_path: str) -> List[str]:
+def _remove_from_file(file_path: str) -> bool:
+    """
+    Remove the pysealer decorators of one file of a folder and write it back.
+
+    Returns:
+        Whether decorators were removed; files that can't be processed are skipped
+    """
+    try:
+        content = read_source_if_sealed(file_path)
+        if content is None:
+            return False
+        modified_code, found = _remove_from_source(content)
+        if found:
+            # Write the modified code back to the file
+            with open(file_path, 'w') as f:
+                f.write(modified_code)
+        return found
+    except Exception:
+        return False
+
+
+def remove_decorators_from_folder(
+    folder_path: str,
+    jobs: int = 1,
+    exclude: Optional[Sequence[str]] = None,
+    include: Optional[Sequence[str]] = None,
+) -> List[str]:
     """
     Remove pysealer decorators from all Python files in a folder (recursively).
 
+    Files are found with walk_python_files, which skips git-ignored files and excluded
+    directories such as virtualenvs.
+
     Args:
         folder_path: Path to the folder to process
+        jobs: Number of worker processes (0 for one per CPU core when there are enough
+            files to pay for starting them, see plan_workers; 1 processes the files in
+            the calling process)
+        exclude: Patterns of the files and directories to skip (defaults to
+            walk.DEFAULT_EXCLUDES)
+        include: Patterns of the files to process (defaults to "*.py")
     Returns:
         List of file paths where decorators were removed
     """
@@ -63,26 +93,33 @@ def remove_decorators_from_folder(folder_path: str) -> List[str]:
     if not folder.is_dir():
         raise NotADirectoryError(f"'{folder_path}' is not a directory")
 
-    # Find all Python files recursively
-    python_files = list(folder.rglob("*.py"))
+    python_files = walk_python_files(str(folder.resolve()), include=include, exclude=exclude)
+    first_file = next(python_files, None)
 
-    if not python_files:
+    if first_file is None:
         raise FileNotFoundError(f"No Python files found in '{folder_path}'")
 
-    files_modified = []
+    return remove_decorators_from_files(itertools.chain([first_file], python_files), jobs=jobs)
 
-    for py_file in python_files:
-        try:
-            file_path = str(py_file.resolve())
-            modified_code, found = remove_decorators(file_path)
 
-            if found:
-                # Write the modified code back to the file
-                with open(file_path, 'w') as f:
-                    f.write(modified_code)
-                files_modified.append(file_path)
-        except Exception:
-            # Skip files that can't be processed
-            continue
+def remove_decorators_from_files(file_paths: Iterable[str], jobs: int = 1) -> List[str]:
+    """
+    Remove pysealer decorators from the given Python files.
+
+    Args:
+        file_paths: Paths of the Python files to process; an iterator is consumed as the
+            files are processed when they are processed in the calling process
+        jobs: Number of worker processes (0 for one per CPU core when there are enough
+            files to pay for starting them, see plan_workers; 1 processes the files in
+            the calling process)
+    Returns:
+        List of file paths where decorators were removed
+    """
+    python_files = map(str, file_paths)
+
+    workers, python_files = plan_workers(jobs, python_files)
+    if workers > 1:
+        removed = run_in_processes(_remove_from_file, python_files, workers)
+        return [file_path for file_path, found in zip(python_files, removed) if found]
 
-    return files_modified
+    return [file_path for file_path in python_files if _remove_from_file(file_path)]
@@ -0,0 +1,194 @@
+"""Locate function and class definitions and their decorators in Python source.
+
+The native scanner in the Rust extension tokenizes the source without building a
+syntax tree. Sources it does not handle (tabs in indentation, non-ASCII identifiers,
+invalid syntax, ...) are scanned with the ast module instead.
+"""
+
+import ast
+import io
+from collections import deque
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from pysealer import scan_source
+
+
+# Bytes every sealed file contains, in the decorator of its seals
+SEAL_MARKER = b"pysealer"
+
+# Nodes that hold statements or are held in statement lists
+_STATEMENT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+class Decorator(NamedTuple):
+    """A decorator applied to a definition."""
+
+    line: int               # 1-based line of the '@'
+    name: Optional[str]     # Dotted name (of the callee for calls), None for other expressions
+    is_call: bool           # Whether the decorator is a call, e.g. @pysealer._<sig>()
+
+
+class Definition(NamedTuple):
+    """A function, async function or class definition."""
+
+    kind: str               # "FunctionDef", "AsyncFunctionDef" or "ClassDef"
+    name: str
+    line_start: int         # 1-based line of the def/class keyword
+    line_end: int           # 1-based line where the body ends
+    col_offset: int         # Indentation of the definition
+    in_class: bool          # Whether the definition sits directly in a class body
+    decorators: List[Decorator]
+
+
+def scan_definitions(content: str) -> List[Definition]:
+    """
+    Find every function and class definition in a Python source.
+
+    Definitions are returned in the order ast.walk visits them (breadth-first).
+
+    Args:
+        content: Python source code
+
+    Returns:
+        List of definitions with their decorators
+
+    Raises:
+        SyntaxError: If the source is not valid Python
+    """
+    try:
+        scanned = scan_source(content)
+    except ValueError:
+        return _scan_with_ast(content)
+
+    return [
+        Definition(kind, name, line_start, line_end, col_offset, in_class, [Decorator(*decorator) for decorator in decorators])
+        for kind, name, line_start, line_end, col_offset, in_class, decorators in scanned
+    ]
+
+
+def read_source_if_sealed(file_path: str) -> Optional[str]:
+    """
+    Read a Python file, unless its raw bytes don't contain SEAL_MARKER.
+
+    A file without the marker holds no pysealer decorator, so it needn't be decoded
+    or parsed at all.
+
+    Args:
+        file_path: Path to the Python file to read
+
+    Returns:
+        The decoded source (as open() in text mode would read it), or None if the
+        file can't contain a pysealer decorator
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if SEAL_MARKER not in raw:
+        return None
+    return decode_source(raw)
+
+
+def decode_source(raw: bytes) -> str:
+    """Decode the raw bytes of a file as open() in text mode would read them."""
+    return io.TextIOWrapper(io.BytesIO(raw)).read()
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    """Return 'a.b.c' for a Name/Attribute chain, None for any other expression."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value is not None else None
+    return None
+
+
+def _scan_with_ast(content: str) -> List[Definition]:
+    """Fallback for scan_definitions that parses the source with the ast module."""
+    return definitions_from_tree(ast.parse(content))
+
+
+def definitions_from_tree(tree: ast.AST) -> List[Definition]:
+    """
+    Collect every function and class definition of an already parsed module.
+
+    Args:
+        tree: Module returned by ast.parse
+
+    Returns:
+        List of definitions in ast.walk order
+    """
+    definitions = []
+    for node, parent in walk_statements(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+
+        decorators = []
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call):
+                decorators.append(Decorator(decorator.lineno, _dotted_name(decorator.func), True))
+            else:
+                decorators.append(Decorator(decorator.lineno, _dotted_name(decorator), False))
+
+        definitions.append(Definition(
+            type(node).__name__,
+            node.name,
+            node.lineno,
+            node.end_lineno if node.end_lineno else node.lineno,
+            node.col_offset,
+            isinstance(parent, ast.ClassDef),
+            decorators,
+        ))
+
+    return definitions
+
+
+def walk_statements(tree: ast.AST) -> Iterator[Tuple[ast.AST, ast.AST]]:
+    """
+    Yield every statement of a parsed module with its parent node.
+
+    Statements are visited in ast.walk order without descending into expressions,
+    which cannot contain statements; except handlers and match cases are yielded too.
+
+    Args:
+        tree: Module returned by ast.parse
+
+    Yields:
+        Tuples of (node, parent node)
+    """
+    pending = deque([tree])
+    while pending:
+        parent = pending.popleft()
+        for field in parent._fields:
+            value = getattr(parent, field, None)
+            if isinstance(value, list) and value and isinstance(value[0], _STATEMENT_NODES):
+                for node in value:
+                    yield node, parent
+                    pending.append(node)
+
+
+def is_pysealer_decorator(decorator: Decorator) -> bool:
+    """
+    Check whether a decorator belongs to pysealer.
+
+    Matches @pysealer*, @pysealer.<name> and calls of either.
+    """
+    if decorator.name is None:
+        return False
+    parts = decorator.name.split('.')
+    if len(parts) == 1:
+        return parts[0].startswith("pysealer")
+    return len(parts) == 2 and parts[0] == "pysealer"
+
+
+def seal_signature(decorator: Decorator) -> Optional[str]:
+    """
+    Return the signature recorded by a @pysealer._<signature>() decorator.
+
+    Returns:
+        The signature (without the leading underscore), or None for any other decorator
+    """
+    if not decorator.is_call or decorator.name is None:
+        return None
+    parts = decorator.name.split('.')
+    if len(parts) == 2 and parts[0] == "pysealer" and parts[1].startswith('_'):
+        return parts[1][1:]
+    return None
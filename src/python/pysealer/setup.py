@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 from dotenv import set_key, dotenv_values
 from pysealer import generate_keypair
 
@@ -38,6 +38,24 @@ def _find_env_file() -> Path:
     # This will be used in error messages
     return Path.cwd() / '.env'
 
+def env_file_stamp() -> Optional[Tuple[str, int, int]]:
+    """
+    Identify the .env file the keys are currently read from, and its version.
+
+    Callers that keep decoded keys between calls compare stamps to notice a different
+    .env file (another PYSEALER_ENV_PATH or working directory) or a rewritten one.
+
+    Returns:
+        Tuple of (resolved path, modification time in nanoseconds, size) of the .env file
+        that get_private_key and get_public_key would read, or None if there is none
+    """
+    env_path = _find_env_file()
+    try:
+        stat = env_path.stat()
+        return str(env_path.resolve()), stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
 def setup_keypair(env_path: Optional[str | Path] = None):
     """
     Generate and store keypair securely.
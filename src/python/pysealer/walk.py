@@ -0,0 +1,221 @@
+"""
+File discovery shared by the folder-wide lock, check and remove commands.
+
+Inside a git work tree the Python files of a folder are listed by `git ls-files`, so
+everything .gitignore excludes is skipped; elsewhere the folder is walked with
+os.scandir. Either way directories matching an exclude pattern (version control
+metadata, virtualenvs, caches, ...) are never entered, and paths are yielded as they
+are found so that processing can start before the walk is over. Build output is left
+to .gitignore in a work tree; outside one the build and dist directories at the top of
+the folder are skipped as well.
+
+A pattern without a `/` matches a file or directory name at any depth, like
+.gitignore; other patterns match the whole path relative to the folder, where `**`
+spans any number of directories.
+"""
+
+import os
+import subprocess
+from fnmatch import fnmatchcase
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Directories never searched for files to seal, tracked or not
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".venv",
+    "venv",
+    ".tox",
+    ".nox",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".eggs",
+    "*.egg-info",
+    "node_modules",
+    "site-packages",
+)
+
+# Build output skipped by default outside a git work tree, only at the top of the folder
+# (a package may well have a build or dist subpackage)
+UNTRACKED_EXCLUDES = (
+    "/build",
+    "/dist",
+)
+
+
+def _match_parts(pattern: List[str], path: List[str]) -> bool:
+    """Match path components against pattern components, where `**` spans any number of components."""
+    if not pattern:
+        return not path
+    if pattern[0] == "**":
+        return any(_match_parts(pattern[1:], path[skip:]) for skip in range(len(path) + 1))
+    return bool(path) and fnmatchcase(path[0], pattern[0]) and _match_parts(pattern[1:], path[1:])
+
+
+def glob_match(pattern: str, relative_path: str) -> bool:
+    """
+    Check a path relative to the walked folder (with `/` separators) against a pattern.
+
+    Args:
+        pattern: Glob pattern, e.g. "*.py", "build" or "src/**/generated/*.py"
+        relative_path: Path relative to the folder
+
+    Returns:
+        Whether the path matches
+    """
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+    if "/" not in pattern:
+        return fnmatchcase(relative_path.rsplit("/", 1)[-1], pattern)
+    parts = [part for part in pattern.lstrip("/").split("/") if part]
+    return _match_parts(parts, relative_path.split("/"))
+
+
+class _Filter:
+    """Include and exclude patterns, with the verdicts of directories remembered."""
+
+    def __init__(self, include: Sequence[str], exclude: Sequence[str]):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._excluded_dirs: Dict[str, bool] = {"": False}
+
+    def excludes(self, relative_path: str) -> bool:
+        return any(glob_match(pattern, relative_path) for pattern in self.exclude)
+
+    def excludes_dir(self, relative_dir: str) -> bool:
+        """Whether a directory or one of its parents is excluded."""
+        excluded = self._excluded_dirs.get(relative_dir)
+        if excluded is None:
+            parent = relative_dir.rpartition("/")[0]
+            excluded = self.excludes_dir(parent) or self.excludes(relative_dir)
+            self._excluded_dirs[relative_dir] = excluded
+        return excluded
+
+    def accepts(self, relative_path: str) -> bool:
+        """Whether a file is included and neither it nor a parent directory is excluded."""
+        return (
+            any(glob_match(pattern, relative_path) for pattern in self.include)
+            and not self.excludes(relative_path)
+            and not self.excludes_dir(relative_path.rpartition("/")[0])
+        )
+
+
+def _git_files(folder: str, path_filter: _Filter) -> Iterator[str]:
+    """
+    Stream the files of a folder listed by git (tracked and untracked, not ignored).
+
+    Yields nothing if git is not installed, fails, or the folder is not in a work tree.
+    """
+    try:
+        process = subprocess.Popen(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=folder,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return
+
+    seen = set()
+    pending = b""
+    try:
+        for chunk in iter(lambda: process.stdout.read(65536), b""):
+            records = (pending + chunk).split(b"\0")
+            pending = records.pop()
+            for record in records:
+                relative_path = record.decode("utf-8", "surrogateescape")
+                # Unmerged files are listed once per stage
+                if relative_path in seen or not path_filter.accepts(relative_path):
+                    continue
+                seen.add(relative_path)
+                file_path = os.path.join(folder, relative_path)
+                # Tracked files deleted from the work tree (and submodules) are skipped
+                if os.path.isfile(file_path):
+                    yield file_path
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def _walk_directly(folder: str) -> bool:
+    """
+    Whether a folder git listed no files for is walked with os.scandir instead.
+
+    That is the case when git is not installed, the folder is not in a work tree, or the
+    folder itself is ignored (given explicitly); a folder whose files are all ignored is not.
+    """
+    def git(*args: str) -> Optional[subprocess.CompletedProcess]:
+        try:
+            return subprocess.run(["git", *args], cwd=folder, capture_output=True, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    inside = git("rev-parse", "--is-inside-work-tree")
+    if inside is None or inside.returncode != 0 or inside.stdout.strip() != b"true":
+        return True
+    ignored = git("check-ignore", "-q", ".")
+    return ignored is not None and ignored.returncode == 0
+
+
+def _scandir_files(folder: str, path_filter: _Filter) -> Iterator[str]:
+    """
+    Walk a folder depth-first in sorted name order, yielding the files that pass the filter.
+
+    Symlinked directories are not followed and unreadable directories are skipped.
+    """
+    pending = [(folder, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = f"{prefix}/{entry.name}" if prefix else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not path_filter.excludes(relative_path):
+                        subdirectories.append((entry.path, relative_path))
+                elif entry.is_file() and path_filter.accepts(relative_path):
+                    yield entry.path
+            except OSError:
+                continue
+        # Popped in reverse, so subdirectories are visited in sorted order
+        pending.extend(reversed(subdirectories))
+
+
+def walk_python_files(
+    folder: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> Iterator[str]:
+    """
+    Yield the Python files of a folder (recursively), skipping ignored and excluded paths.
+
+    Inside a git work tree the files come from one `git ls-files` process, so files
+    ignored by .gitignore are skipped. Without a work tree (or git), and for an ignored
+    folder given explicitly, the folder is walked with os.scandir instead.
+
+    Args:
+        folder: Folder to search
+        include: Patterns of the files to yield (defaults to "*.py")
+        exclude: Patterns of the files and directories to skip (defaults to
+            DEFAULT_EXCLUDES, plus UNTRACKED_EXCLUDES outside a git work tree; pass an
+            empty list to skip nothing)
+
+    Returns:
+        Iterator over the paths of the files, joined onto folder
+    """
+    include = ["*.py"] if include is None else include
+
+    found = False
+    for file_path in _git_files(folder, _Filter(include, DEFAULT_EXCLUDES if exclude is None else exclude)):
+        found = True
+        yield file_path
+    if not found and _walk_directly(folder):
+        yield from _scandir_files(folder, _Filter(include, (*DEFAULT_EXCLUDES, *UNTRACKED_EXCLUDES) if exclude is None else exclude))
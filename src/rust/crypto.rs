@@ -1,7 +1,8 @@
 //! Cryptographic utilities for Ed25519 signing.
 
-use ed25519_dalek::{Signer, Verifier, SigningKey, VerifyingKey, Signature};
+use ed25519_dalek::{Digest, Sha512, Signer, Verifier, SigningKey, VerifyingKey, Signature};
 use rand::rngs::OsRng;
+use rayon::prelude::*;
 
 /// Generate a new Ed25519 key pair
 /// Returns (private_key_base58, public_key_base58)
@@ -9,59 +10,245 @@ pub fn generate_keypair() -> (String, String) {
     let mut csprng = OsRng;
     let signing_key = SigningKey::generate(&mut csprng);
     let verifying_key = signing_key.verifying_key();
-    
+
     let private_key_base58 = bs58::encode(signing_key.to_bytes()).into_string();
     let public_key_base58 = bs58::encode(verifying_key.to_bytes()).into_string();
-    
+
     (private_key_base58, public_key_base58)
 }
 
-/// Sign data using Ed25519 with a private key
-/// Returns the signature as a Base58 string
-pub fn generate_signature(data: &str, private_key_base58: &str) -> Result<String, String> {
+/// Decode a Base58 private key into an Ed25519 signing key
+pub fn decode_signing_key(private_key_base58: &str) -> Result<SigningKey, String> {
     let private_key_bytes = bs58::decode(private_key_base58)
         .into_vec()
         .map_err(|e| format!("Invalid private key Base58: {}", e))?;
-    
+
     if private_key_bytes.len() != 32 {
         return Err("Private key must be 32 bytes".to_string());
     }
-    
+
     let mut key_array = [0u8; 32];
     key_array.copy_from_slice(&private_key_bytes);
-    
-    let signing_key = SigningKey::from_bytes(&key_array);
-    let signature = signing_key.sign(data.as_bytes());
-    
-    Ok(bs58::encode(signature.to_bytes()).into_string())
+
+    Ok(SigningKey::from_bytes(&key_array))
 }
 
-/// Verify an Ed25519 signature
-/// Returns true if the signature is valid
-pub fn verify_signature(data: &str, signature_base58: &str, public_key_base58: &str) -> Result<bool, String> {
-    let signature_bytes = bs58::decode(signature_base58)
-        .into_vec()
-        .map_err(|e| format!("Invalid signature Base58: {}", e))?;
-    
+/// Decode a Base58 public key into an Ed25519 verifying key
+pub fn decode_verifying_key(public_key_base58: &str) -> Result<VerifyingKey, String> {
     let public_key_bytes = bs58::decode(public_key_base58)
         .into_vec()
         .map_err(|e| format!("Invalid public key Base58: {}", e))?;
-    
+
     if public_key_bytes.len() != 32 {
         return Err("Public key must be 32 bytes".to_string());
     }
-    
+
     let mut key_array = [0u8; 32];
     key_array.copy_from_slice(&public_key_bytes);
-    
-    let verifying_key = VerifyingKey::from_bytes(&key_array)
-        .map_err(|e| format!("Invalid public key: {}", e))?;
-    
-    let signature = Signature::from_slice(&signature_bytes)
-        .map_err(|e| format!("Invalid signature: {}", e))?;
-    
-    match verifying_key.verify(data.as_bytes(), &signature) {
-        Ok(_) => Ok(true),
-        Err(_) => Ok(false),
+
+    VerifyingKey::from_bytes(&key_array)
+        .map_err(|e| format!("Invalid public key: {}", e))
+}
+
+/// Signing scheme recorded in a seal
+///
+/// A seal is the text after `@pysealer._` in a decorator. Legacy seals are a bare
+/// Base58 Ed25519 signature. Newer seals put underscore-terminated tags in front of
+/// the encoded signature (neither Base58 nor hex contains `_`), e.g. `ph_<base58>`
+/// for Ed25519ph or `ph_hx_<hex>` for Ed25519ph encoded as hex.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum SealMode {
+    /// Ed25519 over the full source text
+    Pure,
+    /// Ed25519ph over the SHA-512 digest of the source text
+    Prehashed,
+}
+
+/// Text encoding of the signature in a seal
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum SealEncoding {
+    /// Base58 (the legacy form, shortest but quadratic to encode and decode)
+    Base58,
+    /// Lowercase hex (longer but linear time to encode and decode)
+    Hex,
+}
+
+impl SealEncoding {
+    /// Parse the encoding name exposed to Python ("base58" or "hex")
+    pub fn from_name(name: &str) -> Result<Self, String> {
+        match name {
+            "base58" => Ok(SealEncoding::Base58),
+            "hex" => Ok(SealEncoding::Hex),
+            _ => Err(format!("Unknown seal encoding '{}' (expected 'base58' or 'hex')", name)),
+        }
     }
 }
+
+/// Seal tag marking an Ed25519ph (pre-hashed) signature
+const PREHASH_TAG: &str = "ph";
+
+/// Seal tag marking a hex encoded signature
+const HEX_TAG: &str = "hx";
+
+/// Ed25519ph domain separation context used for every pre-hashed seal
+const PREHASH_CONTEXT: &[u8] = b"pysealer";
+
+/// Stream data through SHA-512
+fn prehash(data: &[u8]) -> Sha512 {
+    let mut hasher = Sha512::new();
+    hasher.update(data);
+    hasher
+}
+
+/// SHA-512 digest of data as a hex string
+/// The digest is what pre-hashed seals sign, so it can be cached and compared
+/// without running any asymmetric crypto
+pub fn source_digest(data: &[u8]) -> String {
+    hex::encode(prehash(data).finalize())
+}
+
+/// Sign data with an already decoded signing key
+/// Returns the signature as a Base58 string
+pub fn sign(signing_key: &SigningKey, data: &[u8]) -> String {
+    let signature = signing_key.sign(data);
+    bs58::encode(signature.to_bytes()).into_string()
+}
+
+/// Sign data with an already decoded signing key using the given mode and encoding
+/// Returns the seal (tags plus encoded signature)
+pub fn seal(signing_key: &SigningKey, data: &[u8], mode: SealMode, encoding: SealEncoding) -> String {
+    let signature = match mode {
+        SealMode::Pure => signing_key.sign(data),
+        SealMode::Prehashed => signing_key
+            .sign_prehashed(prehash(data), Some(PREHASH_CONTEXT))
+            .expect("pysealer Ed25519ph context is shorter than 256 bytes"),
+    };
+
+    let mut seal = String::with_capacity(134);
+    if mode == SealMode::Prehashed {
+        seal.push_str(PREHASH_TAG);
+        seal.push('_');
+    }
+    match encoding {
+        SealEncoding::Base58 => seal.push_str(&bs58::encode(signature.to_bytes()).into_string()),
+        SealEncoding::Hex => {
+            seal.push_str(HEX_TAG);
+            seal.push('_');
+            seal.push_str(&hex::encode(signature.to_bytes()));
+        }
+    }
+    seal
+}
+
+/// Seal many pieces of data in parallel across all cores
+/// Returns the seals in the same order as the input
+pub fn sign_many(signing_key: &SigningKey, data: &[&[u8]], mode: SealMode, encoding: SealEncoding) -> Vec<String> {
+    data.par_iter()
+        .map(|item| seal(signing_key, item, mode, encoding))
+        .collect()
+}
+
+/// Decode an encoded signature into an Ed25519 signature
+fn decode_signature(signature: &str, encoding: SealEncoding) -> Result<Signature, String> {
+    let signature_bytes = match encoding {
+        SealEncoding::Base58 => bs58::decode(signature)
+            .into_vec()
+            .map_err(|e| format!("Invalid signature Base58: {}", e))?,
+        SealEncoding::Hex => hex::decode(signature)
+            .map_err(|e| format!("Invalid signature hex: {}", e))?,
+    };
+
+    Signature::from_slice(&signature_bytes)
+        .map_err(|e| format!("Invalid signature: {}", e))
+}
+
+/// Split a seal into its mode and decoded signature
+fn decode_seal(seal: &str) -> Result<(SealMode, Signature), String> {
+    let mut mode = SealMode::Pure;
+    let mut encoding = SealEncoding::Base58;
+    let mut parts = seal.split('_').peekable();
+    while let Some(part) = parts.next() {
+        if parts.peek().is_none() {
+            return Ok((mode, decode_signature(part, encoding)?));
+        }
+        match part {
+            PREHASH_TAG => mode = SealMode::Prehashed,
+            HEX_TAG => encoding = SealEncoding::Hex,
+            _ => return Err(format!("Unknown seal tag '{}'", part)),
+        }
+    }
+    Err("Empty seal".to_string())
+}
+
+/// Check a decoded signature against data with the scheme the seal recorded
+fn verify_decoded(verifying_key: &VerifyingKey, data: &[u8], mode: SealMode, signature: &Signature) -> bool {
+    match mode {
+        SealMode::Pure => verifying_key.verify(data, signature).is_ok(),
+        SealMode::Prehashed => verifying_key
+            .verify_prehashed(prehash(data), Some(PREHASH_CONTEXT), signature)
+            .is_ok(),
+    }
+}
+
+/// Verify a seal with an already decoded verifying key
+/// Returns true if the signature is valid
+pub fn verify(verifying_key: &VerifyingKey, data: &[u8], seal: &str) -> Result<bool, String> {
+    let (mode, signature) = decode_seal(seal)?;
+    Ok(verify_decoded(verifying_key, data, mode, &signature))
+}
+
+/// Verify many seals made with the same key
+/// Runs a single Ed25519 batch verification over the plain Ed25519 seals first and
+/// only falls back to verifying each item on its own when the batch fails.
+/// Pre-hashed seals are always verified one by one, and seals that cannot be
+/// decoded are reported as invalid.
+/// Returns one verdict per item in the same order as the input
+pub fn verify_many(verifying_key: &VerifyingKey, data: &[&[u8]], seals: &[&str]) -> Result<Vec<bool>, String> {
+    if data.len() != seals.len() {
+        return Err(format!(
+            "Got {} sources but {} signatures",
+            data.len(),
+            seals.len()
+        ));
+    }
+
+    let decoded: Vec<Option<(SealMode, Signature)>> = seals
+        .par_iter()
+        .map(|seal| decode_seal(seal).ok())
+        .collect();
+
+    let all_pure = decoded
+        .iter()
+        .all(|item| matches!(item, Some((SealMode::Pure, _))));
+    if data.len() > 1 && all_pure {
+        let signatures: Vec<Signature> = decoded.iter().flatten().map(|(_, signature)| *signature).collect();
+        let keys = vec![*verifying_key; data.len()];
+        if ed25519_dalek::verify_batch(data, &signatures, &keys).is_ok() {
+            return Ok(vec![true; data.len()]);
+        }
+    }
+
+    // The batch failed (or could not run), so find the bad items one by one
+    Ok(data
+        .par_iter()
+        .zip(decoded.par_iter())
+        .map(|(item, seal)| match seal {
+            Some((mode, signature)) => verify_decoded(verifying_key, item, *mode, signature),
+            None => false,
+        })
+        .collect())
+}
+
+/// Sign data using Ed25519 with a private key
+/// Returns the signature as a Base58 string
+pub fn generate_signature(data: &[u8], private_key_base58: &str) -> Result<String, String> {
+    let signing_key = decode_signing_key(private_key_base58)?;
+    Ok(sign(&signing_key, data))
+}
+
+/// Verify an Ed25519 signature
+/// Returns true if the signature is valid
+pub fn verify_signature(data: &[u8], signature_base58: &str, public_key_base58: &str) -> Result<bool, String> {
+    let verifying_key = decode_verifying_key(public_key_base58)?;
+    verify(&verifying_key, data, signature_base58)
+}
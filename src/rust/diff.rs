@@ -0,0 +1,457 @@
+//! Line diff used to show how definitions whose seal no longer verifies have changed.
+//!
+//! Lines that occur exactly once on each side anchor the diff (patience diff): the
+//! longest run of them in the same order on both sides is kept as unchanged and the
+//! gaps between them are diffed again. Gaps without such lines are diffed with Myers'
+//! algorithm in linear space. Lines are interned to integers first, so the text is
+//! only compared while hashing.
+
+use std::collections::HashMap;
+
+/// Kind of a run of lines, named like the tags of difflib.SequenceMatcher
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum Tag {
+    Equal,
+    Replace,
+    Delete,
+    Insert,
+}
+
+impl Tag {
+    pub fn name(self) -> &'static str {
+        match self {
+            Tag::Equal => "equal",
+            Tag::Replace => "replace",
+            Tag::Delete => "delete",
+            Tag::Insert => "insert",
+        }
+    }
+}
+
+/// Old lines `i1..i2` that became new lines `j1..j2`
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct Opcode {
+    pub tag: Tag,
+    pub i1: usize,
+    pub i2: usize,
+    pub j1: usize,
+    pub j2: usize,
+}
+
+/// One line of a diff as shown to the user
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct DiffLine<'a> {
+    /// `' '` for context, `'-'` for a removed line, `'+'` for an added line
+    pub kind: char,
+    pub content: &'a str,
+    /// Line number in the old version for removed lines, in the new version otherwise
+    pub line: usize,
+}
+
+/// Builds the edit script in order, merging adjacent runs of the same kind
+struct Script {
+    opcodes: Vec<Opcode>,
+}
+
+impl Script {
+    fn push(&mut self, equal: bool, i1: usize, i2: usize, j1: usize, j2: usize) {
+        if i1 == i2 && j1 == j2 {
+            return;
+        }
+        let (mut i1, mut j1) = (i1, j1);
+        if let Some(last) = self.opcodes.last() {
+            if (last.tag == Tag::Equal) == equal {
+                i1 = last.i1;
+                j1 = last.j1;
+                self.opcodes.pop();
+            }
+        }
+        let tag = if equal {
+            Tag::Equal
+        } else if i1 < i2 && j1 < j2 {
+            Tag::Replace
+        } else if i1 < i2 {
+            Tag::Delete
+        } else {
+            Tag::Insert
+        };
+        self.opcodes.push(Opcode { tag, i1, i2, j1, j2 });
+    }
+}
+
+/// Map every distinct line to an integer
+fn intern(a: &[&str], b: &[&str]) -> (Vec<u32>, Vec<u32>) {
+    let mut ids: HashMap<&str, u32> = HashMap::with_capacity(a.len() + b.len());
+    let mut id = |line| {
+        let next = ids.len() as u32;
+        *ids.entry(line).or_insert(next)
+    };
+    let a = a.iter().map(|&line| id(line)).collect();
+    let b = b.iter().map(|&line| id(line)).collect();
+    (a, b)
+}
+
+/// Pair the lines occurring exactly once in both `a[a1..a2]` and `b[b1..b2]` and keep
+/// the longest sequence of pairs that is in order on both sides
+fn unique_anchors(a: &[u32], a1: usize, a2: usize, b: &[u32], b1: usize, b2: usize) -> Vec<(usize, usize)> {
+    // line -> (count in a, index in a, count in b, index in b)
+    let mut counts: HashMap<u32, (u32, usize, u32, usize)> = HashMap::new();
+    for i in a1..a2 {
+        let entry = counts.entry(a[i]).or_insert((0, i, 0, 0));
+        entry.0 += 1;
+    }
+    for j in b1..b2 {
+        if let Some(entry) = counts.get_mut(&b[j]) {
+            entry.2 += 1;
+            entry.3 = j;
+        }
+    }
+    let mut pairs: Vec<(usize, usize)> = counts
+        .into_values()
+        .filter(|&(count_a, _, count_b, _)| count_a == 1 && count_b == 1)
+        .map(|(_, i, _, j)| (i, j))
+        .collect();
+    if pairs.is_empty() {
+        return pairs;
+    }
+    pairs.sort_unstable();
+
+    // Longest increasing subsequence of the b indices (patience sorting)
+    let mut tails: Vec<usize> = Vec::new();
+    let mut tail_indices: Vec<usize> = Vec::new();
+    let mut previous = vec![usize::MAX; pairs.len()];
+    for (index, &(_, j)) in pairs.iter().enumerate() {
+        let position = tails.partition_point(|&tail| tail < j);
+        if position == tails.len() {
+            tails.push(j);
+            tail_indices.push(index);
+        } else {
+            tails[position] = j;
+            tail_indices[position] = index;
+        }
+        if position > 0 {
+            previous[index] = tail_indices[position - 1];
+        }
+    }
+    let mut anchors = Vec::with_capacity(tails.len());
+    let mut index = *tail_indices.last().unwrap();
+    loop {
+        anchors.push(pairs[index]);
+        if previous[index] == usize::MAX {
+            break;
+        }
+        index = previous[index];
+    }
+    anchors.reverse();
+    anchors
+}
+
+/// Find the middle snake of the shortest edit script between two non-empty sequences
+/// whose first and last elements differ. Returns the start and end points `(x, y)` of
+/// a path segment made of at most one insertion or deletion and a diagonal run.
+fn middle_snake(a: &[u32], b: &[u32]) -> ((usize, usize), (usize, usize)) {
+    let (n, m) = (a.len() as isize, b.len() as isize);
+    let delta = n - m;
+    let odd = delta % 2 != 0;
+    let max = (n + m + 1) / 2;
+    let offset = max + 1;
+    // Furthest x reached forwards on each diagonal k, furthest y reached backwards on
+    // each diagonal c = k - delta
+    let mut forward = vec![0isize; (2 * max + 3) as usize];
+    let mut backward = vec![0isize; (2 * max + 3) as usize];
+    forward[(offset + 1) as usize] = 0;
+    backward[(offset + 1) as usize] = m;
+
+    for d in 0..=max {
+        let mut k = d;
+        while k >= -d {
+            let c = k - delta;
+            let (px, mut x) = if k == -d || (k != d && forward[(offset + k - 1) as usize] < forward[(offset + k + 1) as usize]) {
+                let px = forward[(offset + k + 1) as usize];
+                (px, px)
+            } else {
+                let px = forward[(offset + k - 1) as usize];
+                (px, px + 1)
+            };
+            let mut y = x - k;
+            let py = if d == 0 || x != px { y } else { y - 1 };
+            while x < n && y < m && a[x as usize] == b[y as usize] {
+                x += 1;
+                y += 1;
+            }
+            forward[(offset + k) as usize] = x;
+            if odd && -(d - 1) <= c && c <= d - 1 && y >= backward[(offset + c) as usize] {
+                return ((px as usize, py as usize), (x as usize, y as usize));
+            }
+            k -= 2;
+        }
+
+        let mut c = d;
+        while c >= -d {
+            let k = c + delta;
+            let (py, mut y) = if c == -d || (c != d && backward[(offset + c - 1) as usize] > backward[(offset + c + 1) as usize]) {
+                let py = backward[(offset + c + 1) as usize];
+                (py, py)
+            } else {
+                let py = backward[(offset + c - 1) as usize];
+                (py, py - 1)
+            };
+            let mut x = y + k;
+            let px = if d == 0 || y != py { x } else { x + 1 };
+            while x > 0 && y > 0 && a[(x - 1) as usize] == b[(y - 1) as usize] {
+                x -= 1;
+                y -= 1;
+            }
+            backward[(offset + c) as usize] = y;
+            if !odd && -d <= k && k <= d && x <= forward[(offset + k) as usize] {
+                return ((x as usize, y as usize), (px as usize, py as usize));
+            }
+            c -= 2;
+        }
+    }
+    unreachable!("the forward and backward searches always meet")
+}
+
+/// Diff `a` against `b` with Myers' algorithm, where `a` starts at old index `i0` and
+/// `b` at new index `j0`
+fn myers(a: &[u32], b: &[u32], i0: usize, j0: usize, script: &mut Script) {
+    let prefix = a.iter().zip(b).take_while(|(x, y)| x == y).count();
+    let suffix = a[prefix..].iter().rev().zip(b[prefix..].iter().rev()).take_while(|(x, y)| x == y).count();
+    script.push(true, i0, i0 + prefix, j0, j0 + prefix);
+
+    let (a_mid, b_mid) = (&a[prefix..a.len() - suffix], &b[prefix..b.len() - suffix]);
+    let (i1, j1) = (i0 + prefix, j0 + prefix);
+    if a_mid.is_empty() || b_mid.is_empty() {
+        script.push(false, i1, i1 + a_mid.len(), j1, j1 + b_mid.len());
+    } else {
+        let ((sx, sy), (fx, fy)) = middle_snake(a_mid, b_mid);
+        myers(&a_mid[..sx], &b_mid[..sy], i1, j1, script);
+        // The middle segment: one edit and a diagonal run, in either order
+        let (mut x, mut y) = (sx, sy);
+        while x < fx && y < fy && a_mid[x] == b_mid[y] {
+            x += 1;
+            y += 1;
+        }
+        script.push(true, i1 + sx, i1 + x, j1 + sy, j1 + y);
+        if fx - x > fy - y {
+            script.push(false, i1 + x, i1 + x + 1, j1 + y, j1 + y);
+            x += 1;
+        } else if fy - y > fx - x {
+            script.push(false, i1 + x, i1 + x, j1 + y, j1 + y + 1);
+            y += 1;
+        }
+        script.push(true, i1 + x, i1 + fx, j1 + y, j1 + fy);
+        myers(&a_mid[fx..], &b_mid[fy..], i1 + fx, j1 + fy, script);
+    }
+
+    script.push(true, i0 + a.len() - suffix, i0 + a.len(), j0 + b.len() - suffix, j0 + b.len());
+}
+
+/// Diff two lists of lines, returning opcodes in the format of
+/// difflib.SequenceMatcher.get_opcodes() with every run of changes merged into one
+/// replace, delete or insert
+pub fn opcodes(a: &[&str], b: &[&str]) -> Vec<Opcode> {
+    let (a, b) = intern(a, b);
+    let mut script = Script { opcodes: Vec::new() };
+
+    enum Work {
+        /// Lines still to diff
+        Range(usize, usize, usize, usize),
+        /// A finished run, equal or not
+        Run(bool, usize, usize, usize, usize),
+    }
+    let mut stack = vec![Work::Range(0, a.len(), 0, b.len())];
+    while let Some(work) = stack.pop() {
+        let (mut a1, mut a2, mut b1, mut b2) = match work {
+            Work::Run(equal, a1, a2, b1, b2) => {
+                script.push(equal, a1, a2, b1, b2);
+                continue;
+            }
+            Work::Range(a1, a2, b1, b2) => (a1, a2, b1, b2),
+        };
+        let (start_a, start_b, end_a, end_b) = (a1, b1, a2, b2);
+        while a1 < a2 && b1 < b2 && a[a1] == b[b1] {
+            a1 += 1;
+            b1 += 1;
+        }
+        while a1 < a2 && b1 < b2 && a[a2 - 1] == b[b2 - 1] {
+            a2 -= 1;
+            b2 -= 1;
+        }
+
+        let anchors = unique_anchors(&a, a1, a2, &b, b1, b2);
+        // Pushed in reverse so that the script is built front to back
+        stack.push(Work::Run(true, a2, end_a, b2, end_b));
+        if anchors.is_empty() {
+            let mut gap = Script { opcodes: Vec::new() };
+            myers(&a[a1..a2], &b[b1..b2], a1, b1, &mut gap);
+            for opcode in gap.opcodes.into_iter().rev() {
+                stack.push(Work::Run(opcode.tag == Tag::Equal, opcode.i1, opcode.i2, opcode.j1, opcode.j2));
+            }
+        } else {
+            let (mut next_a, mut next_b) = (a2, b2);
+            for &(i, j) in anchors.iter().rev() {
+                stack.push(Work::Range(i + 1, next_a, j + 1, next_b));
+                stack.push(Work::Run(true, i, i + 1, j, j + 1));
+                next_a = i;
+                next_b = j;
+            }
+            stack.push(Work::Range(a1, next_a, b1, next_b));
+        }
+        stack.push(Work::Run(true, start_a, a1, start_b, b1));
+    }
+    script.opcodes
+}
+
+/// Lines of a diff between two lists of lines, keeping only the unchanged lines within
+/// `context` lines of a change (like a unified diff without hunk headers). Old and new
+/// line numbers start at `old_start` and `new_start`.
+pub fn diff_lines<'a>(a: &[&'a str], b: &[&'a str], old_start: usize, new_start: usize, context: usize) -> Vec<DiffLine<'a>> {
+    let mut lines = Vec::new();
+    for opcode in opcodes(a, b) {
+        if opcode.tag == Tag::Equal {
+            lines.extend((opcode.j1..opcode.j2).map(|j| DiffLine { kind: ' ', content: b[j], line: new_start + j }));
+            continue;
+        }
+        lines.extend((opcode.i1..opcode.i2).map(|i| DiffLine { kind: '-', content: a[i], line: old_start + i }));
+        lines.extend((opcode.j1..opcode.j2).map(|j| DiffLine { kind: '+', content: b[j], line: new_start + j }));
+    }
+
+    // Keep unchanged lines within `context` lines of a change
+    let mut keep = vec![false; lines.len()];
+    let mut last_change: Option<usize> = None;
+    for (index, line) in lines.iter().enumerate() {
+        if line.kind != ' ' {
+            last_change = Some(index);
+            keep[index] = true;
+        } else if last_change.map_or(false, |change| index - change <= context) {
+            keep[index] = true;
+        }
+    }
+    let mut next_change: Option<usize> = None;
+    for index in (0..lines.len()).rev() {
+        if lines[index].kind != ' ' {
+            next_change = Some(index);
+        } else if next_change.map_or(false, |change| change - index <= context) {
+            keep[index] = true;
+        }
+    }
+    lines.into_iter().zip(keep).filter_map(|(line, keep)| keep.then_some(line)).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// Length of the longest common subsequence, by dynamic programming
+    fn lcs(a: &[&str], b: &[&str]) -> usize {
+        let mut table = vec![vec![0usize; b.len() + 1]; a.len() + 1];
+        for i in 0..a.len() {
+            for j in 0..b.len() {
+                table[i + 1][j + 1] = if a[i] == b[j] { table[i][j] + 1 } else { table[i][j + 1].max(table[i + 1][j]) };
+            }
+        }
+        table[a.len()][b.len()]
+    }
+
+    /// Check that `opcodes` cover both sides in order, alternate between equal and
+    /// changed runs and only pair equal lines; return the number of equal lines
+    fn check_script(a: &[&str], b: &[&str], opcodes: &[Opcode]) -> usize {
+        let (mut i, mut j, mut equal) = (0, 0, 0);
+        for (index, opcode) in opcodes.iter().enumerate() {
+            assert_eq!((opcode.i1, opcode.j1), (i, j), "{:?} {:?} {:?}", a, b, opcodes);
+            match opcode.tag {
+                Tag::Equal => {
+                    assert_eq!(a[opcode.i1..opcode.i2], b[opcode.j1..opcode.j2]);
+                    equal += opcode.i2 - opcode.i1;
+                }
+                Tag::Replace => assert!(opcode.i1 < opcode.i2 && opcode.j1 < opcode.j2),
+                Tag::Delete => assert!(opcode.i1 < opcode.i2 && opcode.j1 == opcode.j2),
+                Tag::Insert => assert!(opcode.i1 == opcode.i2 && opcode.j1 < opcode.j2),
+            }
+            if index > 0 {
+                assert_ne!(opcodes[index - 1].tag == Tag::Equal, opcode.tag == Tag::Equal);
+            }
+            i = opcode.i2;
+            j = opcode.j2;
+        }
+        assert_eq!((i, j), (a.len(), b.len()));
+        equal
+    }
+
+    /// Small deterministic xorshift generator, returning values below `n`
+    struct Random(u64);
+
+    impl Random {
+        fn below(&mut self, n: usize) -> usize {
+            self.0 ^= self.0 << 13;
+            self.0 ^= self.0 >> 7;
+            self.0 ^= self.0 << 17;
+            (self.0 % n as u64) as usize
+        }
+    }
+
+    const WORDS: [&str; 12] = ["a", "b", "c", "d", "e", "f", "g", "h", "", "x1", "x2", "x3"];
+
+    #[test]
+    fn opcodes_match_difflib_format() {
+        let a = ["a", "b", "c", "d"];
+        let b = ["a", "x", "c", "d", "e"];
+        let tags: Vec<(Tag, usize, usize, usize, usize)> =
+            opcodes(&a, &b).iter().map(|o| (o.tag, o.i1, o.i2, o.j1, o.j2)).collect();
+        assert_eq!(
+            tags,
+            vec![
+                (Tag::Equal, 0, 1, 0, 1),
+                (Tag::Replace, 1, 2, 1, 2),
+                (Tag::Equal, 2, 4, 2, 4),
+                (Tag::Insert, 4, 4, 4, 5),
+            ]
+        );
+        assert!(opcodes(&[], &[]).is_empty());
+        assert_eq!(opcodes(&["a"], &[]).iter().map(|o| o.tag).collect::<Vec<_>>(), vec![Tag::Delete]);
+    }
+
+    #[test]
+    fn opcodes_are_valid_edit_scripts() {
+        let mut random = Random(12345);
+        for round in 0..5000 {
+            let alphabet = if round % 2 == 0 { 3 } else { WORDS.len() };
+            let a: Vec<&str> = (0..random.below(30)).map(|_| WORDS[random.below(alphabet)]).collect();
+            let mut b = a.clone();
+            for _ in 0..random.below(8) {
+                let position = random.below(b.len() + 1);
+                if random.below(2) == 0 && position < b.len() {
+                    b.remove(position);
+                } else {
+                    b.insert(position, WORDS[random.below(alphabet)]);
+                }
+            }
+            let equal = check_script(&a, &b, &opcodes(&a, &b));
+            assert!(equal <= lcs(&a, &b));
+        }
+    }
+
+    #[test]
+    fn myers_finds_a_longest_common_subsequence() {
+        let mut random = Random(67890);
+        for _ in 0..5000 {
+            let a: Vec<&str> = (0..random.below(40)).map(|_| WORDS[random.below(4)]).collect();
+            let b: Vec<&str> = (0..random.below(40)).map(|_| WORDS[random.below(4)]).collect();
+            let (a_ids, b_ids) = intern(&a, &b);
+            let mut script = Script { opcodes: Vec::new() };
+            myers(&a_ids, &b_ids, 0, 0, &mut script);
+            assert_eq!(check_script(&a, &b, &script.opcodes), lcs(&a, &b), "{:?} {:?}", a, b);
+        }
+    }
+
+    #[test]
+    fn diff_lines_keeps_context_around_changes() {
+        let old = ["def f():", "    a", "    b", "    c", "    d", "    e"];
+        let new = ["def f():", "    a", "    b", "    X", "    d", "    e"];
+        let shown: Vec<(char, &str, usize)> =
+            diff_lines(&old, &new, 10, 20, 1).iter().map(|l| (l.kind, l.content, l.line)).collect();
+        assert_eq!(shown, vec![(' ', "    b", 22), ('-', "    c", 13), ('+', "    X", 23), (' ', "    d", 24)]);
+        assert!(diff_lines(&["x"], &["x"], 1, 1, 2).is_empty());
+    }
+}
@@ -1,37 +1,368 @@
 //! Defines the _pysealer module which contains all of the Rust code that can be imported into Python.
+//!
+//! Every cryptographic operation runs with the GIL released so that Python thread pools
+//! calling into this module scale across cores.
 
 use pyo3::prelude::*;
+use pyo3::buffer::PyBuffer;
+use pyo3::types::PyString;
+use std::path::PathBuf;
 
 mod crypto;
+mod diff;
+mod scanner;
+mod tree;
+
+/// Read-only view of the bytes of a str (as UTF-8) or of any buffer-protocol object
+///
+/// Neither form copies the data: str exposes its cached UTF-8 representation and
+/// bytes, bytearray, memoryview and mmap objects are read through the buffer protocol.
+/// Because a str is viewed as its UTF-8 encoding, `"source"` and `b"source"` produce
+/// identical signatures. Mutating a bytearray or mmap while it is being signed or
+/// verified is not supported.
+enum SourceBytes<'a> {
+    Text(&'a [u8]),
+    Buffer(PyBuffer<u8>),
+}
+
+impl<'a> SourceBytes<'a> {
+    fn extract(obj: &'a Bound<'_, PyAny>) -> PyResult<Self> {
+        if let Ok(text) = obj.downcast::<PyString>() {
+            return Ok(SourceBytes::Text(text.to_str()?.as_bytes()));
+        }
+
+        let buffer = PyBuffer::<u8>::get(obj)?;
+        if !buffer.is_c_contiguous() {
+            return Err(PyErr::new::<pyo3::exceptions::PyBufferError, _>(
+                "source buffer must be C-contiguous",
+            ));
+        }
+        Ok(SourceBytes::Buffer(buffer))
+    }
+
+    fn as_bytes(&self) -> &[u8] {
+        match self {
+            SourceBytes::Text(bytes) => bytes,
+            SourceBytes::Buffer(buffer) => {
+                if buffer.len_bytes() == 0 {
+                    return &[];
+                }
+                // SAFETY: the buffer is C-contiguous, holds `len_bytes` bytes and stays
+                // exported (so its memory stays alive) for as long as `self` exists.
+                unsafe { std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes()) }
+            }
+        }
+    }
+}
+
+/// Pick the seal mode for the `prehash` flag exposed to Python
+fn seal_mode(prehash: bool) -> crypto::SealMode {
+    if prehash {
+        crypto::SealMode::Prehashed
+    } else {
+        crypto::SealMode::Pure
+    }
+}
+
+/// Extract zero-copy views of many sources
+fn extract_sources<'a>(sources: &'a [Bound<'_, PyAny>]) -> PyResult<Vec<SourceBytes<'a>>> {
+    sources.iter().map(SourceBytes::extract).collect()
+}
+
+/// Parse the `encoding` argument exposed to Python
+fn seal_encoding(encoding: &str) -> PyResult<crypto::SealEncoding> {
+    crypto::SealEncoding::from_name(encoding)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
+}
+
+/// Sign every source with the GIL released, spreading the work across a rayon pool
+fn sign_sources(py: Python<'_>, signing_key: &ed25519_dalek::SigningKey, sources: &[Bound<'_, PyAny>], prehash: bool, encoding: &str) -> PyResult<Vec<String>> {
+    let views = extract_sources(sources)?;
+    let data: Vec<&[u8]> = views.iter().map(SourceBytes::as_bytes).collect();
+    let mode = seal_mode(prehash);
+    let encoding = seal_encoding(encoding)?;
+    Ok(py.allow_threads(|| crypto::sign_many(signing_key, &data, mode, encoding)))
+}
+
+/// Verify every (source, signature) pair with the GIL released
+fn verify_sources(py: Python<'_>, verifying_key: &ed25519_dalek::VerifyingKey, sources: &[Bound<'_, PyAny>], signatures: &[String]) -> PyResult<Vec<bool>> {
+    let views = extract_sources(sources)?;
+    let data: Vec<&[u8]> = views.iter().map(SourceBytes::as_bytes).collect();
+    let signatures: Vec<&str> = signatures.iter().map(String::as_str).collect();
+    py.allow_threads(|| crypto::verify_many(verifying_key, &data, &signatures))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
+}
+
+/// Ed25519 private key decoded once from Base58 and reused for every signature
+#[pyclass(name = "SigningKey", module = "pysealer._pysealer", frozen)]
+struct PySigningKey {
+    inner: ed25519_dalek::SigningKey,
+}
+
+#[pymethods]
+impl PySigningKey {
+    /// Decode a Base58 private key into a reusable signing key
+    #[staticmethod]
+    fn from_base58(py: Python<'_>, private_key: &str) -> PyResult<Self> {
+        py.allow_threads(|| crypto::decode_signing_key(private_key))
+            .map(|inner| PySigningKey { inner })
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
+    }
+
+    /// Sign a str or bytes-like object and return its seal
+    /// With prehash=True the source is hashed once with SHA-512 and signed with Ed25519ph
+    /// The signature is encoded as "base58" (default) or "hex" (faster to encode and decode)
+    #[pyo3(signature = (data, prehash = false, encoding = "base58"))]
+    fn sign(&self, py: Python<'_>, data: &Bound<'_, PyAny>, prehash: bool, encoding: &str) -> PyResult<String> {
+        let source = SourceBytes::extract(data)?;
+        let bytes = source.as_bytes();
+        let mode = seal_mode(prehash);
+        let encoding = seal_encoding(encoding)?;
+        Ok(py.allow_threads(|| crypto::seal(&self.inner, bytes, mode, encoding)))
+    }
+
+    /// Sign many sources in one call across all cores
+    /// Returns the seals in the same order as the sources
+    #[pyo3(signature = (sources, prehash = false, encoding = "base58"))]
+    fn sign_many<'py>(&self, py: Python<'py>, sources: Vec<Bound<'py, PyAny>>, prehash: bool, encoding: &str) -> PyResult<Vec<String>> {
+        sign_sources(py, &self.inner, &sources, prehash, encoding)
+    }
+
+    /// Verifying key matching this signing key
+    fn verifying_key(&self) -> PyVerifyingKey {
+        PyVerifyingKey { inner: self.inner.verifying_key() }
+    }
+
+    fn __repr__(&self) -> String {
+        "SigningKey(<hidden>)".to_string()
+    }
+}
+
+/// Ed25519 public key decoded and decompressed once from Base58
+#[pyclass(name = "VerifyingKey", module = "pysealer._pysealer", frozen)]
+struct PyVerifyingKey {
+    inner: ed25519_dalek::VerifyingKey,
+}
+
+#[pymethods]
+impl PyVerifyingKey {
+    /// Decode a Base58 public key into a reusable verifying key
+    #[staticmethod]
+    fn from_base58(py: Python<'_>, public_key: &str) -> PyResult<Self> {
+        py.allow_threads(|| crypto::decode_verifying_key(public_key))
+            .map(|inner| PyVerifyingKey { inner })
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
+    }
+
+    /// Verify a seal over a str or bytes-like object
+    /// Plain and pre-hashed seals are both accepted; the scheme is read from the seal
+    /// Returns true if the signature is valid
+    fn verify(&self, py: Python<'_>, data: &Bound<'_, PyAny>, signature: &str) -> PyResult<bool> {
+        let source = SourceBytes::extract(data)?;
+        let bytes = source.as_bytes();
+        py.allow_threads(|| crypto::verify(&self.inner, bytes, signature))
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
+    }
+
+    /// Verify many signatures in one call using Ed25519 batch verification
+    /// Returns one verdict per source, in order
+    fn verify_many<'py>(&self, py: Python<'py>, sources: Vec<Bound<'py, PyAny>>, signatures: Vec<String>) -> PyResult<Vec<bool>> {
+        verify_sources(py, &self.inner, &sources, &signatures)
+    }
+
+    fn __repr__(&self) -> String {
+        format!("VerifyingKey('{}')", bs58::encode(self.inner.to_bytes()).into_string())
+    }
+}
 
 /// Generate a new Ed25519 key pair
 /// Returns (private_key_hex, public_key_hex)
 #[pyfunction]
-fn generate_keypair() -> (String, String) {
-    crypto::generate_keypair()
+fn generate_keypair(py: Python<'_>) -> (String, String) {
+    py.allow_threads(crypto::generate_keypair)
 }
 
 /// Sign data using Ed25519 with a private key
 /// Returns the signature as a hex string
 #[pyfunction]
-fn generate_signature(data: &str, private_key_hex: &str) -> PyResult<String> {
-    crypto::generate_signature(data, private_key_hex)
+fn generate_signature(py: Python<'_>, data: &Bound<'_, PyAny>, private_key_hex: &str) -> PyResult<String> {
+    let source = SourceBytes::extract(data)?;
+    let bytes = source.as_bytes();
+    py.allow_threads(|| crypto::generate_signature(bytes, private_key_hex))
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
 }
 
+/// Sign many sources in parallel with a private key
+/// Returns the seals in the same order as the sources
+#[pyfunction]
+#[pyo3(signature = (sources, private_key, prehash = false, encoding = "base58"))]
+fn sign_many<'py>(py: Python<'py>, sources: Vec<Bound<'py, PyAny>>, private_key: &str, prehash: bool, encoding: &str) -> PyResult<Vec<String>> {
+    let signing_key = py.allow_threads(|| crypto::decode_signing_key(private_key))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))?;
+    sign_sources(py, &signing_key, &sources, prehash, encoding)
+}
+
+/// SHA-512 digest of a str or bytes-like object as a hex string
+/// This is the digest that pre-hashed seals sign
+#[pyfunction]
+fn source_digest(py: Python<'_>, data: &Bound<'_, PyAny>) -> PyResult<String> {
+    let source = SourceBytes::extract(data)?;
+    let bytes = source.as_bytes();
+    Ok(py.allow_threads(|| crypto::source_digest(bytes)))
+}
+
+/// A scanned decorator as (line, dotted_name, is_call)
+type ScannedDecorator = (usize, Option<String>, bool);
+
+/// A scanned definition as (kind, name, line_start, line_end, col_offset, in_class, decorators)
+type ScannedDefinition = (&'static str, String, usize, usize, usize, bool, Vec<ScannedDecorator>);
+
+/// Find every function and class definition in a Python source without parsing it into an AST
+/// Raises ValueError for sources the scanner does not handle so callers can fall back to ast
+#[pyfunction]
+fn scan_source(py: Python<'_>, source: &str) -> PyResult<Vec<ScannedDefinition>> {
+    let definitions = py.allow_threads(|| scanner::scan(source))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))?;
+    Ok(definitions
+        .into_iter()
+        .map(|definition| {
+            let decorators = definition
+                .decorators
+                .into_iter()
+                .map(|decorator| (decorator.line, decorator.name, decorator.is_call))
+                .collect();
+            (
+                definition.kind,
+                definition.name,
+                definition.line_start,
+                definition.line_end,
+                definition.col_offset,
+                definition.in_class,
+                decorators,
+            )
+        })
+        .collect())
+}
+
+/// A checked definition as (name, line_start, line_end, seal, valid)
+type TreeDefinition = (String, usize, usize, Option<String>, bool);
+
+/// A checked file as (path, status, definitions, error)
+type TreeFile = (String, &'static str, Vec<TreeDefinition>, Option<String>);
+
+/// Convert the reports of the tree engine into (path, status, definitions, error) tuples
+fn tree_files(files: Vec<(PathBuf, tree::FileReport)>) -> Vec<TreeFile> {
+    files
+        .into_iter()
+        .map(|(path, report)| {
+            let path = path.to_string_lossy().into_owned();
+            match report {
+                tree::FileReport::Checked(definitions) => {
+                    let definitions = definitions
+                        .into_iter()
+                        .map(|d| (d.name, d.line_start, d.line_end, d.seal, d.valid))
+                        .collect();
+                    (path, "checked", definitions, None)
+                }
+                tree::FileReport::Unsupported => (path, "unsupported", Vec::new(), None),
+                tree::FileReport::Error(message) => (path, "error", Vec::new(), Some(message)),
+            }
+        })
+        .collect()
+}
+
+/// Check the given files in Rust
+/// Reading, scanning and one batched verification all run with the GIL released on `jobs`
+/// threads (0 uses one thread per core). Returns one (path, status, definitions, error) tuple
+/// per file in the order of paths, where status is "checked", "unsupported" (the file has to be
+/// checked with Python's parser) or "error"
+#[pyfunction]
+#[pyo3(signature = (paths, public_key, jobs = 0))]
+fn check_files(py: Python<'_>, paths: Vec<PathBuf>, public_key: &str, jobs: usize) -> PyResult<Vec<TreeFile>> {
+    let files = py.allow_threads(|| {
+        let verifying_key = crypto::decode_verifying_key(public_key)?;
+        tree::check_files(paths, &verifying_key, jobs)
+    })
+    .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))?;
+    Ok(tree_files(files))
+}
+
+/// A diff opcode as (tag, i1, i2, j1, j2), like those of difflib.SequenceMatcher
+type DiffOpcode = (&'static str, usize, usize, usize, usize);
+
+/// Diff two lists of lines (patience diff, with Myers' algorithm between anchors)
+/// Returns opcodes like difflib.SequenceMatcher.get_opcodes(), with every run of changes
+/// merged into one "replace", "delete" or "insert"
+#[pyfunction]
+fn diff_opcodes(py: Python<'_>, old_lines: Vec<String>, new_lines: Vec<String>) -> Vec<DiffOpcode> {
+    py.allow_threads(|| {
+        let old_lines: Vec<&str> = old_lines.iter().map(String::as_str).collect();
+        let new_lines: Vec<&str> = new_lines.iter().map(String::as_str).collect();
+        diff::opcodes(&old_lines, &new_lines)
+            .into_iter()
+            .map(|opcode| (opcode.tag.name(), opcode.i1, opcode.i2, opcode.j1, opcode.j2))
+            .collect()
+    })
+}
+
+/// A diff line as (diff_type, content, line_number), where diff_type is ' ', '-' or '+'
+type DiffLineTuple = (&'static str, String, usize);
+
+/// Diff two lists of lines and keep the changes with context_lines unchanged lines around them
+/// Removed lines are numbered from old_start, added and unchanged lines from new_start
+#[pyfunction]
+#[pyo3(signature = (old_lines, new_lines, old_start = 1, new_start = 1, context_lines = 2))]
+fn diff_lines(py: Python<'_>, old_lines: Vec<String>, new_lines: Vec<String>, old_start: usize, new_start: usize, context_lines: usize) -> Vec<DiffLineTuple> {
+    py.allow_threads(|| {
+        let old_lines: Vec<&str> = old_lines.iter().map(String::as_str).collect();
+        let new_lines: Vec<&str> = new_lines.iter().map(String::as_str).collect();
+        diff::diff_lines(&old_lines, &new_lines, old_start, new_start, context_lines)
+            .into_iter()
+            .map(|line| {
+                let kind = match line.kind {
+                    '-' => "-",
+                    '+' => "+",
+                    _ => " ",
+                };
+                (kind, line.content.to_string(), line.line)
+            })
+            .collect()
+    })
+}
+
 /// Verify an Ed25519 signature
 /// Returns true if the signature is valid
 #[pyfunction]
-fn verify_signature(data: &str, signature_hex: &str, public_key_hex: &str) -> PyResult<bool> {
-    crypto::verify_signature(data, signature_hex, public_key_hex)
+fn verify_signature(py: Python<'_>, data: &Bound<'_, PyAny>, signature_hex: &str, public_key_hex: &str) -> PyResult<bool> {
+    let source = SourceBytes::extract(data)?;
+    let bytes = source.as_bytes();
+    py.allow_threads(|| crypto::verify_signature(bytes, signature_hex, public_key_hex))
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))
 }
 
+/// Verify many signatures made with the same public key
+/// Returns one verdict per source, in order
+#[pyfunction]
+fn verify_many<'py>(py: Python<'py>, sources: Vec<Bound<'py, PyAny>>, signatures: Vec<String>, public_key: &str) -> PyResult<Vec<bool>> {
+    let verifying_key = py.allow_threads(|| crypto::decode_verifying_key(public_key))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(e))?;
+    verify_sources(py, &verifying_key, &sources, &signatures)
+}
+
 /// _pysealer pyo3 module definition
 #[pymodule]
 fn _pysealer(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<PySigningKey>()?;
+    m.add_class::<PyVerifyingKey>()?;
+    m.add_function(wrap_pyfunction!(check_files, m)?)?;
+    m.add_function(wrap_pyfunction!(diff_lines, m)?)?;
+    m.add_function(wrap_pyfunction!(diff_opcodes, m)?)?;
     m.add_function(wrap_pyfunction!(generate_keypair, m)?)?;
     m.add_function(wrap_pyfunction!(generate_signature, m)?)?;
+    m.add_function(wrap_pyfunction!(scan_source, m)?)?;
+    m.add_function(wrap_pyfunction!(sign_many, m)?)?;
+    m.add_function(wrap_pyfunction!(source_digest, m)?)?;
     m.add_function(wrap_pyfunction!(verify_signature, m)?)?;
+    m.add_function(wrap_pyfunction!(verify_many, m)?)?;
     Ok(())
 }
@@ -0,0 +1,731 @@
+//! Lightweight scanner that locates definitions and their decorators in Python source.
+//!
+//! The scanner tokenizes just enough of the language (strings, f-strings, comments,
+//! brackets, line continuations and indentation) to split the source into logical
+//! lines and track blocks. It never builds a syntax tree. Anything it does not
+//! understand is reported as an error so that callers can fall back to Python's
+//! own parser.
+
+/// A decorator applied to a definition
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Decorator {
+    /// 1-based line of the `@`
+    pub line: usize,
+    /// Dotted name of the decorator (or of the called object for `@name(...)`),
+    /// None when the decorator is any other expression
+    pub name: Option<String>,
+    /// Whether the decorator is a call such as `@pysealer._sig()`
+    pub is_call: bool,
+}
+
+impl Decorator {
+    /// Seal recorded by a `@pysealer._<seal>()` decorator, None for any other decorator
+    pub fn seal(&self) -> Option<&str> {
+        if !self.is_call {
+            return None;
+        }
+        self.name
+            .as_deref()?
+            .strip_prefix("pysealer._")
+            .filter(|seal| !seal.contains('.'))
+    }
+}
+
+/// A function, async function or class definition
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Definition {
+    /// "FunctionDef", "AsyncFunctionDef" or "ClassDef", matching the ast node names
+    pub kind: &'static str,
+    pub name: String,
+    /// 1-based line of the `def`/`class` keyword (decorators excluded)
+    pub line_start: usize,
+    /// 1-based line where the last statement of the body ends
+    pub line_end: usize,
+    /// Indentation of the definition in bytes
+    pub col_offset: usize,
+    /// Whether the definition sits directly in the body of a class
+    pub in_class: bool,
+    pub decorators: Vec<Decorator>,
+}
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum Tok {
+    /// Identifier or keyword, as a byte range into the source
+    Name(usize, usize),
+    /// Single ASCII operator or delimiter byte
+    Op(u8),
+    /// String or number literal
+    Literal,
+}
+
+#[derive(Debug, Clone, Copy)]
+struct Token {
+    tok: Tok,
+    /// Bracket depth before the token
+    depth: usize,
+}
+
+struct LogicalLine {
+    start: usize,
+    end: usize,
+    indent: usize,
+}
+
+fn is_name_start(c: u8) -> bool {
+    c.is_ascii_alphabetic() || c == b'_' || c >= 0x80
+}
+
+fn is_name_char(c: u8) -> bool {
+    c.is_ascii_alphanumeric() || c == b'_' || c >= 0x80
+}
+
+/// Whether an identifier directly followed by a quote is a string prefix
+/// Returns Some(is_formatted) for valid prefixes
+fn string_prefix(prefix: &[u8]) -> Option<bool> {
+    if prefix.len() > 2 {
+        return None;
+    }
+    let mut formatted = false;
+    for &c in prefix {
+        match c.to_ascii_lowercase() {
+            b'r' | b'b' | b'u' => {}
+            b'f' | b't' => formatted = true,
+            _ => return None,
+        }
+    }
+    Some(formatted)
+}
+
+struct Lexer<'a> {
+    src: &'a [u8],
+    pos: usize,
+    line: usize,
+}
+
+impl<'a> Lexer<'a> {
+    fn new(src: &'a [u8]) -> Self {
+        Lexer { src, pos: 0, line: 1 }
+    }
+
+    fn peek(&self) -> Option<u8> {
+        self.src.get(self.pos).copied()
+    }
+
+    fn peek_at(&self, offset: usize) -> Option<u8> {
+        self.src.get(self.pos + offset).copied()
+    }
+
+    fn error<T>(&self, message: &str) -> Result<T, String> {
+        Err(format!("{} (line {})", message, self.line))
+    }
+
+    /// Consume a newline ("\n" or "\r\n") at the current position
+    fn newline(&mut self) -> Result<(), String> {
+        match self.peek() {
+            Some(b'\n') => self.pos += 1,
+            Some(b'\r') if self.peek_at(1) == Some(b'\n') => self.pos += 2,
+            _ => return self.error("unsupported line ending"),
+        }
+        self.line += 1;
+        Ok(())
+    }
+
+    fn at_newline(&self) -> bool {
+        matches!(self.peek(), Some(b'\n') | Some(b'\r'))
+    }
+
+    fn skip_comment(&mut self) {
+        while let Some(c) = self.peek() {
+            if c == b'\n' || c == b'\r' {
+                break;
+            }
+            self.pos += 1;
+        }
+    }
+
+    /// Consume a string literal whose opening quote is at the current position
+    fn string(&mut self, formatted: bool) -> Result<(), String> {
+        let quote = self.src[self.pos];
+        let triple = self.peek_at(1) == Some(quote) && self.peek_at(2) == Some(quote);
+        self.pos += if triple { 3 } else { 1 };
+
+        loop {
+            let c = match self.peek() {
+                Some(c) => c,
+                None => return self.error("unterminated string"),
+            };
+            match c {
+                b'\\' => {
+                    self.pos += 1;
+                    if self.at_newline() {
+                        self.newline()?;
+                    } else if self.peek().is_some() {
+                        self.pos += 1;
+                    }
+                }
+                b'\n' | b'\r' => {
+                    if !triple {
+                        return self.error("unterminated string");
+                    }
+                    self.newline()?;
+                }
+                _ if c == quote => {
+                    if !triple {
+                        self.pos += 1;
+                        return Ok(());
+                    }
+                    if self.peek_at(1) == Some(quote) && self.peek_at(2) == Some(quote) {
+                        self.pos += 3;
+                        return Ok(());
+                    }
+                    self.pos += 1;
+                }
+                b'{' if formatted => {
+                    self.pos += 1;
+                    if self.peek() == Some(b'{') {
+                        self.pos += 1;
+                    } else {
+                        self.replacement_field(triple)?;
+                    }
+                }
+                b'}' if formatted => {
+                    self.pos += 1;
+                    if self.peek() == Some(b'}') {
+                        self.pos += 1;
+                    } else {
+                        return self.error("single '}' in f-string");
+                    }
+                }
+                0 => return self.error("null byte in source"),
+                _ => self.pos += 1,
+            }
+        }
+    }
+
+    /// Consume an f-string replacement field up to and including its closing `}`
+    fn replacement_field(&mut self, triple: bool) -> Result<(), String> {
+        let mut depth = 0usize;
+        loop {
+            let c = match self.peek() {
+                Some(c) => c,
+                None => return self.error("unterminated f-string"),
+            };
+            match c {
+                b'(' | b'[' | b'{' => {
+                    depth += 1;
+                    self.pos += 1;
+                }
+                b')' | b']' => {
+                    depth = match depth.checked_sub(1) {
+                        Some(depth) => depth,
+                        None => return self.error("unmatched bracket in f-string"),
+                    };
+                    self.pos += 1;
+                }
+                b'}' => {
+                    self.pos += 1;
+                    if depth == 0 {
+                        return Ok(());
+                    }
+                    depth -= 1;
+                }
+                b':' if depth == 0 => {
+                    self.pos += 1;
+                    return self.format_spec(triple);
+                }
+                b'\'' | b'"' => self.string(false)?,
+                b'#' => self.skip_comment(),
+                b'\n' | b'\r' => self.newline()?,
+                b'\\' => return self.error("backslash in f-string expression"),
+                _ if is_name_start(c) => {
+                    let start = self.pos;
+                    while self.peek().is_some_and(is_name_char) {
+                        self.pos += 1;
+                    }
+                    if matches!(self.peek(), Some(b'\'') | Some(b'"')) {
+                        match string_prefix(&self.src[start..self.pos]) {
+                            Some(formatted) => self.string(formatted)?,
+                            None => return self.error("invalid string prefix"),
+                        }
+                    }
+                }
+                0 => return self.error("null byte in source"),
+                _ => self.pos += 1,
+            }
+        }
+    }
+
+    /// Consume the format spec of a replacement field up to and including its closing `}`
+    fn format_spec(&mut self, triple: bool) -> Result<(), String> {
+        loop {
+            match self.peek() {
+                None => return self.error("unterminated f-string"),
+                Some(b'{') => {
+                    self.pos += 1;
+                    self.replacement_field(triple)?;
+                }
+                Some(b'}') => {
+                    self.pos += 1;
+                    return Ok(());
+                }
+                Some(b'\n') | Some(b'\r') => {
+                    if !triple {
+                        return self.error("unterminated f-string");
+                    }
+                    self.newline()?;
+                }
+                Some(0) => return self.error("null byte in source"),
+                Some(_) => self.pos += 1,
+            }
+        }
+    }
+
+    /// Read the next logical line into `tokens`, skipping blank and comment-only lines
+    /// Returns None at the end of the source
+    fn logical_line(&mut self, tokens: &mut Vec<Token>) -> Result<Option<LogicalLine>, String> {
+        tokens.clear();
+
+        // Skip blank lines and measure the indentation of the first real one
+        let indent = loop {
+            let mut indent = 0;
+            while let Some(c) = self.peek() {
+                match c {
+                    b' ' => {
+                        indent += 1;
+                        self.pos += 1;
+                    }
+                    b'\t' | b'\x0c' => return self.error("tabs and form feeds in indentation are not supported"),
+                    _ => break,
+                }
+            }
+            match self.peek() {
+                None => return Ok(None),
+                Some(b'\n') | Some(b'\r') => self.newline()?,
+                Some(b'#') => self.skip_comment(),
+                Some(b'\\') => return self.error("line continuation on a blank line"),
+                Some(_) => break indent,
+            }
+        };
+
+        let start = self.line;
+        let mut end = start;
+        let mut brackets: Vec<u8> = Vec::new();
+
+        loop {
+            let c = match self.peek() {
+                Some(c) => c,
+                None => {
+                    if !brackets.is_empty() {
+                        return self.error("unexpected end of file inside brackets");
+                    }
+                    break;
+                }
+            };
+            let depth = brackets.len();
+            match c {
+                b' ' | b'\t' | b'\x0c' => self.pos += 1,
+                b'\n' | b'\r' => {
+                    self.newline()?;
+                    if brackets.is_empty() {
+                        break;
+                    }
+                }
+                b'#' => self.skip_comment(),
+                b'\\' => {
+                    self.pos += 1;
+                    if !self.at_newline() {
+                        return self.error("unexpected character after line continuation");
+                    }
+                    self.newline()?;
+                    if self.peek().is_none() {
+                        return self.error("unexpected end of file after line continuation");
+                    }
+                }
+                b'\'' | b'"' => {
+                    self.string(false)?;
+                    tokens.push(Token { tok: Tok::Literal, depth });
+                    end = self.line;
+                }
+                _ if is_name_start(c) => {
+                    let name_start = self.pos;
+                    while self.peek().is_some_and(is_name_char) {
+                        self.pos += 1;
+                    }
+                    let prefix = &self.src[name_start..self.pos];
+                    let tok = match (self.peek(), string_prefix(prefix)) {
+                        (Some(b'\'') | Some(b'"'), Some(formatted)) => {
+                            self.string(formatted)?;
+                            Tok::Literal
+                        }
+                        _ => Tok::Name(name_start, self.pos),
+                    };
+                    tokens.push(Token { tok, depth });
+                    end = self.line;
+                }
+                _ if c.is_ascii_digit() || (c == b'.' && self.peek_at(1).is_some_and(|n| n.is_ascii_digit())) => {
+                    while self.peek().is_some_and(|n| n.is_ascii_alphanumeric() || n == b'_' || n == b'.') {
+                        self.pos += 1;
+                    }
+                    tokens.push(Token { tok: Tok::Literal, depth });
+                    end = self.line;
+                }
+                b'(' | b'[' | b'{' => {
+                    self.pos += 1;
+                    brackets.push(c);
+                    tokens.push(Token { tok: Tok::Op(c), depth });
+                    end = self.line;
+                }
+                b')' | b']' | b'}' => {
+                    let opening = match c {
+                        b')' => b'(',
+                        b']' => b'[',
+                        _ => b'{',
+                    };
+                    if brackets.pop() != Some(opening) {
+                        return self.error("unmatched bracket");
+                    }
+                    self.pos += 1;
+                    tokens.push(Token { tok: Tok::Op(c), depth: depth - 1 });
+                    end = self.line;
+                }
+                0 => return self.error("null byte in source"),
+                _ => {
+                    self.pos += 1;
+                    tokens.push(Token { tok: Tok::Op(c), depth });
+                    end = self.line;
+                }
+            }
+        }
+
+        Ok(Some(LogicalLine { start, end, indent }))
+    }
+}
+
+/// Text of a name token, rejecting identifiers Python would NFKC-normalize
+fn name_text<'s>(src: &'s [u8], start: usize, end: usize) -> Result<&'s str, String> {
+    let bytes = &src[start..end];
+    if !bytes.is_ascii() {
+        return Err("non-ASCII identifiers are not supported".to_string());
+    }
+    // ASCII bytes are always valid UTF-8
+    Ok(std::str::from_utf8(bytes).unwrap_or_default())
+}
+
+/// Parse the tokens after `@` into a decorator
+fn parse_decorator(src: &[u8], tokens: &[Token], line: usize) -> Result<Decorator, String> {
+    let mut dotted = String::new();
+    let mut index = 0;
+    while let Some(Token { tok: Tok::Name(start, end), .. }) = tokens.get(index) {
+        if !dotted.is_empty() {
+            dotted.push('.');
+        }
+        dotted.push_str(name_text(src, *start, *end)?);
+        index += 1;
+        match tokens.get(index) {
+            Some(Token { tok: Tok::Op(b'.'), .. }) => index += 1,
+            _ => break,
+        }
+    }
+
+    // Any other expression; it is still a call when it ends by calling something
+    let opening = tokens.iter().rposition(|token| token.tok == Tok::Op(b'(') && token.depth == 0);
+    let ends_with_call = matches!(tokens.last(), Some(Token { tok: Tok::Op(b')'), depth: 0 }))
+        && opening.is_some_and(|opening| opening > 0);
+    let other = Decorator { line, name: None, is_call: ends_with_call };
+    if dotted.is_empty() || dotted.ends_with('.') {
+        return Ok(other);
+    }
+    if index == tokens.len() {
+        return Ok(Decorator { line, name: Some(dotted), is_call: false });
+    }
+    if tokens[index].tok != Tok::Op(b'(') {
+        return Ok(other);
+    }
+    // A call only if the closing parenthesis of the first call ends the decorator
+    let depth = tokens[index].depth;
+    let closing = tokens[index + 1..]
+        .iter()
+        .position(|token| token.tok == Tok::Op(b')') && token.depth == depth)
+        .map(|offset| index + 1 + offset);
+    match closing {
+        Some(closing) if closing == tokens.len() - 1 => Ok(Decorator { line, name: Some(dotted), is_call: true }),
+        _ => Ok(other),
+    }
+}
+
+/// Recognise a `def`, `async def` or `class` statement
+/// Returns the node kind and the index of the name token
+fn definition_header(src: &[u8], tokens: &[Token]) -> Option<(&'static str, usize)> {
+    let keyword = |index: usize, word: &[u8]| match tokens.get(index) {
+        Some(Token { tok: Tok::Name(start, end), .. }) => &src[*start..*end] == word,
+        _ => false,
+    };
+    if keyword(0, b"def") {
+        Some(("FunctionDef", 1))
+    } else if keyword(0, b"class") {
+        Some(("ClassDef", 1))
+    } else if keyword(0, b"async") && keyword(1, b"def") {
+        Some(("AsyncFunctionDef", 2))
+    } else {
+        None
+    }
+}
+
+enum BlockKind {
+    Definition { index: usize, class: bool },
+    Other,
+}
+
+struct Block {
+    kind: BlockKind,
+    /// Depth of the statements in the block body in the ast node tree
+    depth: usize,
+}
+
+/// First name token of a logical line
+fn first_word<'s>(src: &'s [u8], tokens: &[Token]) -> &'s [u8] {
+    match tokens.first() {
+        Some(Token { tok: Tok::Name(start, end), .. }) => &src[*start..*end],
+        _ => b"",
+    }
+}
+
+/// Find every definition in a Python source
+///
+/// Definitions are returned in the order `ast.walk` visits them: breadth-first by
+/// block nesting, in source order within each level.
+pub fn scan(source: &str) -> Result<Vec<Definition>, String> {
+    let src = source.as_bytes();
+    let mut lexer = Lexer::new(src);
+    let mut tokens = Vec::new();
+
+    let mut definitions: Vec<Definition> = Vec::new();
+    let mut nesting: Vec<usize> = Vec::new();
+
+    // Indentation of every open block body (the module body has indentation 0)
+    let mut indents: Vec<usize> = vec![0];
+    let mut blocks: Vec<Block> = Vec::new();
+    let mut opens_block: Option<Block> = None;
+    // Node depth of the latest if/elif statement at each indentation level, so that
+    // elif/else bodies get the depth of the nested ast.If nodes they become
+    let mut if_depths: Vec<Option<usize>> = vec![None];
+
+    let mut decorators: Vec<Decorator> = Vec::new();
+    let mut decorator_indent = 0;
+    let mut last_end = 0;
+
+    while let Some(line) = lexer.logical_line(&mut tokens)? {
+        let top = *indents.last().unwrap_or(&0);
+        if let Some(block) = opens_block.take() {
+            if line.indent <= top {
+                return Err(format!("expected an indented block (line {})", line.start));
+            }
+            indents.push(line.indent);
+            if_depths.push(None);
+            blocks.push(block);
+        } else if line.indent > top {
+            return Err(format!("unexpected indent (line {})", line.start));
+        } else {
+            while line.indent < *indents.last().unwrap_or(&0) {
+                indents.pop();
+                if_depths.pop();
+                if let Some(Block { kind: BlockKind::Definition { index, .. }, .. }) = blocks.pop() {
+                    definitions[index].line_end = last_end;
+                }
+            }
+            if line.indent != *indents.last().unwrap_or(&0) {
+                return Err(format!("unindent does not match any outer indentation level (line {})", line.start));
+            }
+        }
+
+        if tokens.is_empty() {
+            continue;
+        }
+        let depth = blocks.last().map_or(0, |block| block.depth);
+        let header_colon = matches!(
+            tokens.last(),
+            Some(Token { tok: Tok::Op(b':'), depth: 0 })
+        );
+
+        if tokens[0].tok == Tok::Op(b'@') {
+            if !decorators.is_empty() && line.indent != decorator_indent {
+                return Err(format!("misplaced decorator (line {})", line.start));
+            }
+            decorator_indent = line.indent;
+            decorators.push(parse_decorator(src, &tokens[1..], line.start)?);
+            last_end = line.end;
+            continue;
+        }
+
+        let header = definition_header(src, &tokens);
+        if !decorators.is_empty() && (header.is_none() || line.indent != decorator_indent) {
+            return Err(format!("decorator is not followed by a definition (line {})", line.start));
+        }
+
+        match header {
+            Some((kind, name_index)) => {
+                let name = match tokens.get(name_index) {
+                    Some(Token { tok: Tok::Name(start, end), .. }) => name_text(src, *start, *end)?.to_string(),
+                    _ => return Err(format!("invalid definition (line {})", line.start)),
+                };
+                if !tokens.iter().any(|token| token.tok == Tok::Op(b':') && token.depth == 0) {
+                    return Err(format!("definition without ':' (line {})", line.start));
+                }
+                let in_class = matches!(
+                    blocks.last(),
+                    Some(Block { kind: BlockKind::Definition { class: true, .. }, .. })
+                );
+                let index = definitions.len();
+                definitions.push(Definition {
+                    kind,
+                    name,
+                    line_start: line.start,
+                    line_end: line.end,
+                    col_offset: line.indent,
+                    in_class,
+                    decorators: std::mem::take(&mut decorators),
+                });
+                nesting.push(depth);
+                if header_colon {
+                    opens_block = Some(Block {
+                        kind: BlockKind::Definition { index, class: kind == "ClassDef" },
+                        depth: depth + 1,
+                    });
+                }
+                if let Some(if_depth) = if_depths.last_mut() {
+                    *if_depth = None;
+                }
+            }
+            None => {
+                let if_depth = if_depths.last().copied().flatten();
+                let (node_depth, body_depth) = match (first_word(src, &tokens), if_depth) {
+                    (b"if", _) => (Some(depth), depth + 1),
+                    (b"elif", Some(previous)) => (Some(previous + 1), previous + 2),
+                    (b"else", Some(previous)) => (None, previous + 1),
+                    // Handler bodies sit below their ast.ExceptHandler node
+                    (b"except", _) => (None, depth + 2),
+                    _ => (None, depth + 1),
+                };
+                if let Some(last) = if_depths.last_mut() {
+                    *last = node_depth;
+                }
+                if header_colon {
+                    opens_block = Some(Block { kind: BlockKind::Other, depth: body_depth });
+                }
+            }
+        }
+        last_end = line.end;
+    }
+
+    if opens_block.is_some() {
+        return Err("expected an indented block at end of file".to_string());
+    }
+    if !decorators.is_empty() {
+        return Err("decorator is not followed by a definition at end of file".to_string());
+    }
+    for block in blocks {
+        if let BlockKind::Definition { index, .. } = block.kind {
+            definitions[index].line_end = last_end;
+        }
+    }
+
+    // Breadth-first order, like ast.walk (the sort is stable)
+    let mut ordered: Vec<(usize, Definition)> = nesting.into_iter().zip(definitions).collect();
+    ordered.sort_by_key(|(depth, _)| *depth);
+    Ok(ordered.into_iter().map(|(_, definition)| definition).collect())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// (kind, name, line_start, line_end, col_offset) of every definition, in scan order
+    fn outline(source: &str) -> Vec<(&'static str, String, usize, usize, usize)> {
+        scan(source)
+            .unwrap()
+            .into_iter()
+            .map(|d| (d.kind, d.name, d.line_start, d.line_end, d.col_offset))
+            .collect()
+    }
+
+    fn def(kind: &'static str, name: &str, line_start: usize, line_end: usize, col_offset: usize) -> (&'static str, String, usize, usize, usize) {
+        (kind, name.to_string(), line_start, line_end, col_offset)
+    }
+
+    #[test]
+    fn nested_definitions_in_ast_walk_order() {
+        let source = "class A:\n    def m(self):\n        def inner():\n            pass\n        return inner\n\n    class B:\n        x = 1\n\ndef f():\n    pass\n";
+        assert_eq!(
+            outline(source),
+            vec![
+                def("ClassDef", "A", 1, 8, 0),
+                def("FunctionDef", "f", 10, 11, 0),
+                def("FunctionDef", "m", 2, 5, 4),
+                def("ClassDef", "B", 7, 8, 4),
+                def("FunctionDef", "inner", 3, 4, 8),
+            ]
+        );
+        let in_class: Vec<bool> = scan(source).unwrap().iter().map(|d| d.in_class).collect();
+        assert_eq!(in_class, vec![false, false, true, true, false]);
+    }
+
+    #[test]
+    fn branches_and_async_definitions() {
+        let source = "if x:\n    def a(): pass\nelif y:\n    def b(): pass\nelse:\n    def c(): pass\ndef d(): pass\nasync def e():\n    await d()\n";
+        assert_eq!(
+            outline(source),
+            vec![
+                def("FunctionDef", "d", 7, 7, 0),
+                def("AsyncFunctionDef", "e", 8, 9, 0),
+                def("FunctionDef", "a", 2, 2, 4),
+                def("FunctionDef", "b", 4, 4, 4),
+                def("FunctionDef", "c", 6, 6, 4),
+            ]
+        );
+    }
+
+    #[test]
+    fn decorators_spanning_lines() {
+        let source = "@pysealer._abc(\n)\n@decorator.with_args(\n    1,\n    2,\n)\n@plain\n@x[0]\ndef f(\n    a,\n    b,\n):\n    return a\n";
+        let definitions = scan(source).unwrap();
+        assert_eq!(definitions.len(), 1);
+        assert_eq!((definitions[0].line_start, definitions[0].line_end), (9, 13));
+        let decorators: Vec<(usize, Option<&str>, bool)> = definitions[0]
+            .decorators
+            .iter()
+            .map(|d| (d.line, d.name.as_deref(), d.is_call))
+            .collect();
+        assert_eq!(
+            decorators,
+            vec![
+                (1, Some("pysealer._abc"), true),
+                (3, Some("decorator.with_args"), true),
+                (7, Some("plain"), false),
+                (8, None, false),
+            ]
+        );
+        assert_eq!(definitions[0].decorators[0].seal(), Some("abc"));
+        assert_eq!(definitions[0].decorators[1].seal(), None);
+    }
+
+    #[test]
+    fn strings_and_comments_hide_definitions() {
+        let source = "s = '''\ndef fake():\n    pass\n'''\n# def commented():\nx = \"def nope(): # not a comment\"\ny = f\"{'def'} {x!r:>{10}}\"\nz = 1 + \\\n    2\ndef real():  # trailing comment\n    return \"\\\"\"\n";
+        assert_eq!(outline(source), vec![def("FunctionDef", "real", 10, 11, 0)]);
+    }
+
+    #[test]
+    fn crlf_line_endings() {
+        let source = "def f():\r\n    return 1\r\n\r\n@pysealer._sig()\r\nclass C:\r\n    pass\r\n";
+        assert_eq!(outline(source), vec![def("FunctionDef", "f", 1, 2, 0), def("ClassDef", "C", 5, 6, 0)]);
+        assert_eq!(scan(source).unwrap()[1].decorators[0].line, 4);
+    }
+
+    #[test]
+    fn unsupported_sources_are_errors() {
+        assert!(scan("def f(:\n").is_err());
+        assert!(scan("def f():\nreturn 1\n").is_err());
+        assert!(scan("@decorator\nx = 1\n").is_err());
+        assert!(scan("def f():\n    pass\n  x = 1\n").is_err());
+    }
+}
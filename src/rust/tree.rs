@@ -0,0 +1,247 @@
+//! Whole-folder check engine.
+//!
+//! Reads and scans every given Python file and verifies every seal of the folder with
+//! a single batch, spreading the work across a thread pool.
+
+use std::fs;
+use std::path::{Path, PathBuf};
+
+use ed25519_dalek::VerifyingKey;
+use rayon::prelude::*;
+
+use crate::crypto;
+use crate::scanner;
+
+/// Verification result for one definition
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct CheckedDefinition {
+    pub name: String,
+    pub line_start: usize,
+    pub line_end: usize,
+    /// Seal from the `@pysealer._<seal>()` decorator, None when the definition has none
+    pub seal: Option<String>,
+    pub valid: bool,
+}
+
+/// Outcome of checking one file
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub enum FileReport {
+    /// Every definition of the file, in scan order
+    Checked(Vec<CheckedDefinition>),
+    /// The scanner does not handle this file, so it has to be checked with Python's parser
+    Unsupported,
+    /// The file could not be read
+    Error(String),
+}
+
+/// Bytes every file with a pysealer decorator contains
+const SEAL_MARKER: &[u8] = b"pysealer";
+
+/// Whether raw file content contains SEAL_MARKER, checked before decoding or parsing it
+fn contains_seal_marker(bytes: &[u8]) -> bool {
+    let mut rest = bytes;
+    while let Some(index) = rest.iter().position(|&byte| byte == SEAL_MARKER[0]) {
+        if rest[index..].starts_with(SEAL_MARKER) {
+            return true;
+        }
+        rest = &rest[index + 1..];
+    }
+    false
+}
+
+/// Decode a file the way Python's text mode does: UTF-8 with universal newlines
+fn decode_source(bytes: Vec<u8>) -> Result<String, String> {
+    let text = String::from_utf8(bytes).map_err(|e| format!("'utf-8' codec can't decode file: {}", e))?;
+    if !text.contains('\r') {
+        return Ok(text);
+    }
+    Ok(text.replace("\r\n", "\n").replace('\r', "\n"))
+}
+
+/// Whether a line is a pysealer decorator once leading whitespace is stripped
+fn is_decorator_line(line: &str) -> bool {
+    line.trim_start_matches(|c: char| c.is_whitespace() || ('\x1c'..='\x1f').contains(&c))
+        .starts_with("@pysealer")
+}
+
+/// Source of a definition as it is signed: its lines without any pysealer decorator line
+fn signed_source(lines: &[&str], line_start: usize, line_end: usize) -> String {
+    let end = line_end.min(lines.len());
+    let start = line_start.saturating_sub(1).min(end);
+    lines[start..end]
+        .iter()
+        .filter(|line| !is_decorator_line(line))
+        .copied()
+        .collect::<Vec<&str>>()
+        .join("\n")
+}
+
+/// A scanned file waiting for its seals to be verified
+struct ScannedFile {
+    definitions: Vec<CheckedDefinition>,
+    /// (index into definitions, signed source) for every sealed definition
+    sealed: Vec<(usize, String)>,
+}
+
+fn scan_file(path: &Path) -> Result<Option<ScannedFile>, String> {
+    let bytes = fs::read(path).map_err(|e| e.to_string())?;
+    // A file that cannot hold a seal is reported without decorators, without scanning it
+    if !contains_seal_marker(&bytes) {
+        return Ok(Some(ScannedFile { definitions: Vec::new(), sealed: Vec::new() }));
+    }
+    let source = decode_source(bytes)?;
+    // A byte order mark is kept by Python's utf-8 codec, leave such files to the fallback
+    if source.starts_with('\u{feff}') {
+        return Ok(None);
+    }
+    let definitions = match scanner::scan(&source) {
+        Ok(definitions) => definitions,
+        Err(_) => return Ok(None),
+    };
+
+    let lines: Vec<&str> = source.split('\n').collect();
+    let mut checked = Vec::with_capacity(definitions.len());
+    let mut sealed = Vec::new();
+    for definition in definitions {
+        let seal = definition.decorators.iter().find_map(|decorator| decorator.seal()).map(str::to_string);
+        if seal.is_some() {
+            sealed.push((checked.len(), signed_source(&lines, definition.line_start, definition.line_end)));
+        }
+        checked.push(CheckedDefinition {
+            name: definition.name,
+            line_start: definition.line_start,
+            line_end: definition.line_end,
+            seal,
+            valid: false,
+        });
+    }
+    Ok(Some(ScannedFile { definitions: checked, sealed }))
+}
+
+/// Check the given files
+/// Uses a pool of `jobs` threads, or rayon's global pool (one thread per core) when jobs is 0
+/// Returns (path, report) pairs in the order of files
+pub fn check_files(files: Vec<PathBuf>, verifying_key: &VerifyingKey, jobs: usize) -> Result<Vec<(PathBuf, FileReport)>, String> {
+    if jobs == 0 {
+        return check_paths(files, verifying_key);
+    }
+    let pool = rayon::ThreadPoolBuilder::new()
+        .num_threads(jobs)
+        .build()
+        .map_err(|e| format!("Cannot start {} worker threads: {}", jobs, e))?;
+    pool.install(|| check_paths(files, verifying_key))
+}
+
+fn check_paths(files: Vec<PathBuf>, verifying_key: &VerifyingKey) -> Result<Vec<(PathBuf, FileReport)>, String> {
+    let mut scanned: Vec<Result<Option<ScannedFile>, String>> = files.par_iter().map(|path| scan_file(path)).collect();
+
+    // Verify every seal of the tree in one batch
+    let (data, seals): (Vec<&[u8]>, Vec<&str>) = scanned
+        .iter()
+        .flat_map(|file| file.iter().flatten())
+        .flat_map(|file| {
+            file.sealed.iter().map(|(index, source)| {
+                let seal = file.definitions[*index].seal.as_deref().unwrap_or_default();
+                (source.as_bytes(), seal)
+            })
+        })
+        .unzip();
+    let verdicts = crypto::verify_many(verifying_key, &data, &seals)?;
+
+    let mut verdicts = verdicts.into_iter();
+    for file in scanned.iter_mut().flat_map(|file| file.iter_mut().flatten()) {
+        for (index, _) in &file.sealed {
+            file.definitions[*index].valid = verdicts.next().unwrap_or(false);
+        }
+    }
+
+    Ok(files
+        .into_iter()
+        .zip(scanned)
+        .map(|(path, file)| {
+            let report = match file {
+                Ok(Some(file)) => FileReport::Checked(file.definitions),
+                Ok(None) => FileReport::Unsupported,
+                Err(message) => FileReport::Error(message),
+            };
+            (path, report)
+        })
+        .collect())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::crypto::{SealEncoding, SealMode};
+    use ed25519_dalek::SigningKey;
+
+    #[test]
+    fn seal_marker_is_found_anywhere() {
+        assert!(contains_seal_marker(b"import pysealer\n"));
+        assert!(contains_seal_marker(b"ppysealer"));
+        assert!(!contains_seal_marker(b"pysea ler pysealeR"));
+        assert!(!contains_seal_marker(b""));
+    }
+
+    #[test]
+    fn sources_decode_with_universal_newlines() {
+        assert_eq!(decode_source(b"a\r\nb\rc\n".to_vec()).unwrap(), "a\nb\nc\n");
+        assert!(decode_source(b"\xff\xfe".to_vec()).is_err());
+    }
+
+    #[test]
+    fn signed_source_drops_pysealer_decorators() {
+        let lines = ["@pysealer._abc()", "  @pysealer._def()", "@other", "def f():", "    return 1"];
+        assert_eq!(signed_source(&lines, 1, 5), "@other\ndef f():\n    return 1");
+        assert_eq!(signed_source(&lines, 4, 9), "def f():\n    return 1");
+    }
+
+    #[test]
+    fn check_files_reports_each_file_in_order() {
+        let signing_key = SigningKey::from_bytes(&[7u8; 32]);
+        let pure = crypto::seal(&signing_key, b"def f():\n    return 1", SealMode::Pure, SealEncoding::Base58);
+        let prehashed = crypto::seal(&signing_key, b"class C:\n    x = 1", SealMode::Prehashed, SealEncoding::Hex);
+
+        let root = std::env::temp_dir().join(format!("pysealer-tree-{}", std::process::id()));
+        fs::create_dir_all(&root).unwrap();
+        let files = [
+            ("crlf.py", format!("import pysealer\r\n\r\n@pysealer._{}()\r\ndef f():\r\n    return 1\r\n", pure)),
+            ("tampered.py", format!("@pysealer._{}()\ndef f():\n    return 2\n\ndef g(): pass\n", pure)),
+            ("prehashed.py", format!("@pysealer._{}()\nclass C:\n    x = 1\n", prehashed)),
+            ("plain.py", "def f():\n\treturn 1\n".to_string()),
+            ("tabs.py", "# pysealer\ndef f():\n\treturn 1\n".to_string()),
+        ];
+        for (name, content) in &files {
+            fs::write(root.join(name), content).unwrap();
+        }
+        fs::write(root.join("bad.py"), b"pysealer\xff").unwrap();
+        let mut paths: Vec<PathBuf> = files.iter().map(|(name, _)| root.join(name)).collect();
+        paths.push(root.join("bad.py"));
+        paths.push(root.join("missing.py"));
+
+        for jobs in [0, 2] {
+            let reports: Vec<FileReport> = check_files(paths.clone(), &signing_key.verifying_key(), jobs)
+                .unwrap()
+                .into_iter()
+                .zip(&paths)
+                .map(|((path, report), expected)| {
+                    assert_eq!(&path, expected);
+                    report
+                })
+                .collect();
+            let verdicts = |report: &FileReport| match report {
+                FileReport::Checked(definitions) => definitions.iter().map(|d| (d.name.clone(), d.valid)).collect(),
+                _ => Vec::new(),
+            };
+            assert_eq!(verdicts(&reports[0]), vec![("f".to_string(), true)]);
+            assert_eq!(verdicts(&reports[1]), vec![("f".to_string(), false), ("g".to_string(), false)]);
+            assert_eq!(verdicts(&reports[2]), vec![("C".to_string(), true)]);
+            // Files without the marker are not scanned, so the tabs do not matter
+            assert_eq!(reports[3], FileReport::Checked(Vec::new()));
+            assert_eq!(reports[4], FileReport::Unsupported);
+            assert!(matches!(reports[5], FileReport::Error(_)));
+            assert!(matches!(reports[6], FileReport::Error(_)));
+        }
+        fs::remove_dir_all(&root).unwrap();
+    }
+}
@@ -30,4 +30,10 @@ def cleanup_pysealer_precommit_hook():
 
 
 def pytest_sessionfinish(session, exitstatus):
-    _remove_repo_pysealer_precommit_hook()
\ No newline at end of file
+    _remove_repo_pysealer_precommit_hook()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    # Keep check verdicts out of the user's cache directory
+    monkeypatch.setenv("PYSEALER_CACHE_DIR", str(tmp_path_factory.mktemp("pysealer-cache")))
@@ -2,7 +2,7 @@ import os
 import tempfile
 import shutil
 import pytest
-from pysealer.add_decorators import add_decorators, add_decorators_to_folder
+from pysealer.add_decorators import LockResult, SigningContext, add_decorators, add_decorators_to_files, add_decorators_to_folder, lock_file
 
 # Dummy signature generator and private key for patching
 import pysealer
@@ -13,11 +13,50 @@ def dummy_generate_signature(source, key):
 def dummy_get_private_key():
     return "dummy_private_key"
 
+class DummySigningKey:
+    decoded = 0
+    batches = []
+
+    def __init__(self, sign=dummy_generate_signature):
+        self._sign = sign
+
+    @classmethod
+    def from_base58(cls, private_key):
+        cls.decoded += 1
+        return cls()
+
+    def sign(self, source):
+        return self._sign(source, None)
+
+    def sign_many(self, sources, prehash=False, encoding="base58"):
+        DummySigningKey.batches.append(len(sources))
+        prefix = ("ph_" if prehash else "") + ("hx_" if encoding == "hex" else "")
+        return [prefix + self._sign(source, None) for source in sources]
+
+    def verifying_key(self):
+        return DummyVerifyingKey()
+
+class DummyVerifyingKey:
+    # Seals made by DummyVerifyingKey.seal() verify as long as the source is unchanged
+    @staticmethod
+    def seal(source):
+        return "v" + format(sum(source.encode()), "x")
+
+    def verify_many(self, sources, seals):
+        return [seal.rpartition("_")[2] == self.seal(source) for source, seal in zip(sources, seals)]
+
+class VerifiableSigningKey(DummySigningKey):
+    def __init__(self):
+        super().__init__(sign=lambda source, key: DummyVerifyingKey.seal(source))
+
 @pytest.fixture(autouse=True)
 def patch_pysealer(monkeypatch):
     # Patch at the import location used in add_decorators.py
     import pysealer.add_decorators as add_decorators_mod
-    monkeypatch.setattr(add_decorators_mod, "generate_signature", dummy_generate_signature)
+    DummySigningKey.decoded = 0
+    DummySigningKey.batches = []
+    monkeypatch.setattr(add_decorators_mod, "SigningKey", DummySigningKey)
+    monkeypatch.setattr(add_decorators_mod, "_cached_signing_key", None)
     monkeypatch.setattr(add_decorators_mod, "get_private_key", dummy_get_private_key)
     yield
 
@@ -66,6 +105,50 @@ def test_add_decorators_to_folder(tmp_path):
     assert "@pysealer._dummy_signature()" in file1.read_text()
     assert "@pysealer._dummy_signature()" in file2.read_text()
 
+def test_add_decorators_to_files(tmp_path):
+    file1 = tmp_path / "a.py"
+    file2 = tmp_path / "b.py"
+    file3 = tmp_path / "c.py"
+    file1.write_text("def f():\n return 1\n")
+    file2.write_text("x = 1\n")
+    file3.write_text("class C:\n pass\n")
+    result = add_decorators_to_files([str(file3), str(file2)])
+    assert list(result) == [str(file3)]
+    assert "@pysealer._dummy_signature()" in file3.read_text()
+    assert "pysealer" not in file1.read_text()
+
+def test_add_decorators_to_folder_parallel(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    # Worker processes are spawned, so they use the real key handed to them by the parent
+    private_key, public_key = pysealer.generate_keypair()
+    loads = []
+    def counting_get_private_key():
+        loads.append(1)
+        return private_key
+    monkeypatch.setattr(add_decorators_mod, "get_private_key", counting_get_private_key)
+    files = [tmp_path / f"m{i}.py" for i in range(5)]
+    for i, file in enumerate(files):
+        file.write_text(f"def f{i}():\n return {i}\n" * (i + 1))
+    result = add_decorators_to_folder(str(tmp_path), jobs=3)
+    assert list(result) == [str(file) for file in files]
+    assert loads == [1]
+    verifying_key = pysealer.VerifyingKey.from_base58(public_key)
+    for i, file in enumerate(files):
+        seal = file.read_text().split("@pysealer._")[1].split("()")[0]
+        assert verifying_key.verify(f"def f{i}():\n return {i}", seal)
+
+def test_add_decorators_to_folder_threads(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    monkeypatch.setattr(add_decorators_mod, "run_in_processes", None)
+    files = [tmp_path / f"m{i}.py" for i in range(5)]
+    for i, file in enumerate(files):
+        file.write_text(f"def f{i}():\n return {i}\n")
+    result = add_decorators_to_folder(str(tmp_path), jobs=3, threads=True)
+    assert list(result) == [str(file) for file in files]
+    # One signing context is shared by every thread
+    assert DummySigningKey.decoded == 1
+    assert all("@pysealer._dummy_signature()" in file.read_text() for file in files)
+
 def test_add_decorators_to_folder_errors(tmp_path):
     # No python files
     empty_dir = tmp_path / "empty"
@@ -81,6 +164,78 @@ def test_add_decorators_to_folder_errors(tmp_path):
     with pytest.raises(FileNotFoundError):
         add_decorators_to_folder(str(tmp_path / "doesnotexist"))
 
+def test_add_decorators_decodes_key_once(tmp_path):
+    code = """
+def a():
+    return 1
+
+def b():
+    return 2
+
+class C:
+    pass
+"""
+    file_path = tmp_path / "many.py"
+    file_path.write_text(code)
+    modified, changed = add_decorators(str(file_path))
+    assert changed
+    assert modified.count("@pysealer._dummy_signature()") == 3
+    assert DummySigningKey.decoded == 1
+    assert DummySigningKey.batches == [3]
+
+def test_add_decorators_prehash(tmp_path):
+    file_path = tmp_path / "big.py"
+    file_path.write_text("class Big:\n    pass\n")
+    modified, changed = add_decorators(str(file_path), prehash=True)
+    assert changed
+    assert "@pysealer._ph_dummy_signature()" in modified
+
+def test_add_decorators_to_folder_prehash(tmp_path):
+    file = tmp_path / "a.py"
+    file.write_text("def f():\n return 1\n")
+    add_decorators_to_folder(str(tmp_path), prehash=True)
+    assert "@pysealer._ph_dummy_signature()" in file.read_text()
+
+def test_add_decorators_hex_encoding(tmp_path):
+    file_path = tmp_path / "hex.py"
+    file_path.write_text("def f():\n    return 1\n")
+    modified, changed = add_decorators(str(file_path), prehash=True, encoding="hex")
+    assert changed
+    assert "@pysealer._ph_hx_dummy_signature()" in modified
+
+def test_add_decorators_to_folder_loads_key_once(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    loads = []
+    def counting_get_private_key():
+        loads.append(1)
+        return "dummy_private_key"
+    monkeypatch.setattr(add_decorators_mod, "get_private_key", counting_get_private_key)
+    for i in range(4):
+        (tmp_path / f"m{i}.py").write_text(f"def f{i}():\n return {i}\n\nclass C{i}:\n pass\n")
+    add_decorators_to_folder(str(tmp_path))
+    add_decorators(str(tmp_path / "m0.py"))
+    assert len(loads) == 1
+    assert DummySigningKey.decoded == 1
+
+def test_add_decorators_with_context(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    monkeypatch.setattr(add_decorators_mod, "get_private_key", lambda: (_ for _ in ()).throw(FileNotFoundError("fail")))
+    context = SigningContext(DummySigningKey(), prehash=True, encoding="hex")
+    file_path = tmp_path / "ctx.py"
+    file_path.write_text("def f():\n    return 1\n")
+    modified, changed = add_decorators(str(file_path), context=context)
+    assert changed
+    assert "@pysealer._ph_hx_dummy_signature()" in modified
+
+def test_add_decorators_no_key_needed_without_definitions(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    monkeypatch.setattr(add_decorators_mod, "get_private_key", lambda: (_ for _ in ()).throw(FileNotFoundError("fail")))
+    file_path = tmp_path / "plain.py"
+    file_path.write_text("x = 1\n")
+    modified, changed = add_decorators(str(file_path))
+    assert not changed
+    assert DummySigningKey.decoded == 0
+
     def test_add_decorators_multiple_decorators(tmp_path, monkeypatch):
         code = """
     @other
@@ -91,7 +246,7 @@ def test_add_decorators_to_folder_errors(tmp_path):
         file_path = tmp_path / "multi.py"
         # Patch generate_signature to return a different value
         import pysealer.add_decorators as add_decorators_mod
-        monkeypatch.setattr(add_decorators_mod, "generate_signature", lambda s, k: "sig2")
+        monkeypatch.setattr(add_decorators_mod.SigningKey, "from_base58", lambda k: DummySigningKey(lambda s, k: "sig2"))
         monkeypatch.setattr(add_decorators_mod, "get_private_key", lambda: "dummy_private_key")
         file_path.write_text(code)
         modified, changed = add_decorators(str(file_path))
@@ -131,8 +286,123 @@ def test_add_decorators_to_folder_errors(tmp_path):
     """
         file_path = tmp_path / "fail2.py"
         import pysealer.add_decorators as add_decorators_mod
-        monkeypatch.setattr(add_decorators_mod, "generate_signature", lambda s, k: (_ for _ in ()).throw(Exception("fail")))
+        monkeypatch.setattr(add_decorators_mod.SigningKey, "from_base58", lambda k: DummySigningKey(lambda s, k: (_ for _ in ()).throw(Exception("fail"))))
         monkeypatch.setattr(add_decorators_mod, "get_private_key", lambda: "dummy_private_key")
         file_path.write_text(code)
         with pytest.raises(RuntimeError):
             add_decorators(str(file_path))
+
+def test_add_decorators_replaces_existing_seals(tmp_path):
+    code = '''"""Module docstring."""
+from os import (
+    path,
+)
+
+@pysealer._old()
+@staticmethod
+def foo():
+    return 1
+
+@pysealer._old()
+class Bar:
+    @pysealer._old()
+    def method(self):
+        return 2
+'''
+    file_path = tmp_path / "resealed.py"
+    file_path.write_text(code)
+    modified, changed = add_decorators(str(file_path))
+    assert changed
+    assert modified == '''"""Module docstring."""
+from os import (
+    path,
+)
+import pysealer
+
+@pysealer._dummy_signature()
+@staticmethod
+def foo():
+    return 1
+
+@pysealer._dummy_signature()
+class Bar:
+    def method(self):
+        return 2
+'''
+
+def test_add_decorators_import_after_docstring(tmp_path):
+    code = '"""Docstring with\nimport lines inside.\n"""\ndef foo():\n    return 1\n'
+    file_path = tmp_path / "docstring.py"
+    file_path.write_text(code)
+    modified, _ = add_decorators(str(file_path))
+    assert modified == (
+        '"""Docstring with\nimport lines inside.\n"""\nimport pysealer\n\n'
+        '@pysealer._dummy_signature()\ndef foo():\n    return 1\n'
+    )
+
+def test_add_decorators_many_definitions(tmp_path):
+    code = "import os\n\n" + "".join(f"@pysealer._old()\ndef f{i}():\n    return {i}\n\n" for i in range(2000))
+    file_path = tmp_path / "generated.py"
+    file_path.write_text(code)
+    modified, changed = add_decorators(str(file_path))
+    assert changed
+    assert modified.count("@pysealer._dummy_signature()") == 2000
+    assert "@pysealer._old()" not in modified
+    assert modified.startswith("import os\nimport pysealer\n\n@pysealer._dummy_signature()\ndef f0():")
+
+def test_lock_keeps_valid_seals(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    monkeypatch.setattr(add_decorators_mod, "SigningKey", VerifiableSigningKey)
+    code = "def a():\n    return 1\n\ndef b():\n    return 2\n"
+    file_path = tmp_path / "incremental.py"
+    file_path.write_text(code)
+
+    assert lock_file(str(file_path)) == LockResult(True, 2, 0, 0)
+    sealed = file_path.read_text()
+    mtime = os.stat(file_path).st_mtime_ns
+
+    # Nothing changed: every seal is kept and the file is not rewritten
+    assert lock_file(str(file_path)) == LockResult(False, 0, 0, 2)
+    assert file_path.read_text() == sealed
+    assert os.stat(file_path).st_mtime_ns == mtime
+
+    # Only the edited function is re-sealed
+    file_path.write_text(sealed.replace("return 2", "return 3") + "\ndef c():\n    pass\n")
+    assert lock_file(str(file_path)) == LockResult(True, 1, 1, 1)
+    relocked = file_path.read_text()
+    assert relocked.count("@pysealer._") == 3
+    assert relocked.split("def a")[0] == sealed.split("def a")[0]
+
+def test_lock_reseals_when_options_change(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    monkeypatch.setattr(add_decorators_mod, "SigningKey", VerifiableSigningKey)
+    file_path = tmp_path / "options.py"
+    file_path.write_text("def a():\n    return 1\n")
+    lock_file(str(file_path))
+    assert lock_file(str(file_path), encoding="hex") == LockResult(True, 0, 1, 0)
+    assert "@pysealer._hx_" in file_path.read_text()
+
+def test_signing_context_follows_the_env_file(tmp_path, monkeypatch):
+    import pysealer.add_decorators as add_decorators_mod
+    from pysealer.setup import get_private_key, setup_keypair
+    monkeypatch.setattr(add_decorators_mod, "SigningKey", pysealer.SigningKey)
+    monkeypatch.setattr(add_decorators_mod, "get_private_key", get_private_key)
+    env_files = [tmp_path / name / ".env" for name in ("one", "two")]
+    public_keys = []
+    for env_file in env_files:
+        env_file.parent.mkdir()
+        public_keys.append(setup_keypair(env_file)[0])
+
+    def sealed_with(index):
+        monkeypatch.setenv("PYSEALER_ENV_PATH", str(env_files[index]))
+        seal = SigningContext.load().seal_many(["def f(): pass"])[0]
+        return pysealer.verify_signature("def f(): pass", seal, public_keys[index])
+
+    # Switching .env files in one process switches keys, both ways
+    assert sealed_with(0) and sealed_with(1) and sealed_with(0)
+    # A key rotated in place is picked up as well
+    env_files[0].unlink()
+    public_keys[0] = setup_keypair(env_files[0])[0]
+    stat = os.stat(env_files[0])
+    os.utime(env_files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert sealed_with(0)
@@ -0,0 +1,256 @@
+import gzip
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import pysealer.cache as cache_mod
+from pysealer.cache import BlobCache, VerdictCache, cache_dir, git_blob_ids
+
+VERDICTS = [("f", 2, 3, "sig", True), ("g", 5, 6, None, False)]
+
+
+def _age(path, seconds=60):
+    # Move the modification time out of the racy window
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def _run(folder, public_key, files, verdicts=VERDICTS):
+    """One check run: returns the files that missed, caching the given verdicts for them."""
+    cache = VerdictCache(str(folder), public_key)
+    misses = []
+    for file in files:
+        if cache.get(str(file)) is None:
+            misses.append(file.name)
+            cache.put(str(file), verdicts)
+    cache.save()
+    return misses
+
+
+def test_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("PYSEALER_CACHE_DIR", str(tmp_path / "explicit"))
+    assert cache_dir() == tmp_path / "explicit"
+    monkeypatch.delenv("PYSEALER_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert cache_dir() == tmp_path / "xdg" / "pysealer"
+
+
+def test_cache_hits_unchanged_files(tmp_path):
+    files = [tmp_path / "a.py", tmp_path / "b.py"]
+    for file in files:
+        file.write_text("def f():\n    pass\n")
+        _age(file)
+    assert _run(tmp_path, "key", files) == ["a.py", "b.py"]
+    cache = VerdictCache(str(tmp_path), "key")
+    assert cache.get(str(files[0])) == VERDICTS
+
+    # Edited file misses, the other one still hits
+    files[1].write_text("def f():\n    return 1\n")
+    assert _run(tmp_path, "key", files) == ["b.py"]
+
+
+def test_cache_confirms_touched_files_by_hash(tmp_path):
+    file = tmp_path / "a.py"
+    file.write_text("def f():\n    pass\n")
+    _run(tmp_path, "key", [file])
+    # Same content with a new (or racily recent) modification time is still a hit
+    os.utime(file)
+    assert _run(tmp_path, "key", [file]) == []
+    # Same size, different content is a miss
+    file.write_text("def g():\n    pass\n")
+    assert _run(tmp_path, "key", [file]) == ["a.py"]
+
+
+def test_cache_confirms_files_with_restored_mtime_by_hash(tmp_path):
+    file = tmp_path / "a.py"
+    file.write_text("def f():\n    pass\n")
+    _age(file)
+    _run(tmp_path, "key", [file])
+    stat = os.stat(file)
+    # Same-size edit with the old modification time restored is still a miss
+    file.write_text("def g():\n    pass\n")
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert _run(tmp_path, "key", [file]) == ["a.py"]
+
+
+def test_cache_is_keyed_by_public_key(tmp_path):
+    file = tmp_path / "a.py"
+    file.write_text("def f():\n    pass\n")
+    _run(tmp_path, "key", [file])
+    assert _run(tmp_path, "other-key", [file]) == ["a.py"]
+    assert _run(tmp_path, "key", [file]) == []
+
+
+def test_cache_drops_files_not_seen_and_ignores_damaged_files(tmp_path):
+    files = [tmp_path / "a.py", tmp_path / "b.py"]
+    for file in files:
+        file.write_text("x = 1\n")
+    _run(tmp_path, "key", files)
+    _run(tmp_path, "key", files[:1])
+    cache = VerdictCache(str(tmp_path), "key")
+    with open(cache.path) as f:
+        assert list(json.load(f)["files"]) == [str(files[0])]
+
+    cache.path.write_text("{not json")
+    assert _run(tmp_path, "key", files) == ["a.py", "b.py"]
+
+
+def test_partial_cache_keeps_files_outside_the_run(tmp_path):
+    files = [tmp_path / "a.py", tmp_path / "b.py", tmp_path / "c.py"]
+    for file in files:
+        file.write_text("x = 1\n")
+        _age(file)
+    _run(tmp_path, "key", files)
+
+    cache = VerdictCache(str(tmp_path), "key", partial=True)
+    assert cache.get(str(files[0])) is not None
+    files[1].write_text("x = 22\n")
+    assert cache.get(str(files[1])) is None
+    cache.save()
+    # b.py missed and was not checked again, c.py was not part of the run
+    assert _run(tmp_path, "key", files) == ["b.py"]
+
+
+def test_cache_put_without_get_is_ignored(tmp_path):
+    file = tmp_path / "a.py"
+    file.write_text("x = 1\n")
+    cache = VerdictCache(str(tmp_path), "key")
+    cache.put(str(file), VERDICTS)
+    cache.save()
+    assert _run(tmp_path, "key", [file]) == ["a.py"]
+
+
+def test_cache_evicts_old_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "MAX_CACHE_FILES", 2)
+    for i in range(4):
+        folder = tmp_path / f"project{i}"
+        folder.mkdir()
+        (folder / "a.py").write_text("x = 1\n")
+        _run(folder, "key", [folder / "a.py"])
+        os.utime(VerdictCache(str(folder), "key").path, (i, i))
+    _run(tmp_path / "project3", "key", [tmp_path / "project3" / "a.py"])
+    remaining = sorted(path.name for path in cache_dir().glob("check-*.json"))
+    expected = sorted(VerdictCache(str(tmp_path / f"project{i}"), "key").path.name for i in (2, 3))
+    assert remaining == expected
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    for name in ("a.py", "b.py", "c.py"):
+        (repo / "pkg" / name).write_text(f"def {name[0]}():\n    pass\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+    return repo
+
+
+def test_git_blob_ids_skip_untracked_and_modified_files(git_repo):
+    folder = git_repo / "pkg"
+    (folder / "b.py").write_text("def b():\n    return 1\n")
+    (folder / "new.py").write_text("x = 1\n")
+    blob_ids = git_blob_ids(str(folder))
+    assert sorted(blob_ids) == [str(folder / "a.py"), str(folder / "c.py")]
+    assert len(blob_ids[str(folder / "a.py")]) == 40
+    assert git_blob_ids(str(git_repo.parent)) == {}
+
+
+def test_blob_cache_hits_in_fresh_checkout(git_repo, tmp_path):
+    cache_file = tmp_path / "ci" / "pysealer-cache.gz"
+    folder = git_repo / "pkg"
+    files = [str(folder / name) for name in ("a.py", "b.py", "c.py")]
+    cache = BlobCache(str(folder), "key", str(cache_file))
+    assert [cache.get(path) for path in files] == [None, None, None]
+    for path in files:
+        cache.put(path, VERDICTS)
+    cache.save()
+
+    # A clone has new modification times but the same blobs
+    clone = tmp_path / "clone"
+    _git(tmp_path, "clone", "-q", str(git_repo), str(clone))
+    (clone / "pkg" / "c.py").write_text("def c():\n    return 1\n")
+    cloned = [str(clone / "pkg" / name) for name in ("a.py", "b.py", "c.py")]
+    cache = BlobCache(str(clone / "pkg"), "key", str(cache_file))
+    assert [cache.get(path) for path in cloned] == [VERDICTS, VERDICTS, None]
+    assert BlobCache(str(clone / "pkg"), "other-key", str(cache_file)).get(cloned[0]) is None
+
+
+def _fill_blob_cache(git_repo, cache_file):
+    folder = git_repo / "pkg"
+    files = [str(folder / name) for name in ("a.py", "b.py", "c.py")]
+    cache = BlobCache(str(folder), "key", str(cache_file))
+    for path in files:
+        cache.put(path, VERDICTS)
+    cache.save()
+    return files
+
+
+def test_blob_cache_ignores_forged_files(git_repo, tmp_path, monkeypatch):
+    cache_file = tmp_path / "pysealer-cache.gz"
+    files = _fill_blob_cache(git_repo, cache_file)
+    assert BlobCache(str(git_repo / "pkg"), "key", str(cache_file)).get(files[0]) == VERDICTS
+
+    # Rewriting the verdicts without the key breaks the HMAC
+    mac, _, body = gzip.decompress(cache_file.read_bytes()).partition(b"\n")
+    forged = body.replace(b"false", b"true")
+    cache_file.write_bytes(gzip.compress(mac + b"\n" + forged))
+    assert BlobCache(str(git_repo / "pkg"), "key", str(cache_file)).get(files[0]) is None
+
+    # A cache written with another key is not trusted either
+    _fill_blob_cache(git_repo, cache_file)
+    monkeypatch.setenv("PYSEALER_CACHE_KEY", "ci-secret")
+    assert BlobCache(str(git_repo / "pkg"), "key", str(cache_file)).get(files[0]) is None
+    _fill_blob_cache(git_repo, cache_file)
+    assert BlobCache(str(git_repo / "pkg"), "key", str(cache_file)).get(files[0]) == VERDICTS
+
+
+def test_blob_cache_key_is_created_once(monkeypatch):
+    monkeypatch.delenv("PYSEALER_CACHE_KEY", raising=False)
+    key = cache_mod.blob_cache_key()
+    assert len(key) == 32
+    assert cache_mod.blob_cache_key() == key
+    assert (cache_dir() / "blob-cache.key").stat().st_mode & 0o077 == 0
+
+
+def test_blob_cache_evicts_unused_entries(git_repo, tmp_path, monkeypatch):
+    cache_file = tmp_path / "pysealer-cache.gz"
+    files = _fill_blob_cache(git_repo, cache_file)
+    clock = [cache_mod.time.time()]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: clock[0])
+
+    # Entries used within the refresh interval leave the file untouched
+    written = cache_file.read_bytes()
+    cache = BlobCache(str(git_repo / "pkg"), "key", str(cache_file))
+    assert [cache.get(path) for path in files] == [VERDICTS] * 3
+    cache.save()
+    assert cache_file.read_bytes() == written
+
+    # a.py is used again after a while; b.py and c.py then age out
+    clock[0] += cache_mod.MAX_BLOB_AGE_SECONDS // 2
+    cache = BlobCache(str(git_repo / "pkg"), "key", str(cache_file))
+    assert cache.get(files[0]) == VERDICTS
+    cache.save()
+    clock[0] += cache_mod.MAX_BLOB_AGE_SECONDS // 2 + 10
+    cache = BlobCache(str(git_repo / "pkg"), "key", str(cache_file))
+    assert [cache.get(path) for path in files] == [VERDICTS, None, None]
+    cache.save()
+
+    # Beyond MAX_BLOB_ENTRIES the least recently used are dropped
+    monkeypatch.setattr(cache_mod, "MAX_BLOB_ENTRIES", 2)
+    cache = BlobCache(str(git_repo / "pkg"), "key", str(cache_file))
+    for path in files[1:]:
+        clock[0] += 1
+        cache.put(path, VERDICTS)
+    cache.save()
+    cache = BlobCache(str(git_repo / "pkg"), "key", str(cache_file))
+    assert [cache.get(path) for path in files] == [None, VERDICTS, VERDICTS]
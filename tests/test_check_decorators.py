@@ -1,5 +1,5 @@
 import pytest
-from pysealer.check_decorators import check_decorators, check_decorators_in_folder
+from pysealer.check_decorators import attach_diffs, check_decorators, check_decorators_in_folder
 
 # Dummy signature verification and public key for patching
 import pysealer
@@ -11,19 +11,37 @@ def dummy_verify_signature(source, signature, key):
 def dummy_get_public_key():
     return "dummy_public_key"
 
-def dummy_is_git_available():
-    return False
+class DummyVerifyingKey:
+    batches = []
 
-def dummy_get_function_diff(*args, **kwargs):
-    return [("-", "old", 1), ("+", "new", 2)]
+    @classmethod
+    def from_base58(cls, public_key):
+        return cls()
+
+    def verify(self, source, signature):
+        return dummy_verify_signature(source, signature, None)
+
+    def verify_many(self, sources, signatures):
+        DummyVerifyingKey.batches.append(len(sources))
+        return [dummy_verify_signature(s, sig, None) for s, sig in zip(sources, signatures)]
+
+def dummy_check_files(paths, public_key, jobs):
+    # The dummy public key is not a real key, so the native engine rejects it
+    raise ValueError("Invalid public key Base58")
+
+def dummy_get_file_diffs(file_path, spans, **kwargs):
+    return {span: [("-", "old", 1), ("+", "new", 2)] for span in spans}
 
 @pytest.fixture(autouse=True)
 def patch_pysealer(monkeypatch):
     import pysealer.check_decorators as check_decorators_mod
-    monkeypatch.setattr(check_decorators_mod, "verify_signature", dummy_verify_signature)
+    DummyVerifyingKey.batches = []
+    monkeypatch.setattr(check_decorators_mod, "VerifyingKey", DummyVerifyingKey)
+    monkeypatch.setattr(check_decorators_mod, "_cached_public_key", None)
+    monkeypatch.setattr(check_decorators_mod, "_cached_verifying_key", None)
     monkeypatch.setattr(check_decorators_mod, "get_public_key", dummy_get_public_key)
-    monkeypatch.setattr(check_decorators_mod, "is_git_available", dummy_is_git_available)
-    monkeypatch.setattr(check_decorators_mod, "get_function_diff", dummy_get_function_diff)
+    monkeypatch.setattr(check_decorators_mod, "check_files", dummy_check_files)
+    monkeypatch.setattr(check_decorators_mod, "get_file_diffs", dummy_get_file_diffs)
     yield
 
 def test_check_decorators_valid(tmp_path):
@@ -58,6 +76,8 @@ def bar():
 
 def test_check_decorators_no_decorator(tmp_path):
     code = """
+import pysealer
+
 def baz():
     return 3
 """
@@ -68,6 +88,15 @@ def baz():
     assert not results["baz"]["has_decorator"]
     assert "No pysealer decorator" in results["baz"]["message"]
 
+def test_check_decorators_skips_files_without_marker(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_module
+    def fail(content):
+        raise AssertionError("file without the marker was parsed")
+    monkeypatch.setattr(check_module, "scan_definitions", fail)
+    file_path = tmp_path / "plain.py"
+    file_path.write_bytes(b"def broken(:\n\xff\xfe\n")
+    assert check_decorators(str(file_path)) == {}
+
 def test_check_decorators_in_folder(tmp_path):
     file1 = tmp_path / "a.py"
     file2 = tmp_path / "b.py"
@@ -77,7 +106,151 @@ def test_check_decorators_in_folder(tmp_path):
     assert str(file1) in results
     assert str(file2) in results
     assert results[str(file1)]["f"]["valid"]
-    assert not results[str(file2)]["g"]["has_decorator"]
+    assert results[str(file2)] == {}
+
+def test_check_decorators_in_folder_verifies_in_one_batch(tmp_path):
+    (tmp_path / "a.py").write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+    (tmp_path / "b.py").write_text("@pysealer._wrongsig()\ndef g():\n return 2\n\n@pysealer._validsig()\ndef h():\n return 3\n")
+    results = check_decorators_in_folder(str(tmp_path))
+    assert DummyVerifyingKey.batches == [3]
+    assert results[str(tmp_path / "a.py")]["f"]["valid"]
+    assert not results[str(tmp_path / "b.py")]["g"]["valid"]
+    assert results[str(tmp_path / "b.py")]["h"]["valid"]
+
+def test_check_decorators_in_folder_parallel(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    # Worker processes are spawned, so they use the real key handed to them by the parent
+    private_key, public_key = pysealer.generate_keypair()
+    monkeypatch.setattr(check_decorators_mod, "get_public_key", lambda: public_key)
+    seal = pysealer.generate_signature("def f():\n return 1", private_key)
+    (tmp_path / "a.py").write_text(f"@pysealer._{seal}()\ndef f():\n return 1\n")
+    (tmp_path / "b.py").write_text(f"@pysealer._{seal}()\ndef g():\n return 2\n")
+    (tmp_path / "c.py").write_text("import pysealer\n\ndef broken(:\n")
+    results = check_decorators_in_folder(str(tmp_path), jobs=3)
+    assert list(results) == [str(tmp_path / name) for name in ("a.py", "b.py", "c.py")]
+    assert results[str(tmp_path / "a.py")]["f"]["valid"]
+    assert not results[str(tmp_path / "b.py")]["g"]["valid"]
+    assert "error" in results[str(tmp_path / "c.py")]
+
+def test_check_decorators_in_folder_threads(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    # Threads share the key decoded once in this process
+    decoded = []
+    monkeypatch.setattr(DummyVerifyingKey, "from_base58", classmethod(lambda cls, key: decoded.append(key) or cls()))
+    monkeypatch.setattr(check_decorators_mod, "run_in_processes", None)
+    (tmp_path / "a.py").write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+    (tmp_path / "b.py").write_text("@pysealer._wrongsig()\ndef g():\n return 2\n")
+    (tmp_path / "c.py").write_text("import pysealer\n\ndef broken(:\n")
+    results = check_decorators_in_folder(str(tmp_path), jobs=3, threads=True)
+    assert list(results) == [str(tmp_path / name) for name in ("a.py", "b.py", "c.py")]
+    assert results[str(tmp_path / "a.py")]["f"]["valid"]
+    assert not results[str(tmp_path / "b.py")]["g"]["valid"]
+    assert "error" in results[str(tmp_path / "c.py")]
+    assert decoded == ["dummy_public_key"]
+
+def test_check_decorators_in_folder_native(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    (tmp_path / "a.py").write_text("@pysealer._validsig()\ndef f():\n return 1\n\ndef g():\n return 2\n")
+    (tmp_path / "tabs.py").write_text("@pysealer._validsig()\ndef t():\n\treturn 1\n")
+    (tmp_path / "bin.py").write_bytes(b"\xff\n")
+    calls = []
+    def native_check_files(paths, public_key, jobs):
+        calls.append((paths, public_key, jobs))
+        return [
+            (str(tmp_path / "a.py"), "checked", [("f", 2, 3, "validsig", True), ("g", 5, 6, None, False)], None),
+            (str(tmp_path / "bin.py"), "error", [], "'utf-8' codec can't decode file"),
+            (str(tmp_path / "tabs.py"), "unsupported", [], None),
+        ]
+    monkeypatch.setattr(check_decorators_mod, "check_files", native_check_files)
+    results = check_decorators_in_folder(str(tmp_path), jobs=4)
+    assert calls == [([str(tmp_path / name) for name in ("a.py", "bin.py", "tabs.py")], "dummy_public_key", 4)]
+    assert list(results) == [str(tmp_path / "a.py"), str(tmp_path / "bin.py"), str(tmp_path / "tabs.py")]
+    assert results[str(tmp_path / "a.py")]["f"]["valid"]
+    assert not results[str(tmp_path / "a.py")]["g"]["has_decorator"]
+    assert "error" in results[str(tmp_path / "bin.py")]
+    # Unsupported files are checked by the Python engine
+    assert results[str(tmp_path / "tabs.py")]["t"]["valid"]
+    assert DummyVerifyingKey.batches == [1]
+
+def test_check_decorators_in_folder_native_failures_get_diffs(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    file_path = tmp_path / "a.py"
+    file_path.write_text("@pysealer._wrongsig()\ndef f():\n return 1\n\n@pysealer._wrongsig()\ndef g():\n return 2\n")
+    def native_check_files(paths, public_key, jobs):
+        return [(str(file_path), "checked", [("f", 2, 3, "wrongsig", False), ("g", 6, 7, "wrongsig", False)], None)]
+    looked_up = []
+    def counting_get_file_diffs(file_path, spans, **kwargs):
+        looked_up.append(spans)
+        return dummy_get_file_diffs(file_path, spans)
+    monkeypatch.setattr(check_decorators_mod, "check_files", native_check_files)
+    monkeypatch.setattr(check_decorators_mod, "get_file_diffs", counting_get_file_diffs)
+    results = check_decorators_in_folder(str(tmp_path))[str(file_path)]
+    # Diffs are only looked up on demand
+    assert not results["f"]["valid"]
+    assert results["f"]["diff"] is None and looked_up == []
+    assert attach_diffs(str(file_path), results, limit=1) == 1
+    assert looked_up == [[(2, 3)]]
+    assert results["f"]["diff"] == [("-", "old", 1), ("+", "new", 2)]
+    assert results["g"]["diff"] is None
+    assert attach_diffs(str(file_path), results) == 1
+    assert results["g"]["diff"] == [("-", "old", 1), ("+", "new", 2)]
+    assert attach_diffs(str(file_path), {"error": "boom"}) == 0
+
+def test_check_decorators_in_folder_cache(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    checked = []
+    def native_check_files(paths, public_key, jobs):
+        checked.append([path.rsplit("/", 1)[-1] for path in paths])
+        return [(path, "checked", [("f", 2, 3, "validsig", True)], None) for path in paths]
+    monkeypatch.setattr(check_decorators_mod, "check_files", native_check_files)
+    (tmp_path / "a.py").write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+    (tmp_path / "b.py").write_text("@pysealer._validsig()\ndef f():\n return 2\n")
+    first = check_decorators_in_folder(str(tmp_path), use_cache=True)
+    (tmp_path / "b.py").write_text("@pysealer._validsig()\ndef f():\n return 3\n")
+    second = check_decorators_in_folder(str(tmp_path), use_cache=True)
+    assert checked == [["a.py", "b.py"], ["b.py"]]
+    assert first == second
+    assert list(second) == [str(tmp_path / "a.py"), str(tmp_path / "b.py")]
+    # Without the cache every file is checked again by the native engine
+    check_decorators_in_folder(str(tmp_path))
+    assert checked[2:] == [["a.py", "b.py"]]
+
+def test_check_decorators_in_folder_cache_file(tmp_path, monkeypatch):
+    import shutil
+    import subprocess
+    import pysealer.check_decorators as check_decorators_mod
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    checked = []
+    def native_check_files(paths, public_key, jobs):
+        checked.append([path.rsplit("/", 1)[-1] for path in paths])
+        return [(path, "checked", [("f", 2, 3, "validsig", True)], None) for path in paths]
+    monkeypatch.setattr(check_decorators_mod, "check_files", native_check_files)
+    (repo / "a.py").write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+    (repo / "b.py").write_text("@pysealer._validsig()\ndef f():\n return 2\n")
+    for args in (["init", "-q"], ["add", "a.py"]):
+        subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+    cache_file = str(tmp_path / "blobs.gz")
+    check_decorators_in_folder(str(repo), cache_file=cache_file)
+    check_decorators_in_folder(str(repo), cache_file=cache_file)
+    # Only the staged file is cached; the untracked one is checked every time
+    assert checked == [["a.py", "b.py"], ["b.py"]]
+
+def test_check_decorators_loads_public_key_once(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    loads = []
+    def counting_get_public_key():
+        loads.append(1)
+        return "dummy_public_key"
+    monkeypatch.setattr(check_decorators_mod, "get_public_key", counting_get_public_key)
+    for i in range(3):
+        file_path = tmp_path / f"m{i}.py"
+        file_path.write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+        assert check_decorators(str(file_path))["f"]["valid"]
+    check_decorators_in_folder(str(tmp_path))
+    assert len(loads) == 1
 
 def test_check_decorators_in_folder_errors(tmp_path):
     empty_dir = tmp_path / "empty"
@@ -90,3 +263,35 @@ def test_check_decorators_in_folder_errors(tmp_path):
         check_decorators_in_folder(str(file))
     with pytest.raises(FileNotFoundError):
         check_decorators_in_folder(str(tmp_path / "doesnotexist"))
+
+def test_check_decorators_invalid_public_key(tmp_path, monkeypatch):
+    def bad_key(public_key):
+        raise ValueError("Public key must be 32 bytes")
+    monkeypatch.setattr(DummyVerifyingKey, "from_base58", staticmethod(bad_key))
+    file_path = tmp_path / "bad_key.py"
+    file_path.write_text("@pysealer._validsig()\ndef f():\n return 1\n")
+    with pytest.raises(RuntimeError, match="invalid public key"):
+        check_decorators(str(file_path))
+
+def test_verifying_key_follows_the_env_file(tmp_path, monkeypatch):
+    import pysealer.check_decorators as check_decorators_mod
+    from pysealer.setup import get_public_key
+    monkeypatch.setattr(check_decorators_mod, "VerifyingKey", pysealer.VerifyingKey)
+    monkeypatch.setattr(check_decorators_mod, "get_public_key", get_public_key)
+    monkeypatch.delenv("PYSEALER_PUBLIC_KEY", raising=False)
+    keys = [pysealer.generate_keypair() for _ in range(2)]
+    env_files = []
+    for name, (_, public_key) in zip(("one", "two"), keys):
+        env_file = tmp_path / name / ".env"
+        env_file.parent.mkdir()
+        env_file.write_text(f"PYSEALER_PUBLIC_KEY={public_key}\n")
+        env_files.append(env_file)
+    seals = [pysealer.generate_signature("def f(): pass", private_key) for private_key, _ in keys]
+
+    for index in (0, 1, 0):
+        monkeypatch.setenv("PYSEALER_ENV_PATH", str(env_files[index]))
+        verifying_key = check_decorators_mod._load_verifying_key()
+        assert verifying_key.verify_many(["def f(): pass"] * 2, seals) == [index == 0, index == 1]
+    # The environment variable takes precedence, as in get_public_key
+    monkeypatch.setenv("PYSEALER_PUBLIC_KEY", keys[1][1])
+    assert check_decorators_mod._load_verifying_key().verify_many(["def f(): pass"], seals[1:]) == [True]
@@ -16,6 +16,7 @@ import shutil
 import pytest
 from typer.testing import CliRunner
 from pysealer import cli
+from pysealer.add_decorators import LockResult
 import pysealer
 
 runner = CliRunner()
@@ -32,7 +33,7 @@ def test_init_success(monkeypatch, tmp_path):
     monkeypatch.setattr(cli, "verify_signature", lambda msg, sig, pub: True)
     monkeypatch.setattr(cli, "is_git_repository", lambda: True)
     monkeypatch.setattr(cli, "get_hook_status", lambda: (False, None, None))
-    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern: (True, "hook installed"))
+    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern, staged: (True, "hook installed"))
     result = runner.invoke(cli.app, ["init", str(tmp_path / ".env")])
     assert result.exit_code == 0
     assert "Successfully initialized pysealer" in result.output
@@ -46,7 +47,7 @@ def test_init_github_token(monkeypatch, tmp_path):
     monkeypatch.setattr(cli, "verify_signature", lambda msg, sig, pub: True)
     monkeypatch.setattr(cli, "is_git_repository", lambda: True)
     monkeypatch.setattr(cli, "get_hook_status", lambda: (False, None, None))
-    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern: (True, "hook installed"))
+    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern, staged: (True, "hook installed"))
     class DummySecrets:
         @staticmethod
         def setup_github_secrets(pub, token):
@@ -67,20 +68,87 @@ def dummy_generate_keypair():
 def test_lock_file(monkeypatch, tmp_path):
     file = tmp_path / "f.py"
     file.write_text("def f():\n return 1\n")
-    monkeypatch.setattr(cli, "add_decorators", lambda path: ("@pysealer._sig()\ndef f():\n return 1\n", True))
+    monkeypatch.setattr(cli, "lock_file", lambda path, **kwargs: LockResult(True, 1, 0, 0))
     result = runner.invoke(cli.app, ["lock", str(file)])
     assert result.exit_code == 0
     assert "Successfully added decorators" in result.output
+    assert "1 new, 0 re-sealed, 0 kept" in result.output
+
+def test_lock_file_up_to_date(monkeypatch, tmp_path):
+    file = tmp_path / "f.py"
+    file.write_text("def f():\n return 1\n")
+    monkeypatch.setattr(cli, "lock_file", lambda path, **kwargs: LockResult(False, 0, 0, 2))
+    result = runner.invoke(cli.app, ["lock", str(file)])
+    assert result.exit_code == 0
+    assert "All seals are up to date in 1 file." in result.output
+    assert "0 new, 0 re-sealed, 2 kept" in result.output
 
 def test_lock_folder(monkeypatch, tmp_path):
     d = tmp_path / "d"
     d.mkdir()
     (d / "a.py").write_text("def a():\n return 1\n")
-    monkeypatch.setattr(cli, "add_decorators_to_folder", lambda path: [str(d / "a.py")])
+    monkeypatch.setattr(cli, "add_decorators_to_folder", lambda path, **kwargs: {str(d / "a.py"): LockResult(True, 1, 1, 0)})
     result = runner.invoke(cli.app, ["lock", str(d)])
     assert result.exit_code == 0
     assert "Successfully added decorators" in result.output
 
+def test_lock_several_paths_and_globs(monkeypatch, tmp_path):
+    d = tmp_path / "d"
+    (d / "sub").mkdir(parents=True)
+    for name in ("a.py", "sub/b.py", "notes.txt"):
+        (d / name).write_text("def a():\n return 1\n")
+    (tmp_path / "c.py").write_text("def c():\n return 1\n")
+    locked = []
+    def fake_lock_files(paths, **kwargs):
+        locked.extend(paths)
+        return {path: LockResult(True, 1, 0, 0) for path in paths}
+    monkeypatch.setattr(cli, "add_decorators_to_files", fake_lock_files)
+    result = runner.invoke(cli.app, ["lock", str(d), str(d / "sub" / "b.py"), str(tmp_path / "*.py")])
+    assert result.exit_code == 0
+    assert locked == [str(d / "a.py"), str(d / "sub" / "b.py"), str(tmp_path / "c.py")]
+    assert "Successfully added decorators to 3 files" in result.output
+    assert "Seals: 3 new" in result.output
+
+    result = runner.invoke(cli.app, ["lock", str(d), str(tmp_path / "nothing" / "*.py")])
+    assert result.exit_code == 1
+    assert "No Python files or folders match" in result.output
+
+def test_lock_include_and_exclude(monkeypatch, tmp_path):
+    d = tmp_path / "d"
+    (d / "gen").mkdir(parents=True)
+    for name in ("a.py", "gen/b.py", "c.pyi"):
+        (d / name).write_text("def a():\n return 1\n")
+    calls = []
+    monkeypatch.setattr(cli, "add_decorators_to_folder", lambda path, **kwargs: calls.append(kwargs) or {})
+    result = runner.invoke(cli.app, ["lock", str(d), "--exclude", "gen", "--include", "*.py", "--include", "*.pyi"])
+    assert result.exit_code == 0
+    assert calls[0]["include"] == ["*.py", "*.pyi"]
+    assert calls[0]["exclude"][-1] == "gen" and ".venv" in calls[0]["exclude"]
+
+    locked = []
+    monkeypatch.setattr(cli, "add_decorators_to_files", lambda paths, **kwargs: locked.extend(paths) or {})
+    runner.invoke(cli.app, ["lock", str(d), str(tmp_path / "d" / "a.py"), "--exclude", "gen", "--include", "*.py*"])
+    assert sorted(locked) == [str(d / "a.py"), str(d / "c.pyi")]
+
+def test_check_and_remove_several_paths(monkeypatch, tmp_path):
+    files = [tmp_path / "a.py", tmp_path / "b.py"]
+    for file in files:
+        file.write_text("def f():\n return 1\n")
+    checked = []
+    def fake_check_files(paths, **kwargs):
+        checked.extend(paths)
+        return {path: {"f": {"has_decorator": True, "valid": path.endswith("a.py")}} for path in paths}
+    monkeypatch.setattr(cli, "check_decorators_in_files", fake_check_files)
+    result = runner.invoke(cli.app, ["check", "--no-diff", *map(str, files), str(files[0])])
+    assert result.exit_code == 1
+    assert checked == list(map(str, files))
+    assert "1 decorator failed in 1 file" in result.output
+
+    monkeypatch.setattr(cli, "remove_decorators_from_files", lambda paths, jobs: list(paths))
+    result = runner.invoke(cli.app, ["remove", str(tmp_path / "*.py")])
+    assert result.exit_code == 0
+    assert "Successfully removed decorators from 2 files" in result.output
+
 def test_check_file(monkeypatch, tmp_path):
     file = tmp_path / "f.py"
     file.write_text("@pysealer._sig()\ndef f():\n return 1\n")
@@ -97,6 +165,70 @@ def test_check_file_no_decorators_returns_error(monkeypatch, tmp_path):
     assert result.exit_code == 1
     assert "No pysealer decorators found in 1 file:" in result.output
 
+def test_check_folder_bounds_diffs(monkeypatch, tmp_path):
+    folder = tmp_path / "pkg"
+    folder.mkdir()
+    failed = {"has_decorator": True, "valid": False, "line_start": 2, "line_end": 3}
+    monkeypatch.setattr(
+        cli,
+        "check_decorators_in_folder",
+        lambda path, **kwargs: {
+            str(folder / "a.py"): {"f": dict(failed), "g": dict(failed)},
+            str(folder / "b.py"): {"h": dict(failed)},
+        },
+    )
+    looked_up = []
+    def fake_attach_diffs(path, results, git_reader, limit):
+        names = [name for name in results][:limit]
+        for name in names:
+            results[name]["diff"] = [("+", f"changed {name}", 3)]
+        looked_up.extend(names)
+        return len(names)
+    monkeypatch.setattr(cli, "attach_diffs", fake_attach_diffs)
+    monkeypatch.setattr(cli, "is_git_available", lambda: True)
+
+    result = runner.invoke(cli.app, ["check", str(folder), "--max-diffs", "1"])
+    assert result.exit_code == 1
+    assert looked_up == ["f"]
+    assert "changed f" in result.output and "changed g" not in result.output
+    assert "Diffs not shown for 2 more failed decorators" in result.output
+
+    # Every diff is shown unless --max-diffs is given
+    looked_up.clear()
+    result = runner.invoke(cli.app, ["check", str(folder)])
+    assert result.exit_code == 1
+    assert looked_up == ["f", "g", "h"]
+    assert "Diffs not shown" not in result.output
+
+    looked_up.clear()
+    result = runner.invoke(cli.app, ["check", str(folder), "--no-diff"])
+    assert result.exit_code == 1
+    assert looked_up == []
+    assert "Diffs not shown" not in result.output
+
+def test_check_changed_only_checks_changed_files(monkeypatch, tmp_path):
+    folder = tmp_path / "pkg"
+    folder.mkdir()
+    changed = [str(folder / "a.py")]
+    bases = []
+    monkeypatch.setattr(cli, "get_changed_python_files", lambda path, base: bases.append(base) or changed)
+    checked = []
+    def fake_check_folder(path, **kwargs):
+        checked.append(kwargs["files"])
+        return {changed[0]: {"a": {"has_decorator": False, "valid": False}}} if changed else {}
+    monkeypatch.setattr(cli, "check_decorators_in_folder", fake_check_folder)
+
+    result = runner.invoke(cli.app, ["check", str(folder), "--changed-only", "--base", "main"])
+    assert result.exit_code == 0
+    assert bases == ["main"] and checked == [[str(folder / "a.py")]]
+    assert "No pysealer decorators found in 1 changed file." in result.output
+
+    changed.clear()
+    result = runner.invoke(cli.app, ["check", str(folder), "--changed-only"])
+    assert result.exit_code == 0
+    assert bases[-1] is None and len(checked) == 1
+    assert "No changed Python files in folder." in result.output
+
 def test_check_folder_no_decorators_returns_error(monkeypatch, tmp_path):
     folder = tmp_path / "pkg"
     folder.mkdir()
@@ -104,7 +236,7 @@ def test_check_folder_no_decorators_returns_error(monkeypatch, tmp_path):
     monkeypatch.setattr(
         cli,
         "check_decorators_in_folder",
-        lambda path: {
+        lambda path, **kwargs: {
             str(folder / "a.py"): {
                 "a": {"has_decorator": False, "valid": False}
             }
@@ -171,7 +303,7 @@ def test_init_github_token_import_error(monkeypatch, tmp_path):
     monkeypatch.setattr(cli, "verify_signature", lambda msg, sig, pub: True)
     monkeypatch.setattr(cli, "is_git_repository", lambda: True)
     monkeypatch.setattr(cli, "get_hook_status", lambda: (False, None, None))
-    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern: (True, "hook installed"))
+    monkeypatch.setattr(cli, "install_hook", lambda mode, target_pattern, staged: (True, "hook installed"))
     import builtins
     real_import = builtins.__import__
     def fake_import(name, *a, **k):
@@ -29,6 +29,12 @@ def test_generate_function_diff():
     assert any(t[0] == '-' for t in diff)
     assert any(t[0] == '+' for t in diff)
 
+def test_generate_function_diff_numbers_lines_in_file():
+    old = "class C:\n" + "".join(f"    x{i} = {i}\n" for i in range(10))
+    new = old.replace("x5 = 5", "x5 = 50")
+    diff = gd.generate_function_diff(old, new, "C", 100, 200, context_lines=1)
+    assert diff == [(' ', '    x4 = 4', 205), ('-', '    x5 = 5', 106), ('+', '    x5 = 50', 206), (' ', '    x6 = 6', 207)]
+
 def test_get_candidate_git_refs_env(monkeypatch):
     monkeypatch.setenv("PYSEALER_GIT_REF", "myref")
     refs = gd.get_candidate_git_refs()
@@ -55,3 +61,167 @@ def test_get_function_diff_handles_missing(tmp_path):
     file = tmp_path / "f.py"
     file.write_text("def f(): pass\n")
     assert gd.get_function_diff(str(file), "f", "def f(): pass\n", 1) is None
+
+def test_git_object_reader_reuses_one_process(tmp_path, monkeypatch):
+    import shutil
+    import subprocess
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    file = tmp_path / "pkg" / "m.py"
+    file.parent.mkdir()
+    file.write_text("def f():\n    return 1\n\ndef g():\n    return 2\n")
+    for args in (["init", "-q"], ["add", "."], ["-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "x"]):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+    file.write_text("def f():\n    return 10\n\ndef g():\n    return 20\n")
+
+    started = []
+    popen = subprocess.Popen
+    monkeypatch.setattr(gd.subprocess, "Popen", lambda *args, **kwargs: started.append(args) or popen(*args, **kwargs))
+    monkeypatch.setenv("PYSEALER_GIT_REF", "HEAD")
+    with gd.GitObjectReader() as reader:
+        # A missing path with one space must not kill the process
+        assert reader.read_file(str(tmp_path / "new file.py")) is None
+        assert reader.read_file(str(file)) == "def f():\n    return 1\n\ndef g():\n    return 2\n"
+        assert reader.read_file(str(file), "no-such-ref") is None
+        assert reader.read_file(str(tmp_path / "missing.py")) is None
+        assert reader.old_definition(str(file), "g", "HEAD") == ("def g():\n    return 2", 4)
+        diff = gd.get_function_diff(str(file), "f", "def f():\n    return 10\n", 1, reader=reader)
+        assert ('-', '    return 1', 2) in diff and ('+', '    return 10', 2) in diff
+        diffs = gd.get_file_diffs(str(file), [(1, 2), (4, 5)], reader=reader)
+        assert diffs[(4, 5)] == [(' ', 'def g():', 4), ('-', '    return 2', 5), ('+', '    return 20', 5)]
+    assert len(started) == 1
+
+def test_file_diff_attributes_changes_to_definitions():
+    old = (
+        "@pysealer._old1()\ndef f():\n    a = 1\n    return a\n\n"
+        "@pysealer._old2()\ndef g():\n    return 2\n    # gone\n\n"
+        "class C:\n    def m(self):\n        return 3\n"
+    )
+    new = (
+        "@pysealer._new1()\ndef f():\n    a = 1\n    return a\n\n"
+        "@pysealer._new2()\ndef g():\n    return 20\n\n"
+        "class C:\n    @pysealer._new3()\n    def m(self):\n        return 30\n"
+    )
+    file_diff = gd.FileDiff(old, new)
+    # Re-sealing alone is not a change
+    assert file_diff.definition_diff(2, 4) == []
+    # Replaced and trailing removed lines belong to g, with old numbers for removals
+    assert file_diff.definition_diff(7, 8) == [
+        (' ', 'def g():', 7), ('-', '    return 2', 8), ('-', '    # gone', 9), ('+', '    return 20', 8),
+    ]
+    # The class and its method both see the method's change
+    assert ('+', '        return 30', 13) in file_diff.definition_diff(10, 13)
+    assert file_diff.definition_diff(12, 13) == [
+        (' ', '    def m(self):', 12), ('-', '        return 3', 13), ('+', '        return 30', 13),
+    ]
+
+def test_line_numbers_follow_newlines_only():
+    # Form feeds and other separators that str.splitlines() breaks on do not end lines
+    old = 'x = "a\x0cb\x1cc"\ndef f():\n    s = "\x85"\n    return 1\n'
+    new = old.replace("return 1", "return 2")
+    assert gd.FileDiff(old, new).definition_diff(2, 4, context_lines=1) == [
+        (' ', '    s = "\x85"', 3), ('-', '    return 1', 4), ('+', '    return 2', 4),
+    ]
+    func, start = gd.extract_function_from_source(old, "f")
+    assert (func, start) == ('def f():\n    s = "\x85"\n    return 1', 2)
+    assert gd.generate_function_diff(func, new.split("\n", 1)[1].rstrip("\n"), "f", 2, 2, context_lines=0) == [
+        ('-', '    return 1', 4), ('+', '    return 2', 4),
+    ]
+
+def test_diff_opcodes_rebuild_new_lines():
+    import random
+    rng = random.Random(0)
+    words = ["", "pass", "return x", "def f():", "x = 1", "class C:"]
+    for _ in range(300):
+        old = [rng.choice(words) + (str(rng.randrange(20)) if rng.random() < 0.5 else "") for _ in range(rng.randrange(40))]
+        new = list(old)
+        for _ in range(rng.randrange(6)):
+            position = rng.randrange(len(new) + 1)
+            if rng.random() < 0.5 and position < len(new):
+                del new[position]
+            else:
+                new.insert(position, rng.choice(words))
+        opcodes = pysealer.diff_opcodes(old, new)
+        rebuilt = []
+        for index, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+            if index:
+                assert opcodes[index - 1][2:5:2] == (i1, j1)
+            if tag == "equal":
+                assert old[i1:i2] == new[j1:j2]
+            rebuilt.extend(new[j1:j2])
+        assert rebuilt == new
+        assert (opcodes[-1][2], opcodes[-1][4]) == (len(old), len(new)) if opcodes else old == new == []
+
+def test_get_changed_python_files(tmp_path, monkeypatch):
+    import shutil
+    import subprocess
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    folder = tmp_path / "pkg"
+    (folder / "sub").mkdir(parents=True)
+    for name in ("a.py", "b.py", "c.py", "sub/d.py", "notes.txt"):
+        (folder / name).write_text("x = 1\n")
+    (tmp_path / "outside.py").write_text("x = 1\n")
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=tmp_path, check=True, capture_output=True)
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "base")
+    git("tag", "base")
+    (folder / "a.py").write_text("x = 2\n")
+    git("commit", "-q", "-am", "change a")
+    (folder / "sub" / "d.py").write_text("x = 2\n")
+    (folder / "c.py").unlink()
+    (folder / "new.py").write_text("x = 1\n")
+    (folder / "notes.txt").write_text("changed\n")
+    (tmp_path / "outside.py").write_text("x = 2\n")
+
+    monkeypatch.delenv("PYSEALER_GIT_REF", raising=False)
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    expected = [str(folder / name) for name in ("a.py", "new.py", "sub/d.py")]
+    assert gd.get_changed_python_files(str(folder), "base") == expected
+    # Without a base the candidate refs are used (HEAD~1 here)
+    assert gd.get_changed_python_files(str(folder)) == expected
+    assert gd.get_changed_python_files(str(folder), "HEAD") == [str(folder / name) for name in ("new.py", "sub/d.py")]
+    with pytest.raises(RuntimeError):
+        gd.get_changed_python_files(str(folder), "no-such-ref")
+
+def test_get_changed_python_files_rejects_unresolvable_detected_base(tmp_path, monkeypatch):
+    import json
+    import shutil
+    import subprocess
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    def git(*args, cwd=repo):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True, capture_output=True)
+    git("init", "-q")
+    for i in range(2):
+        (repo / "a.py").write_text(f"x = {i}\n")
+        git("add", ".")
+        git("commit", "-q", "-m", f"commit {i}")
+    monkeypatch.delenv("PYSEALER_GIT_REF", raising=False)
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+
+    # A pull request base missing from the clone is an error, not a fallback to HEAD~1
+    event = tmp_path / "event.json"
+    event.write_text(json.dumps({"pull_request": {"base": {"sha": "1" * 40}}}))
+    monkeypatch.setenv("GITHUB_ACTIONS", "true")
+    monkeypatch.setenv("GITHUB_EVENT_NAME", "pull_request")
+    monkeypatch.setenv("GITHUB_EVENT_PATH", str(event))
+    with pytest.raises(RuntimeError, match="1111111111"):
+        gd.get_changed_python_files(str(repo))
+    monkeypatch.setenv("PYSEALER_GIT_REF", "no-such-ref")
+    with pytest.raises(RuntimeError, match="no-such-ref"):
+        gd.get_changed_python_files(str(repo))
+    monkeypatch.setenv("PYSEALER_GIT_REF", "HEAD~1")
+    assert gd.get_changed_python_files(str(repo)) == [str(repo / "a.py")]
+
+    # In a depth 1 clone HEAD~1 does not exist, and HEAD is never used instead
+    monkeypatch.delenv("PYSEALER_GIT_REF")
+    monkeypatch.delenv("GITHUB_ACTIONS")
+    shallow = tmp_path / "shallow"
+    git("clone", "-q", "--depth", "1", f"file://{repo}", str(shallow), cwd=tmp_path)
+    with pytest.raises(RuntimeError, match="HEAD~1"):
+        gd.get_changed_python_files(str(shallow))
@@ -70,3 +70,108 @@ def test_get_hook_status(tmp_path):
     hook_path.write_text("not our hook")
     is_installed, mode, pattern = gpc.get_hook_status(tmp_path)
     assert not is_installed
+
+def test_create_hook_script_is_valid_python():
+    script = gpc.create_hook_script("optional", "**/*.py")
+    compile(script, "pre-commit", "exec")
+    assert "lock_staged_files" in script
+
+def test_lock_staged_files_stages_once(tmp_path, monkeypatch):
+    files = []
+    for name in ("a.py", "b.py", "bad.py"):
+        path = tmp_path / name
+        path.write_text("def broken(:\n" if name == "bad.py" else f"def {name[0]}():\n    return 1\n")
+        files.append(str(path))
+    monkeypatch.setattr(gpc.SigningContext, "load", classmethod(lambda cls: cls(pysealer.SigningKey.from_base58(pysealer.generate_keypair()[0]))))
+    runs = []
+    monkeypatch.setattr(gpc.subprocess, "run", lambda args, **kwargs: runs.append(args))
+
+    errors = gpc.lock_staged_files(files)
+    assert list(errors) == [files[2]]
+    assert runs == [["git", "add", "--", files[0], files[1]]]
+    assert "@pysealer." in (tmp_path / "a.py").read_text()
+
+def test_seal_staged_files_seals_the_index(tmp_path, monkeypatch):
+    import subprocess
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    def git(*args, **kwargs):
+        return subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True, **kwargs).stdout.decode()
+    git("init", "-q")
+    (tmp_path / "partial.py").write_text("def a():\n    return 1\n")
+    (tmp_path / "clean.py").write_text("def b():\n    return 1\n")
+    (tmp_path / "bad.py").write_text("def broken(:\n")
+    git("add", ".")
+    (tmp_path / "partial.py").write_text("def a():\n    return 1\n\ndef unstaged():\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gpc.SigningContext, "load", classmethod(lambda cls: cls(pysealer.SigningKey.from_base58(pysealer.generate_keypair()[0]))))
+
+    errors = gpc.seal_staged_files(["partial.py", "clean.py", "bad.py"])
+    assert list(errors) == ["bad.py"]
+    staged = git("show", ":partial.py")
+    assert "@pysealer." in staged and "unstaged" not in staged
+    # Unstaged edits are left alone; clean files get the sealed content too
+    assert "@pysealer." not in (tmp_path / "partial.py").read_text()
+    assert (tmp_path / "clean.py").read_text() == git("show", ":clean.py")
+    assert "@pysealer." in (tmp_path / "clean.py").read_text()
+    assert git("diff", "--name-only") == "partial.py\n"
+
+def test_seal_staged_files_keeps_crlf_line_endings(tmp_path, monkeypatch):
+    import subprocess
+    from pysealer.check_decorators import _collect_decorators
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True).stdout
+    git("init", "-q")
+    git("config", "core.autocrlf", "false")
+    (tmp_path / "crlf.py").write_bytes(b"def a():\r\n    return 1\r\n")
+    (tmp_path / "partial.py").write_bytes(b"def b():\r\n    return 2\r\n")
+    git("add", ".")
+    (tmp_path / "partial.py").write_bytes(b"def b():\r\n    return 2\r\n\r\ndef c():\r\n    pass\r\n")
+    monkeypatch.chdir(tmp_path)
+    context = gpc.SigningContext(pysealer.SigningKey.from_base58(pysealer.generate_keypair()[0]))
+    monkeypatch.setattr(gpc.SigningContext, "load", classmethod(lambda cls: context))
+
+    assert gpc.seal_staged_files(["crlf.py", "partial.py"]) == {}
+    for name in ("crlf.py", "partial.py"):
+        staged = git("show", f":{name}")
+        assert b"@pysealer." in staged
+        assert staged.count(b"\n") == staged.count(b"\r\n")
+        # The seals verify against the source as check reads it
+        sealed_file = tmp_path / f"sealed_{name}"
+        sealed_file.write_bytes(staged)
+        _, pending = _collect_decorators(str(sealed_file))
+        assert pending
+        assert all(context.verify_many([r["source"] for _, r in pending], [r["signature"] for _, r in pending]))
+    assert (tmp_path / "crlf.py").read_bytes() == git("show", ":crlf.py")
+    assert b"@pysealer." not in (tmp_path / "partial.py").read_bytes()
+
+def test_seal_staged_files_updates_clean_files_with_autocrlf(tmp_path, monkeypatch):
+    import subprocess
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True).stdout
+    git("init", "-q")
+    git("config", "core.autocrlf", "true")
+    # The index holds LF blobs while the working tree has CRLF files
+    (tmp_path / "clean.py").write_bytes(b"def a():\r\n    return 1\r\n")
+    (tmp_path / "partial.py").write_bytes(b"def b():\r\n    return 2\r\n")
+    git("add", ".")
+    (tmp_path / "partial.py").write_bytes(b"def b():\r\n    return 2\r\n\r\ndef c():\r\n    pass\r\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gpc.SigningContext, "load", classmethod(lambda cls: cls(pysealer.SigningKey.from_base58(pysealer.generate_keypair()[0]))))
+
+    assert gpc.seal_staged_files(["clean.py", "partial.py"]) == {}
+    staged = git("show", ":clean.py")
+    assert b"@pysealer." in staged and b"\r" not in staged
+    # The clean file gets the sealed content with its CRLF line endings; the other is left alone
+    assert (tmp_path / "clean.py").read_bytes() == staged.replace(b"\n", b"\r\n")
+    assert b"@pysealer." not in (tmp_path / "partial.py").read_bytes()
+    assert git("diff", "--name-only") == b"partial.py\n"
+
+def test_create_staged_hook_script():
+    script = gpc.create_hook_script("mandatory", "**/*.py", staged=True)
+    compile(script, "pre-commit", "exec")
+    assert "seal_staged_files" in script
@@ -0,0 +1,51 @@
+import os
+import pytest
+from pysealer.parallel import MIN_FILES_PER_WORKER, largest_first, plan_workers, resolve_jobs, run_in_processes
+from pysealer.remove_decorators import remove_decorators_from_folder
+
+
+def test_resolve_jobs(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    assert resolve_jobs(0) == 16
+    assert resolve_jobs(3) == 3
+    with pytest.raises(ValueError):
+        resolve_jobs(-1)
+
+
+def test_plan_workers(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    # A handful of files stay in the calling process unless jobs are given explicitly
+    assert plan_workers(0, iter(["a.py", "b.py"])) == (1, ["a.py", "b.py"])
+    assert plan_workers(4, iter(["a.py", "b.py"])) == (2, ["a.py", "b.py"])
+    stream = iter(["a.py"])
+    assert plan_workers(1, stream) == (1, stream)
+    many = [f"m{i}.py" for i in range(5 * MIN_FILES_PER_WORKER)]
+    assert plan_workers(0, iter(many)) == (5, many)
+
+
+def test_largest_first(tmp_path):
+    paths = []
+    for name, size in [("small.py", 1), ("large.py", 100), ("medium.py", 10)]:
+        (tmp_path / name).write_text("x" * size)
+        paths.append(str(tmp_path / name))
+    paths.append(str(tmp_path / "missing.py"))
+    assert largest_first(paths) == [1, 2, 0, 3]
+
+
+def test_run_in_processes_keeps_order(tmp_path):
+    paths = []
+    for i in range(6):
+        (tmp_path / f"m{i}.py").write_text("x" * (i * 10))
+        paths.append(str(tmp_path / f"m{i}.py"))
+    assert run_in_processes(os.path.basename, paths, 3) == [f"m{i}.py" for i in range(6)]
+    assert run_in_processes(os.path.basename, [], 3) == []
+
+
+def test_remove_decorators_from_folder_parallel(tmp_path):
+    for i in range(4):
+        (tmp_path / f"m{i}.py").write_text(f"import pysealer\n\n@pysealer._sig{i}()\ndef f{i}():\n    return {i}\n")
+    (tmp_path / "plain.py").write_text("def g():\n    return 0\n")
+    modified = remove_decorators_from_folder(str(tmp_path), jobs=2)
+    assert sorted(modified) == sorted(str((tmp_path / f"m{i}.py").resolve()) for i in range(4))
+    for i in range(4):
+        assert "@pysealer" not in (tmp_path / f"m{i}.py").read_text()
@@ -51,6 +51,18 @@ def test_remove_decorators_from_folder(tmp_path):
     assert "@pysealer" not in file1.read_text()
     assert "def g()" in file2.read_text()
 
+def test_remove_decorators_from_folder_skips_files_without_marker(tmp_path, monkeypatch):
+    import pysealer.remove_decorators as remove_module
+    parsed = []
+    real_scan = remove_module.scan_definitions
+    monkeypatch.setattr(remove_module, "scan_definitions", lambda content: parsed.append(content) or real_scan(content))
+    (tmp_path / "a.py").write_text("@pysealer._sig()\ndef f():\n return 1\n")
+    (tmp_path / "b.py").write_text("def g(:\n")
+    result = remove_decorators_from_folder(str(tmp_path))
+    assert result == [str(tmp_path / "a.py")]
+    assert len(parsed) == 1
+    assert (tmp_path / "b.py").read_text() == "def g(:\n"
+
 def test_remove_decorators_from_folder_errors(tmp_path):
     file = tmp_path / "file.txt"
     file.write_text("hi")
@@ -60,3 +72,17 @@ def test_remove_decorators_from_folder_errors(tmp_path):
     empty_dir.mkdir()
     with pytest.raises(FileNotFoundError):
         remove_decorators_from_folder(str(empty_dir))
+
+def test_remove_decorators_reads_unsealed_files_once(tmp_path, monkeypatch):
+    import builtins
+    import pysealer.remove_decorators as remove_module
+    file_path = tmp_path / "plain.py"
+    file_path.write_bytes(b"def baz():\r\n    return 2\r\n")
+    opened = []
+    def counting_open(*args, **kwargs):
+        opened.append(args)
+        return builtins.open(*args, **kwargs)
+    monkeypatch.setattr(remove_module, "open", counting_open, raising=False)
+    # Decoded like a text mode read, with universal newlines
+    assert remove_decorators(str(file_path)) == ("def baz():\n    return 2\n", False)
+    assert len(opened) == 1
@@ -0,0 +1,96 @@
+import pytest
+import pysealer.scanner as scanner_mod
+from pysealer.scanner import (
+    Decorator,
+    is_pysealer_decorator,
+    scan_definitions,
+    seal_signature,
+)
+
+SOURCE = '''import pysealer
+
+@pysealer._sig1()
+def foo(a,
+        b):
+    text = """
+def not_a_function():
+    pass
+"""
+    return f"{a!r:>{b}}"
+
+
+@other.deco
+@pysealer._sig2()
+class Bar(Base):
+    @property
+    def value(self):
+        return 1
+
+    if True:
+        def conditional(self):
+            pass
+
+
+async def baz():
+    def inner():
+        pass
+    await inner()
+'''
+
+
+@pytest.fixture(params=["native", "ast"])
+def scan(request, monkeypatch):
+    if request.param == "ast":
+        def unsupported(content):
+            raise ValueError("unsupported")
+        monkeypatch.setattr(scanner_mod, "scan_source", unsupported)
+    return scan_definitions
+
+
+def test_scan_definitions(scan):
+    definitions = {definition.name: definition for definition in scan(SOURCE)}
+    assert set(definitions) == {"foo", "Bar", "value", "conditional", "baz", "inner"}
+
+    foo = definitions["foo"]
+    assert (foo.kind, foo.line_start, foo.line_end, foo.col_offset) == ("FunctionDef", 4, 10, 0)
+    assert foo.decorators == [Decorator(3, "pysealer._sig1", True)]
+
+    bar = definitions["Bar"]
+    assert (bar.kind, bar.line_start, bar.line_end) == ("ClassDef", 15, 22)
+    assert [seal_signature(decorator) for decorator in bar.decorators] == [None, "sig2"]
+
+    assert definitions["value"].in_class
+    assert definitions["value"].col_offset == 4
+    assert not definitions["conditional"].in_class
+    assert definitions["baz"].kind == "AsyncFunctionDef"
+    assert (definitions["baz"].line_start, definitions["baz"].line_end) == (25, 28)
+
+
+def test_scan_definitions_breadth_first(scan):
+    names = [definition.name for definition in scan(SOURCE)]
+    assert names.index("baz") < names.index("value") < names.index("inner")
+
+
+def test_scan_definitions_syntax_error(scan):
+    with pytest.raises(SyntaxError):
+        scan("def broken(:\n")
+
+
+def test_scan_definitions_falls_back_for_tabs():
+    definitions = scan_definitions("class A:\n\tdef f(self):\n\t\tpass\n")
+    assert [(d.name, d.line_end, d.in_class) for d in definitions] == [("A", 3, False), ("f", 3, True)]
+
+
+def test_is_pysealer_decorator():
+    assert is_pysealer_decorator(Decorator(1, "pysealer._sig", True))
+    assert is_pysealer_decorator(Decorator(1, "pysealer.anything", False))
+    assert is_pysealer_decorator(Decorator(1, "pysealer_custom", False))
+    assert not is_pysealer_decorator(Decorator(1, "pysealer.a.b", True))
+    assert not is_pysealer_decorator(Decorator(1, "other.pysealer", False))
+    assert not is_pysealer_decorator(Decorator(1, None, True))
+
+
+def test_seal_signature():
+    assert seal_signature(Decorator(1, "pysealer._ph_abc", True)) == "ph_abc"
+    assert seal_signature(Decorator(1, "pysealer._abc", False)) is None
+    assert seal_signature(Decorator(1, "pysealer.abc", True)) is None
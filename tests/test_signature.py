@@ -0,0 +1,60 @@
+import pytest
+
+import pysealer
+
+SOURCE = "def f():\n    return 'héllo'\n"
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return pysealer.generate_keypair()
+
+
+def test_generate_signature_same_for_str_and_bytes(keypair):
+    private_key, public_key = keypair
+    encoded = SOURCE.encode("utf-8")
+    signature = pysealer.generate_signature(SOURCE, private_key)
+    assert pysealer.generate_signature(encoded, private_key) == signature
+    assert pysealer.verify_signature(encoded, signature, public_key)
+    assert pysealer.verify_signature(SOURCE, pysealer.generate_signature(encoded, private_key), public_key)
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, lambda data: memoryview(bytearray(data))])
+def test_signatures_accept_buffers(keypair, wrap):
+    private_key, public_key = keypair
+    data = wrap(SOURCE.encode("utf-8"))
+    signature = pysealer.generate_signature(SOURCE, private_key)
+    assert pysealer.generate_signature(data, private_key) == signature
+    assert pysealer.verify_signature(data, signature, public_key)
+    assert not pysealer.verify_signature(wrap(b"def g(): pass"), signature, public_key)
+
+    signing_key = pysealer.SigningKey.from_base58(private_key)
+    verifying_key = pysealer.VerifyingKey.from_base58(public_key)
+    assert signing_key.sign_many([SOURCE, data]) == [signature, signature]
+    assert verifying_key.verify_many([data, SOURCE], [signature, signature]) == [True, True]
+
+
+def test_signatures_accept_empty_buffers(keypair):
+    private_key, public_key = keypair
+    signature = pysealer.generate_signature("", private_key)
+    for data in (b"", bytearray(), memoryview(b"")):
+        assert pysealer.generate_signature(data, private_key) == signature
+        assert pysealer.verify_signature(data, signature, public_key)
+
+
+def test_signatures_reject_non_contiguous_buffers(keypair):
+    private_key, public_key = keypair
+    strided = memoryview(SOURCE.encode("utf-8"))[::2]
+    signature = pysealer.generate_signature(SOURCE, private_key)
+    with pytest.raises(BufferError):
+        pysealer.generate_signature(strided, private_key)
+    with pytest.raises(BufferError):
+        pysealer.verify_signature(strided, signature, public_key)
+    with pytest.raises(BufferError):
+        pysealer.SigningKey.from_base58(private_key).sign_many([SOURCE, strided])
+
+
+def test_signatures_reject_other_types(keypair):
+    private_key, _ = keypair
+    with pytest.raises(TypeError):
+        pysealer.generate_signature(42, private_key)
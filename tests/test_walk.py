@@ -0,0 +1,70 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pysealer.walk import DEFAULT_EXCLUDES, glob_match, walk_python_files
+
+
+def _tree(root):
+    for name in (
+        "a.py", "notes.txt", "pkg/b.py", "pkg/sub/c.py", "pkg/build/gen.py", "build/lib/out.py", "dist/d.py",
+        ".venv/lib/site-packages/dep.py", "node_modules/x/y.py", "mod.egg-info/z.py",
+    ):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+
+
+def test_glob_match():
+    assert glob_match("*.py", "a/b/c.py")
+    assert not glob_match("*.py", "a/b/c.pyc")
+    assert glob_match("build", "pkg/build")
+    assert glob_match("pkg/*.py", "pkg/b.py") and not glob_match("pkg/*.py", "pkg/sub/c.py")
+    assert glob_match("pkg/**/*.py", "pkg/sub/c.py") and glob_match("pkg/**/*.py", "pkg/b.py")
+    assert glob_match("./pkg/**", "pkg/sub/c.py")
+
+
+def test_walk_skips_default_excludes(tmp_path):
+    _tree(tmp_path)
+    files = walk_python_files(str(tmp_path))
+    # Paths are yielded lazily, in sorted order
+    assert next(files) == str(tmp_path / "a.py")
+    # Outside a work tree build output is skipped at the top of the folder only
+    assert list(files) == [
+        str(tmp_path / "pkg" / "b.py"), str(tmp_path / "pkg" / "build" / "gen.py"), str(tmp_path / "pkg" / "sub" / "c.py")
+    ]
+    assert len(list(walk_python_files(str(tmp_path), exclude=[]))) == 9
+    assert list(walk_python_files(str(tmp_path), include=["*.txt"])) == [str(tmp_path / "notes.txt")]
+    assert sorted(walk_python_files(str(tmp_path), exclude=[*DEFAULT_EXCLUDES, "pkg/sub", "build"])) == [
+        str(tmp_path / "a.py"), str(tmp_path / "dist" / "d.py"), str(tmp_path / "pkg" / "b.py")
+    ]
+
+
+def test_walk_uses_git_ignore_rules(tmp_path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    _tree(tmp_path)
+    (tmp_path / ".gitignore").write_text("generated/\n")
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "out.py").write_text("x = 1\n")
+    for args in (["init", "-q"], ["add", "a.py", "pkg/b.py"]):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+    (tmp_path / "pkg" / "b.py").unlink()
+
+    # Tracked and untracked files are listed; ignored, excluded and deleted ones are not.
+    # Build output is left to .gitignore, so build and dist are listed here.
+    assert sorted(walk_python_files(str(tmp_path))) == [
+        str(tmp_path / "a.py"), str(tmp_path / "build" / "lib" / "out.py"), str(tmp_path / "dist" / "d.py"),
+        str(tmp_path / "pkg" / "build" / "gen.py"), str(tmp_path / "pkg" / "sub" / "c.py"),
+    ]
+    assert list(walk_python_files(str(tmp_path / "pkg"))) == [
+        str(tmp_path / "pkg" / "build" / "gen.py"), str(tmp_path / "pkg" / "sub" / "c.py")
+    ]
+    # An ignored folder given explicitly is walked directly
+    assert list(walk_python_files(str(tmp_path / "generated"))) == [str(tmp_path / "generated" / "out.py")]
+    # A folder whose files are all ignored is not walked behind git's back
+    (tmp_path / ".gitignore").write_text("generated/\nlogs/*.py\n")
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "run.py").write_text("x = 1\n")
+    assert list(walk_python_files(str(tmp_path / "logs"))) == []